@@ -1,23 +1,78 @@
 
 # app/agents/multi_agent_orchestrator.py (FULL: LTM-Enhanced Prompts + Nova Integration)
 import boto3
+from botocore.config import Config
 import json
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, Optional, AsyncIterator, Awaitable, Set
+from concurrent.futures import ThreadPoolExecutor
 import structlog
 import asyncio
 from app.config import get_settings
+from app.core.agent_policy import call_with_policy, mark_admitted, mark_queued, policy_for
+from app.core.cache import get_analysis_cache
+from app.core.json_stream import JSONArrayStreamer, parse_model_json
+from app.core.rate_limiter import governor, is_throttling_error
+from app.core import telemetry
+from app.utils.tokens import estimate_tokens
 
 logger = structlog.get_logger()
 settings = get_settings()
 
+# Version tag for the built-in default prompts below (bump when they change)
+DEFAULT_PROMPT_VERSION = "default-v1"
+
+# Agent names, in the order results are reported (also the section keys of a shared-mode answer)
+AGENTS = ('code_review', 'testing', 'documentation')
+
+# Shared bounded pool for blocking boto3 calls (one per process, reused by every orchestrator)
+_bedrock_executor: Optional[ThreadPoolExecutor] = None
+
+# Agent runs that outlived their request's deadline (strong references until they finish)
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def get_bedrock_executor() -> ThreadPoolExecutor:
+    """Get (or lazily create) the thread pool used for Bedrock runtime calls"""
+    global _bedrock_executor
+    if _bedrock_executor is None:
+        _bedrock_executor = ThreadPoolExecutor(
+            max_workers=settings.bedrock_max_concurrency,
+            thread_name_prefix="bedrock"
+        )
+    return _bedrock_executor
+
+
+def shutdown_bedrock_executor():
+    """Release Bedrock worker threads (called on app shutdown)"""
+    global _bedrock_executor
+    if _bedrock_executor is not None:
+        _bedrock_executor.shutdown(wait=False, cancel_futures=True)
+        _bedrock_executor = None
+
+
+def run_in_background(awaitable: Awaitable) -> asyncio.Task:
+    """Keep a task running after its caller returned (held here so it is not garbage-collected)"""
+    task = asyncio.ensure_future(awaitable)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
 class MultiAgentOrchestrator:
     """Multi-Agent Orchestration using Bedrock Runtime (Nova) with LTM Support"""
     
     def __init__(self):
         self.client = boto3.client(
             'bedrock-runtime',
-            region_name=settings.aws_region
+            region_name=settings.aws_region,
+            config=Config(
+                max_pool_connections=settings.bedrock_max_concurrency,
+                read_timeout=settings.bedrock_read_timeout_seconds
+            )
         )
+        self.executor = get_bedrock_executor()
+        self.cache = get_analysis_cache()
         self.model_id = "us.amazon.nova-pro-v1:0"  # ✅ CORRECT: Add "us." prefix
         logger.info("orchestrator_initialized", model=self.model_id)
     
@@ -28,7 +83,11 @@ class MultiAgentOrchestrator:
         filename: Optional[str] = None,
         code_review_prompt: Optional[str] = None,
         testing_prompt: Optional[str] = None,
-        docs_prompt: Optional[str] = None
+        docs_prompt: Optional[str] = None,
+        prompt_version: Optional[str] = None,
+        agents: tuple = AGENTS,
+        max_new_tokens: int = 2048,
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Complete multi-agent analysis of code with optional LTM-enhanced prompts
@@ -40,6 +99,12 @@ class MultiAgentOrchestrator:
             code_review_prompt: Custom LTM-aware prompt for code review agent
             testing_prompt: Custom LTM-aware prompt for testing agent
             docs_prompt: Custom LTM-aware prompt for documentation agent
+            prompt_version: Template version of the custom prompts (part of the cache key)
+            agents: Which agents to run (the others are reported as {} with cache status 'skipped')
+            max_new_tokens: Output budget of each agent call
+            deadline: time.monotonic() at which to return with the agents finished so far;
+                the others are reported as {} with cache status 'pending' and keep running:
+                their tasks are returned under 'pending' (cancel them if not needed)
         """
         
         enhanced_prompts = bool(code_review_prompt or testing_prompt or docs_prompt)
@@ -51,35 +116,172 @@ class MultiAgentOrchestrator:
         )
         print(f"🤖 Multi-Agent Analysis Starting... (LTM Enhanced: {enhanced_prompts})")
         
-        # Run all agents in parallel
-        results = await asyncio.gather(
-            self._code_review_agent(code, language, code_review_prompt),
-            self._testing_agent(code, language, testing_prompt),
-            self._documentation_agent(code, language, docs_prompt),
-            return_exceptions=False
-        )
+        version = prompt_version or DEFAULT_PROMPT_VERSION
         
-        code_review_result, testing_result, docs_result = results
+        prompts = {
+            'code_review': code_review_prompt,
+            'testing': testing_prompt,
+            'documentation': docs_prompt
+        }
         
-        consolidated = {
-            'code_review': code_review_result,
-            'testing': testing_result,
-            'documentation': docs_result
+        # Run the selected agents in parallel (cache hits skip the model call entirely)
+        tasks = {
+            agent: asyncio.ensure_future(self.run_agent(agent, code, language, prompts[agent], version, max_new_tokens))
+            for agent in AGENTS if agent in agents
         }
+        if tasks:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            await asyncio.wait(tasks.values(), timeout=timeout)
+        pending = {agent: run_in_background(task) for agent, task in tasks.items() if not task.done()}
+        
+        consolidated: Dict[str, Any] = {}
+        cache_status: Dict[str, str] = {}
+        for agent in AGENTS:
+            if agent not in tasks:
+                consolidated[agent], cache_status[agent] = {}, 'skipped'
+            elif agent in pending:
+                consolidated[agent], cache_status[agent] = {}, 'pending'
+            else:
+                consolidated[agent], cache_status[agent] = tasks[agent].result()
         
-        logger.info("multi_agent_analysis_complete", enhanced=enhanced_prompts)
+        if pending:
+            logger.warning("multi_agent_deadline_reached", pending=list(pending), cache=cache_status)
+            print(f"⏳ Deadline reached, still running: {', '.join(pending)}")
+        else:
+            logger.info("multi_agent_analysis_complete", enhanced=enhanced_prompts, cache=cache_status)
+            print("✅ Multi-Agent Analysis Complete!")
+        
+        return {
+            'success': True,
+            'results': consolidated,
+            'cache': cache_status,
+            'pending': pending
+        }
+    
+    async def analyze_code_shared(
+        self,
+        code: str,
+        language: str,
+        prompt: str,
+        prompt_version: Optional[str] = None,
+        max_new_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Shared-context analysis: one model call whose prompt carries the code once and
+        whose JSON answer has a section per agent. Same return shape as analyze_code.
+        """
+        logger.info("multi_agent_shared_call_started", language=language)
+        print("🤖 Multi-Agent Analysis Starting... (shared context, single call)")
+        
+        version = prompt_version or DEFAULT_PROMPT_VERSION
+        max_new_tokens = max_new_tokens or settings.shared_prompt_max_new_tokens
+        combined, cache_status = await self._cached_agent(
+            'combined', code, language, version,
+            lambda: self._invoke_nova(prompt, max_new_tokens=max_new_tokens, agent='combined')
+        )
+        
+        consolidated = {}
+        for agent in AGENTS:
+            section = combined.get(agent)
+            if isinstance(section, dict):
+                consolidated[agent] = section
+            elif 'error' in combined:
+                consolidated[agent] = {'error': combined['error']}
+            else:
+                consolidated[agent] = {'error': f"missing '{agent}' section in shared response"}
+        
+        logger.info("multi_agent_analysis_complete", shared=True, cache=cache_status)
         print("✅ Multi-Agent Analysis Complete!")
         
         return {
             'success': True,
-            'results': consolidated
+            'results': consolidated,
+            'cache': {agent: cache_status for agent in AGENTS}
+        }
+    
+    async def run_agent(
+        self,
+        agent: str,
+        code: str,
+        language: str,
+        prompt: Optional[str] = None,
+        prompt_version: Optional[str] = None,
+        max_new_tokens: int = 2048
+    ) -> tuple:
+        """Run a single agent ('code_review', 'testing' or 'documentation') through the cache"""
+        agents = {
+            'code_review': self._code_review_agent,
+            'testing': self._testing_agent,
+            'documentation': self._documentation_agent
         }
+        run = agents[agent]
+        return await self._cached_agent(agent, code, language, prompt_version or DEFAULT_PROMPT_VERSION,
+                                        lambda: run(code, language, prompt, max_new_tokens))
+    
+    async def stream_code_review(
+        self,
+        code: str,
+        language: str,
+        prompt: str,
+        prompt_version: Optional[str] = None,
+        max_new_tokens: int = 2048
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Code review agent over Bedrock's streaming API.
+        
+        Yields {'type': 'issue', 'issue': {...}} as each issue object is completed in the
+        model output, then one {'type': 'result', 'result': {...}, 'cache': status}.
+        """
+        version = prompt_version or DEFAULT_PROMPT_VERSION
+        if self.cache is not None:
+            cached = await self.cache.get(code, language, 'code_review', version, self.model_id)
+            telemetry.record_cache_lookup('code_review', 'hit' if cached is not None else 'miss', self.model_id)
+            if cached is not None:
+                logger.info("analysis_cache_hit", agent='code_review', streaming=True)
+                for issue in cached.get('issues', []):
+                    yield {'type': 'issue', 'issue': issue}
+                yield {'type': 'result', 'result': cached, 'cache': 'hit'}
+                return
+        
+        streamer = JSONArrayStreamer("issues")
+        try:
+            async for text in self._stream_nova_continued(prompt, agent='code_review', max_new_tokens=max_new_tokens):
+                for issue in streamer.feed(text):
+                    yield {'type': 'issue', 'issue': issue}
+            result = streamer.result()
+            logger.info("nova_stream_success")
+        except Exception as e:
+            logger.error("nova_stream_failed", error=str(e))
+            result = {'error': str(e)}
+        
+        if self.cache is not None:
+            await self.cache.set(code, language, 'code_review', version, self.model_id, result)
+        yield {'type': 'result', 'result': result, 'cache': 'miss' if self.cache is not None else 'disabled'}
+    
+    async def _cached_agent(self, agent: str, code: str, language: str, prompt_version: str, run_agent) -> tuple:
+        """Look up an agent result in the analysis cache before invoking the model.
+        
+        Returns (result, cache_status) where cache_status is 'hit', 'miss' or 'disabled'.
+        """
+        if self.cache is None:
+            return await run_agent(), 'disabled'
+        
+        cached = await self.cache.get(code, language, agent, prompt_version, self.model_id)
+        telemetry.record_cache_lookup(agent, 'hit' if cached is not None else 'miss', self.model_id)
+        if cached is not None:
+            logger.info("analysis_cache_hit", agent=agent)
+            return cached, 'hit'
+        
+        result = await run_agent()
+        await self.cache.set(code, language, agent, prompt_version, self.model_id, result)
+        return result, 'miss'
     
     async def _code_review_agent(
         self,
         code: str,
         language: str,
-        custom_prompt: Optional[str] = None
+        custom_prompt: Optional[str] = None,
+        max_new_tokens: int = 2048
     ) -> Dict[str, Any]:
         """Code Review Agent - Security & Quality Analysis (LTM-Enhanced)"""
         
@@ -124,13 +326,14 @@ Return ONLY valid JSON (no markdown):
   "positive_feedback": ["What went well"]
 }}"""
         
-        return await self._invoke_nova(prompt)
+        return await self._invoke_nova(prompt, max_new_tokens, agent='code_review')
     
     async def _testing_agent(
         self,
         code: str,
         language: str,
-        custom_prompt: Optional[str] = None
+        custom_prompt: Optional[str] = None,
+        max_new_tokens: int = 2048
     ) -> Dict[str, Any]:
         """Testing Agent - Test Case Generation (LTM-Enhanced)"""
         
@@ -164,13 +367,14 @@ Return ONLY valid JSON:
   "summary": "Generated N test cases covering X% of code"
 }}"""
         
-        return await self._invoke_nova(prompt)
+        return await self._invoke_nova(prompt, max_new_tokens, agent='testing')
     
     async def _documentation_agent(
         self,
         code: str,
         language: str,
-        custom_prompt: Optional[str] = None
+        custom_prompt: Optional[str] = None,
+        max_new_tokens: int = 2048
     ) -> Dict[str, Any]:
         """Documentation Agent - API & Code Documentation (LTM-Enhanced)"""
         
@@ -205,62 +409,289 @@ Return ONLY valid JSON:
   "summary": "Generated documentation for N functions"
 }}"""
         
-        return await self._invoke_nova(prompt)
+        return await self._invoke_nova(prompt, max_new_tokens, agent='documentation')
     
-    async def _invoke_nova(self, prompt: str) -> Dict[str, Any]:
-        """Invoke Amazon Nova with CORRECT native format [web:216][web:218]"""
+    async def _invoke_nova(self, prompt: str, max_new_tokens: int = 2048, agent: str = 'unknown') -> Dict[str, Any]:
+        """
+        Invoke Amazon Nova with CORRECT native format [web:216][web:218].
+        Each request runs under the agent's policy (attempt timeout, retries, hedging);
+        continuations share the agent's deadline.
+        """
         
         try:
-            # ✅ NOVA NATIVE FORMAT (invoke_model)
-            request_body = {
-                "schemaVersion": "messages-v1",  # ✅ Required for Nova [web:216]
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {"text": prompt}
-                        ]
-                    }
-                ],
-                "inferenceConfig": {  # ✅ Nova-specific params
-                    "max_new_tokens": 2048,  # ✅ Use max_new_tokens (not maxTokens) [web:218]
-                    "temperature": 0.7,
-                    "top_p": 0.9,  # ✅ top_p (not topP)
-                    "top_k": 50
-                }
+            policy = policy_for(agent)
+            deadline = time.monotonic() + policy.deadline_seconds
+            text = ""
+            for continuation in range(settings.bedrock_max_continuations + 1):
+                # The answer so far is sent as prefill (without trailing whitespace, which Nova rejects)
+                request_body = self._nova_request_body(prompt, max_new_tokens, prefill=text.rstrip() or None)
+                
+                # Blocking boto3 call runs on the shared pool so the event loop (and the other agents) keep going
+                response_body = await call_with_policy(
+                    agent,
+                    lambda body=request_body, prefill=text.rstrip(), resumed=continuation > 0: self._invoke_model_governed(
+                        body,
+                        estimated_tokens=estimate_tokens(prompt) + estimate_tokens(prefill) + max_new_tokens,
+                        agent=agent,
+                        continuation=resumed
+                    ),
+                    policy,
+                    deadline
+                )
+                
+                # ✅ CORRECT RESPONSE PARSING for Nova invoke_model [web:218][web:222]
+                text += response_body["output"]["message"]["content"][0]["text"]  # ✅ Path: output > message > content[0] > text
+                
+                # Output budget hit mid-answer: ask for the rest, with the answer so far as prefill
+                if response_body.get("stopReason") != "max_tokens" or continuation == settings.bedrock_max_continuations:
+                    break
+                logger.info("nova_output_truncated_continuing", agent=agent, continuation=continuation + 1, chars=len(text))
+            result = self._parse_model_json(text)
+            
+            logger.info("nova_invocation_success")
+            return result
+        
+        except Exception as e:
+            logger.error("nova_invocation_failed", agent=agent, error=str(e) or type(e).__name__)
+            return {'error': str(e) or type(e).__name__}
+    
+    @staticmethod
+    def _nova_request_body(prompt: str, max_new_tokens: int = 2048, prefill: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Nova messages-v1 request body (shared by invoke_model and the streaming variant).
+        `prefill` (a truncated answer) starts the assistant turn, so the model continues it.
+        """
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {"text": prompt}
+                ]
             }
+        ]
+        if prefill:
+            messages.append({"role": "assistant", "content": [{"text": prefill}]})
+        # ✅ NOVA NATIVE FORMAT (invoke_model)
+        return {
+            "schemaVersion": "messages-v1",  # ✅ Required for Nova [web:216]
+            "messages": messages,
+            "inferenceConfig": {  # ✅ Nova-specific params
+                "max_new_tokens": max_new_tokens,  # ✅ Use max_new_tokens (not maxTokens) [web:218]
+                "temperature": 0.7,
+                "top_p": 0.9,  # ✅ top_p (not topP)
+                "top_k": 50
+            }
+        }
+    
+    @staticmethod
+    def _parse_model_json(text: str) -> Dict[str, Any]:
+        """
+        Parse the model's JSON answer, tolerating surrounding prose / markdown fences,
+        raw newlines in strings and truncation (complete issues / test cases of a
+        clipped answer are kept, flagged 'truncated'; see StreamingJSONParser)
+        """
+        return parse_model_json(text)
+    
+    async def _stream_nova_continued(self, prompt: str, agent: str = 'unknown', max_new_tokens: int = 2048) -> AsyncIterator[str]:
+        """
+        _stream_nova, continued (answer so far as prefill) while the model stops at
+        max_new_tokens, up to bedrock_max_continuations extra calls
+        """
+        text = ""
+        for continuation in range(settings.bedrock_max_continuations + 1):
+            stop: Dict[str, str] = {}
+            async for delta in self._stream_nova(prompt, agent, max_new_tokens, prefill=text.rstrip() or None,
+                                                 stop=stop, continuation=continuation > 0):
+                text += delta
+                yield delta
+            if stop.get('reason') != 'max_tokens' or continuation == settings.bedrock_max_continuations:
+                return
+            logger.info("nova_output_truncated_continuing", agent=agent, continuation=continuation + 1,
+                        chars=len(text), streaming=True)
+    
+    async def _stream_nova(
+        self,
+        prompt: str,
+        agent: str = 'unknown',
+        max_new_tokens: int = 2048,
+        prefill: Optional[str] = None,
+        stop: Optional[Dict[str, str]] = None,
+        continuation: bool = False
+    ) -> AsyncIterator[str]:
+        """
+        Stream Nova's text deltas. The blocking event-stream iteration runs on the shared
+        executor and hands chunks to the event loop through a queue. Throttled calls are
+        re-queued like _invoke_model_governed, as long as no text has been yielded yet.
+        The stop reason ("end_turn", "max_tokens" ...) is stored in `stop['reason']`.
+        """
+        request_body = self._nova_request_body(prompt, max_new_tokens, prefill)
+        estimated = estimate_tokens(prompt) + estimate_tokens(prefill or "") + max_new_tokens
+        model_governor = governor.for_model(self.model_id)
+        loop = asyncio.get_running_loop()
+        timer = telemetry.CallTimer(agent, self.model_id)
+        timer.record.continuation = continuation
+        stop = stop if stop is not None else {}
+        attempt = 0
+        
+        while True:
+            permit = await model_governor.acquire(estimated)
+            timer.record.queue_wait_seconds += permit['wait_seconds']
+            queue: asyncio.Queue = asyncio.Queue()
+            cancelled = threading.Event()
+            usage: Dict[str, int] = {}
+            done = object()
             
-            response = self.client.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps(request_body),
-                contentType="application/json",
-                accept="application/json"
-            )
+            def put(item):
+                try:
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+                except RuntimeError:
+                    cancelled.set()  # event loop closed
             
-            # ✅ CORRECT RESPONSE PARSING for Nova invoke_model [web:218][web:222]
-            response_body = json.loads(response['body'].read())
-            text = response_body["output"]["message"]["content"][0]["text"]  # ✅ Path: output > message > content[0] > text
+            def pump():
+                try:
+                    response = self.client.invoke_model_with_response_stream(
+                        modelId=self.model_id,
+                        body=json.dumps(request_body),
+                        contentType="application/json",
+                        accept="application/json"
+                    )
+                    for event in response['body']:
+                        if cancelled.is_set():
+                            break
+                        if 'chunk' not in event:
+                            continue
+                        chunk = json.loads(event['chunk']['bytes'])
+                        text = chunk.get('contentBlockDelta', {}).get('delta', {}).get('text')
+                        if text:
+                            put(text)
+                        if 'messageStop' in chunk:
+                            stop['reason'] = chunk['messageStop'].get('stopReason', '')
+                        if 'metadata' in chunk:
+                            usage.update(chunk['metadata'].get('usage', {}))
+                    put(done)
+                except Exception as e:
+                    put(e)
             
-            # Try to parse JSON safely
+            pumping = loop.run_in_executor(self.executor, pump)
+            yielded = False
+            throttled = False
             try:
-                result = json.loads(text)
-            except json.JSONDecodeError:
-                # Try to extract JSON portion even if wrapped with markdown
-                start = text.find('{')
-                end = text.rfind('}') + 1
-                if start >= 0 and end > start:
-                    json_text = text[start:end]
-                    result = json.loads(json_text)
-                else:
-                    logger.warning("json_extraction_failed", preview=text[:100])
-                    result = {"raw_response": text, "parsed": False}
+                while True:
+                    item = await queue.get()
+                    if item is done:
+                        break
+                    if isinstance(item, Exception):
+                        throttled = is_throttling_error(item)
+                        raise item
+                    yielded = True
+                    yield item
+            except Exception:
+                await model_governor.release(permit, throttled=throttled)
+                if not throttled or yielded or attempt >= settings.bedrock_max_throttle_retries:
+                    timer.finish('throttled' if throttled else 'error', usage)
+                    raise
+                attempt += 1
+                timer.record.retries = attempt
+                logger.info("bedrock_throttled_requeued", model=self.model_id, attempt=attempt, streaming=True)
+                continue
+            except BaseException:
+                # Consumer went away (generator closed / task cancelled): stop the pump, whose
+                # slot is given back once it has noticed
+                cancelled.set()
+                self._release_when_done(model_governor, permit, pumping)
+                timer.finish('error', usage)
+                raise
             
-            logger.info("nova_invocation_success")
-            return result
-        
-        except Exception as e:
-            logger.error("nova_invocation_failed", error=str(e))
-            return {'error': str(e)}
+            actual = usage.get("inputTokens", 0) + usage.get("outputTokens", 0)
+            await model_governor.release(permit, actual_tokens=actual or None)
+            timer.record.stop_reason = stop.get('reason', '')
+            timer.finish('success', usage)
+            return
+    
+    async def _invoke_model_governed(
+        self,
+        request_body: Dict[str, Any],
+        estimated_tokens: int,
+        agent: str = 'unknown',
+        continuation: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Invoke through the per-model governor: wait for RPM/TPM/concurrency budget, re-queue on throttling.
+        Every call is recorded in telemetry (tokens from Nova's `usage` block, latency, retries, stop reason).
+        """
+        model_governor = governor.for_model(self.model_id)
+        timer = telemetry.CallTimer(agent, self.model_id)
+        timer.record.continuation = continuation
+        attempt = 0
+        while True:
+            mark_queued()
+            permit = await model_governor.acquire(estimated_tokens)
+            mark_admitted()
+            timer.record.queue_wait_seconds += permit['wait_seconds']
+            # The slot is released however the call ends (including a cancelled task)
+            release: Optional[Dict[str, Any]] = {}
+            outcome, usage = 'cancelled', {}
+            call = asyncio.ensure_future(self._invoke_model_async(request_body))
+            try:
+                response_body = await asyncio.shield(call)
+                usage = response_body.get("usage", {})
+                actual = usage.get("inputTokens", 0) + usage.get("outputTokens", 0)
+                release = {'actual_tokens': actual or None}
+                outcome = 'success'
+                timer.record.stop_reason = response_body.get("stopReason", "")
+                return response_body
+            except asyncio.CancelledError as e:
+                # Attempt timed out or lost a hedge race: the executor thread finishes on its own,
+                # and only then is its slot given back
+                outcome = 'timeout' if 'timeout' in e.args else 'cancelled'
+                release = None
+                self._release_when_done(model_governor, permit, call)
+                raise
+            except Exception as e:
+                throttled = is_throttling_error(e)
+                release = {'throttled': throttled}
+                outcome = 'throttled' if throttled else 'error'
+                if not throttled or attempt >= settings.bedrock_max_throttle_retries:
+                    raise
+                attempt += 1
+                timer.record.retries = attempt
+                outcome = 'requeued'
+                logger.info("bedrock_throttled_requeued", model=self.model_id, attempt=attempt)
+            finally:
+                if release is not None:
+                    await model_governor.release(permit, **release)
+                if outcome != 'requeued':
+                    timer.finish(outcome, usage)
+    
+    @staticmethod
+    def _release_when_done(model_governor, permit: Dict[str, Any], call: asyncio.Future):
+        """Release an abandoned call's permit once the call itself ends (no additive increase)"""
+        def release(call: asyncio.Future):
+            throttled, actual = False, None
+            if not call.cancelled():
+                error = call.exception()
+                if error is None:
+                    usage = (call.result() or {}).get("usage", {})
+                    actual = (usage.get("inputTokens", 0) + usage.get("outputTokens", 0)) or None
+                else:
+                    throttled = is_throttling_error(error)
+            run_in_background(model_governor.release(permit, throttled=throttled, actual_tokens=actual, abandoned=True))
+        call.add_done_callback(release)
+    
+    async def _invoke_model_async(self, request_body: Dict[str, Any]) -> Dict[str, Any]:
+        """Run invoke_model (and the body read) in the bounded executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._invoke_model_sync, request_body)
+    
+    def _invoke_model_sync(self, request_body: Dict[str, Any]) -> Dict[str, Any]:
+        """Blocking invoke_model call - only ever called from the executor"""
+        response = self.client.invoke_model(
+            modelId=self.model_id,
+            body=json.dumps(request_body),
+            contentType="application/json",
+            accept="application/json"
+        )
+        return json.loads(response['body'].read())
 
 
 # Test function (Updated: Test with LTM prompts)
@@ -1,6 +1,8 @@
 # app/api/v1/endpoints.py
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from datetime import datetime
+import json
 import time
 import uuid
 import structlog
@@ -43,7 +45,10 @@ async def analyze_code(request: AnalyzeCodeRequest):
         result = await analyzer.analyze_code(
             code=request.code,
             language=request.language,
-            filename=request.filename
+            filename=request.filename,
+            prompt_mode=request.prompt_mode,
+            review_depth=request.review_depth,
+            deadline=time.monotonic() + request.deadline_seconds if request.deadline_seconds else None
         )
         
         # Calculate execution time
@@ -80,6 +85,59 @@ async def analyze_code(request: AnalyzeCodeRequest):
             detail=f"Analysis failed: {str(e)}"
         )
 
+@router.post("/analyze/code/stream")
+async def analyze_code_stream(request: AnalyzeCodeRequest):
+    """
+    Streaming variant of /analyze/code (NDJSON: one JSON event per line)
+    
+    Issues are sent as soon as the code review agent emits them, followed by one
+    `agent_complete` event per agent (code review first, then tests and docs) and
+    a final `complete` event carrying the same result as /analyze/code.
+    Streaming always uses separate per-agent calls (`prompt_mode` is ignored).
+    """
+    start_time = time.time()
+    request_id = f"req-{uuid.uuid4().hex[:8]}"
+    
+    logger.info(
+        "analyze_code_stream_request",
+        request_id=request_id,
+        language=request.language,
+        code_length=len(request.code)
+    )
+    
+    async def event_stream():
+        yield json.dumps({"event": "started", "request_id": request_id, "language": request.language}) + "\n"
+        first_issue_logged = False
+        try:
+            async for event in analyzer.stream_analysis(
+                code=request.code,
+                language=request.language,
+                filename=request.filename,
+                review_depth=request.review_depth
+            ):
+                elapsed_ms = int((time.time() - start_time) * 1000)
+                if event["event"] == "issue" and not first_issue_logged:
+                    first_issue_logged = True
+                    logger.info("analyze_code_stream_first_issue", request_id=request_id, latency_ms=elapsed_ms)
+                if event["event"] == "complete":
+                    event["execution_time_ms"] = elapsed_ms
+                yield json.dumps(event, default=str) + "\n"
+            
+            logger.info(
+                "analyze_code_stream_success",
+                request_id=request_id,
+                execution_time_ms=int((time.time() - start_time) * 1000)
+            )
+        except Exception as e:
+            logger.error("analyze_code_stream_failed", request_id=request_id, error=str(e))
+            yield json.dumps({"event": "error", "request_id": request_id, "detail": f"Analysis failed: {str(e)}"}) + "\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/analyze/pr", response_model=AnalyzeResponse)
 async def analyze_pr(request: AnalyzePRRequest):
     """
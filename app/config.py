@@ -81,7 +81,7 @@
 # app/config.py (Full: Fixed Optional Fields + Memory Integration)
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import Optional
+from typing import Any, Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -96,10 +96,68 @@ class Settings(BaseSettings):
     
     # ===== REDIS =====
     redis_url: str = "redis://localhost:6379/0"
-    
+
+    # ===== ANALYSIS RESULT CACHE =====
+    analysis_cache_backend: str = "memory"  # memory | redis | none
+    analysis_cache_ttl_seconds: int = 86400  # Cached agent results expire after a day
+    analysis_cache_max_entries: int = 1024  # LRU bound for the in-process backend
+
+    # ===== AST PARSING =====
+    ast_tree_cache_max_entries: int = 256  # Parse trees kept per process, keyed by (repo, path), for incremental re-parsing
+    ast_process_pool_enabled: bool = True  # Parse PR files in worker processes (False: on the event loop)
+    ast_process_workers: int = 0  # Worker processes (0 = one per CPU); each file always goes to the same worker
+
+    # ===== PROMPTS =====
+    analysis_prompt_mode: str = "separate"  # separate (one prompt per agent) | shared (code sent once, one multi-task call) - per-request override
+    shared_prompt_max_new_tokens: int = 5000  # Output budget of the shared call (it answers for all three agents)
+
+    # ===== REVIEW DEPTH (quick | standard | thorough execution plans) =====
+    review_quick_max_new_tokens: int = 768  # Security-only compact review
+    review_standard_max_new_tokens: int = 2048
+    review_thorough_max_new_tokens: int = 4096
+    review_thorough_max_chunks: int = 12  # Per-function review calls per file (functions are grouped beyond this)
+    review_thorough_chunk_tokens: int = 1200  # THOROUGH splits every file into function-sized chunks of about this size
+
+    # ===== CHUNKING (whole files larger than one review prompt) =====
+    chunk_file_token_threshold: int = 6000  # Whole-file reviews above this many estimated code tokens are chunked at any depth
+    chunk_target_tokens: int = 3000  # Estimated tokens per chunk view (shared header included)
+    chunk_header_max_tokens: int = 600  # Imports / globals repeated at the top of every chunk
+    chunk_max_chunks: int = 24  # The target grows for files that would need more chunks
+    chunk_max_concurrency: int = 4  # Chunk reviews of one file in flight at once
+
+    # ===== JOB QUEUE (webhook-triggered analyses) =====
+    job_queue_backend: str = "redis"  # redis (uses redis_url, falls back to sqlite) | sqlite | none (inline BackgroundTasks)
+    job_queue_sqlite_path: str = "./devagent_jobs.db"
+    job_workers_in_process: bool = True  # Also run workers inside the API process (set False when running app.jobs.worker separately)
+    job_worker_concurrency: int = 2  # Analyses run at once per worker process
+    job_poll_interval_seconds: float = 1.0
+    job_max_attempts: int = 4
+    job_retry_base_seconds: float = 10.0  # Backoff: base * 2^(attempt-1), jittered, capped below
+    job_retry_max_seconds: float = 300.0
+    job_visibility_timeout_seconds: int = 900  # Running jobs older than this are assumed lost and re-queued
+    job_dedup_ttl_seconds: int = 86400  # How long a (repo, PR, head SHA) stays deduplicated
+
     # ===== GITHUB =====
     github_token: Optional[str] = None
     github_webhook_secret: Optional[str] = None  # FIXED: Optional, not required
+    github_api_url: str = "https://api.github.com"
+    github_request_timeout_seconds: int = 10
+    github_max_concurrent_fetches: int = 8  # Parallel raw-content fetches (also sizes the keep-alive pool)
+
+    # ===== PR ANALYSIS =====
+    pr_analysis_mode: str = "per_file"  # per_file (fan-out, one task per file) | combined (single concatenated prompt)
+    pr_analysis_max_concurrency: int = 4  # Files analyzed at once in per_file mode
+    pr_token_budget: int = 60000  # Total estimated input tokens spent on one PR review
+    pr_call_token_budget: int = 12000  # Estimated input tokens per model call (small files are packed together)
+    pr_max_candidate_files: int = 60  # Highest-ranked files fetched and considered per PR
+    pr_analysis_deadline_seconds: int = 180  # No new model calls are started after this
+    pr_response_deadline_seconds: int = 150  # Comment with the agents finished by then, the rest are pending (0 = wait for all)
+    pr_late_results_enabled: bool = True  # Pending agents keep running and the PR comment is edited when they finish
+    pr_review_mode: str = "full"  # full (whole files) | hunks (changed hunks + enclosing functions)
+    pr_review_depth: str = "standard"  # quick | standard | thorough for webhook-triggered reviews
+    pr_incremental_review: bool = True  # On synchronize, re-analyze only files whose blob changed (per_file mode)
+    pr_state_backend: str = "memory"  # memory | redis | none - where per-PR file -> issues state lives
+    pr_state_ttl_seconds: int = 1209600  # Forget PR state after 14 days of inactivity
     
     # ===== JWT =====
     jwt_secret: str = "dev-secret-key-change-in-prod"  # Default for dev, override in .env
@@ -116,6 +174,27 @@ class Settings(BaseSettings):
     memory_stm_retention_days: int = 7  # Short-term memory retention (days)
     memory_ltm_retention_days: int = 365  # Long-term memory retention (days)
     
+    # ===== BEDROCK RUNTIME =====
+    bedrock_max_concurrency: int = 8  # Worker threads (and pooled connections) for blocking invoke_model calls
+    bedrock_read_timeout_seconds: int = 120  # Socket read timeout for a single model call
+    bedrock_requests_per_minute: int = 100  # Per-model RPM budget enforced by the governor
+    bedrock_tokens_per_minute: int = 200000  # Per-model TPM budget (input + output) enforced by the governor
+    bedrock_max_throttle_retries: int = 5  # Throttled calls are re-queued this many times before failing
+    bedrock_max_continuations: int = 2  # Follow-up calls (answer so far as assistant prefill) when an answer stops at max_new_tokens
+    bedrock_input_price_per_1k_tokens: float = 0.0008  # Nova Pro on-demand pricing, used for cost telemetry
+    bedrock_output_price_per_1k_tokens: float = 0.0032
+
+    # ===== AGENT CALL POLICY (timeout / retry / hedging of each agent's model calls) =====
+    agent_attempt_timeout_seconds: float = 90.0  # One attempt of an agent call (a hedged duplicate races inside it)
+    agent_deadline_seconds: float = 200.0  # All attempts of one agent call, backoff included
+    agent_max_retries: int = 2  # Retries on timeouts / transient Bedrock errors (not on bad requests)
+    agent_retry_base_seconds: float = 1.0  # Backoff: base * 2^(retry-1), jittered, capped below
+    agent_retry_max_seconds: float = 10.0
+    agent_hedge_enabled: bool = True  # Send a duplicate request when an attempt outlives the agent's p95 latency
+    agent_hedge_percentile: float = 0.95
+    agent_hedge_min_samples: int = 20  # Successful calls of the agent observed before hedging starts
+    agent_policy_overrides: Dict[str, Dict[str, Any]] = {}  # Per agent, e.g. {"documentation": {"timeout_seconds": 30, "hedge": false}}
+
     # ===== BEDROCK IAM ROLE =====
     bedrock_role_arn: Optional[str] = None
     
@@ -0,0 +1,236 @@
+# app/core/agent_policy.py (Per-agent model call policy: attempt timeouts, jittered retries, hedging after the p95 latency)
+import asyncio
+import dataclasses
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+import structlog
+from app.config import get_settings
+from app.core import telemetry
+from app.core.rate_limiter import THROTTLING_ERROR_CODES
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+T = TypeVar("T")
+
+# botocore error codes worth another attempt (throttling only reaches here once the governor gave up re-queueing)
+RETRYABLE_ERROR_CODES = THROTTLING_ERROR_CODES | {
+    "ModelTimeoutException", "ModelNotReadyException", "ModelErrorException",
+    "ServiceUnavailableException", "InternalServerException"
+}
+
+# Transport errors without an error code (connection resets, socket timeouts)
+RETRYABLE_EXCEPTIONS = {"EndpointConnectionError", "ConnectionClosedError", "ReadTimeoutError", "ConnectTimeoutError"}
+
+LATENCY_WINDOW = 200  # Successful attempts kept per agent for the hedging percentile
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """True for attempt timeouts, transient Bedrock errors and dropped connections"""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    code = (getattr(error, "response", None) or {}).get("Error", {}).get("Code")
+    if code:
+        return code in RETRYABLE_ERROR_CODES
+    return type(error).__name__ in RETRYABLE_EXCEPTIONS
+
+
+@dataclass(frozen=True)
+class AgentPolicy:
+    """How one agent's model calls are timed out, retried and hedged"""
+    timeout_seconds: float = 90.0  # One attempt (hedged requests race within it)
+    deadline_seconds: float = 200.0  # Every attempt of one agent call, retries and backoff included
+    max_retries: int = 2
+    retry_base_seconds: float = 1.0
+    retry_max_seconds: float = 10.0
+    hedge: bool = True
+    hedge_percentile: float = 0.95
+    hedge_min_samples: int = 20
+
+    def retry_delay(self, retries: int) -> float:
+        """Exponential backoff with jitter before the given retry (1-based)"""
+        ceiling = min(self.retry_max_seconds, self.retry_base_seconds * (2 ** max(0, retries - 1)))
+        return random.uniform(ceiling / 2, ceiling)
+
+
+def policy_for(agent: str) -> AgentPolicy:
+    """The configured defaults with the agent's entry of agent_policy_overrides applied"""
+    policy = AgentPolicy(
+        timeout_seconds=settings.agent_attempt_timeout_seconds,
+        deadline_seconds=settings.agent_deadline_seconds,
+        max_retries=settings.agent_max_retries,
+        retry_base_seconds=settings.agent_retry_base_seconds,
+        retry_max_seconds=settings.agent_retry_max_seconds,
+        hedge=settings.agent_hedge_enabled,
+        hedge_percentile=settings.agent_hedge_percentile,
+        hedge_min_samples=settings.agent_hedge_min_samples
+    )
+    overrides = settings.agent_policy_overrides.get(agent)
+    if not overrides:
+        return policy
+    try:
+        return dataclasses.replace(policy, **overrides)
+    except TypeError as e:
+        logger.warning("agent_policy_override_invalid", agent=agent, error=str(e))
+        return policy
+
+
+class LatencyTracker:
+    """Rolling window of successful attempt latencies per agent"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, agent: str, seconds: float):
+        self._samples.setdefault(agent, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, agent: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """q-th percentile (0..1) of the agent's latencies, None until min_samples are seen"""
+        samples = self._samples.get(agent)
+        if not samples or len(samples) < max(1, min_samples):
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            agent: {
+                'samples': len(samples),
+                'p50_seconds': round(self.percentile(agent, 0.5), 3),
+                'p95_seconds': round(self.percentile(agent, 0.95), 3)
+            }
+            for agent, samples in self._samples.items() if samples
+        }
+
+
+# Global tracker (hedging delays are learned per process)
+latencies = LatencyTracker()
+
+
+class AttemptClock:
+    """Run time of one request of an attempt, not counting time spent queued for the model governor"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.queued_seconds = 0.0
+        self._queued_since: Optional[float] = None
+
+    def queued(self):
+        if self._queued_since is None:
+            self._queued_since = time.monotonic()
+
+    def admitted(self):
+        if self._queued_since is not None:
+            self.queued_seconds += time.monotonic() - self._queued_since
+            self._queued_since = None
+
+    def elapsed(self) -> float:
+        now = time.monotonic()
+        waiting = now - self._queued_since if self._queued_since is not None else 0.0
+        return now - self.started - self.queued_seconds - waiting
+
+
+# Clock of the request running in the current task (set by _start)
+_clock: ContextVar[Optional[AttemptClock]] = ContextVar("agent_attempt_clock", default=None)
+
+
+def mark_queued():
+    """The model call starts waiting for a governor permit: its attempt's clock stops"""
+    clock = _clock.get()
+    if clock is not None:
+        clock.queued()
+
+
+def mark_admitted():
+    """The model call holds its governor permit: its attempt's timeout / hedge clock runs again"""
+    clock = _clock.get()
+    if clock is not None:
+        clock.admitted()
+
+
+async def call_with_policy(
+    agent: str,
+    call: Callable[[], Awaitable[T]],
+    policy: Optional[AgentPolicy] = None,
+    deadline: Optional[float] = None
+) -> T:
+    """
+    Run `call` under the agent's policy: each attempt is bounded by timeout_seconds
+    and hedged (a second, identical call races the first) once it outlives the
+    agent's p95; retryable failures are retried with jittered backoff until
+    max_retries or the deadline (time.monotonic() value, default now + deadline_seconds).
+    Time the call spends queued for the model governor (between mark_queued() and
+    mark_admitted()) counts against the deadline only, not the timeout or hedge delay.
+
+    `call` must be safe to run more than once. Each attempt's model calls are tagged
+    with the attempt number and hedge flag in telemetry.
+    """
+    policy = policy or policy_for(agent)
+    deadline = deadline if deadline is not None else time.monotonic() + policy.deadline_seconds
+    retries = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise asyncio.TimeoutError(f"{agent} call deadline exceeded after {retries} retries")
+        try:
+            return await _attempt(agent, call, policy, deadline, retries + 1)
+        except Exception as e:
+            if not is_retryable_error(e) or retries >= policy.max_retries:
+                raise
+            retries += 1
+            delay = min(policy.retry_delay(retries), max(0.0, deadline - time.monotonic()))
+            logger.warning("agent_call_retrying", agent=agent, retry=retries, delay_seconds=round(delay, 2),
+                           error=str(e) or type(e).__name__)
+            await asyncio.sleep(delay)
+
+
+async def _attempt(agent: str, call: Callable[[], Awaitable[T]], policy: AgentPolicy, deadline: float, attempt: int) -> T:
+    """One attempt: the call, plus a hedged duplicate if it runs past the p95 (queue time excluded)"""
+    timeout = policy.timeout_seconds
+    hedge_after = latencies.percentile(agent, policy.hedge_percentile, policy.hedge_min_samples) if policy.hedge else None
+    primary = AttemptClock()
+    tasks: Dict[asyncio.Task, AttemptClock] = {_start(call, attempt, hedged=False, clock=primary): primary}
+    cancel_reason = "cancelled"
+    try:
+        while True:
+            hedge_due = hedge_after is not None and len(tasks) == 1
+            wait = (min(timeout, hedge_after) if hedge_due else timeout) - primary.elapsed()
+            wait = min(wait, deadline - time.monotonic())
+            done, _ = await asyncio.wait([t for t in tasks if not t.done()], timeout=max(0.0, wait),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    latencies.observe(agent, tasks[task].elapsed())
+                    cancel_reason = "hedge_lost"
+                    return task.result()
+            if done and all(t.done() for t in tasks):
+                raise next(iter(done)).exception()
+            if done:
+                continue  # The other request is still running
+            if primary.elapsed() >= timeout or time.monotonic() >= deadline:
+                cancel_reason = "timeout"
+                raise asyncio.TimeoutError(f"{agent} attempt {attempt} timed out after {primary.elapsed():.1f}s")
+            if hedge_due and primary.elapsed() >= hedge_after:
+                logger.info("agent_call_hedged", agent=agent, attempt=attempt, after_seconds=round(hedge_after, 2))
+                hedge = AttemptClock()
+                tasks[_start(call, attempt, hedged=True, clock=hedge)] = hedge
+            # Otherwise the request was queued for the governor meanwhile: its clock is behind, keep waiting
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel(cancel_reason)
+            elif not task.cancelled():
+                task.exception()  # Retrieved, so a failed loser is not reported as unhandled
+
+
+def _start(call: Callable[[], Awaitable[T]], attempt: int, hedged: bool, clock: AttemptClock) -> asyncio.Task:
+    async def run():
+        telemetry.current_attempt.set((attempt, hedged))
+        _clock.set(clock)
+        return await call()
+    return asyncio.ensure_future(run())
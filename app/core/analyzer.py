@@ -344,13 +344,81 @@
 
 # app/core/analyzer.py (COMPLETE FIXED - Production Ready)
 import uuid
-from typing import List
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
 import structlog
-from app.models import CodeIssue, Severity, IssueCategory, CodeReviewResult
-from app.agents.multi_agent_orchestrator import MultiAgentOrchestrator
+from app.config import get_settings
+from app.models import CodeIssue, Severity, IssueCategory, CodeReviewResult, PromptMode, ReviewDepth
+from app.agents.multi_agent_orchestrator import MultiAgentOrchestrator, run_in_background
 from app.core.parsers.ast_parser import parser as ast_parser
+from app.core.parsers.symbols import FileSymbols
+from app.core import telemetry
+from app.core.diff import view_line_numbers
+from app.core.rules import rule_engine, is_covered, covered_summary
+from app.core.chunker import Chunk, chunker
+from app.utils.tokens import estimate_tokens
 
 logger = structlog.get_logger()
+settings = get_settings()
+
+# Version of the prompt templates built below - part of the analysis cache key, bump on any prompt change
+PROMPT_TEMPLATE_VERSION = "enhanced-v2"
+
+# Prepended to diff-hunk views (see app/core/diff.py) so the model reports absolute file lines
+HUNK_VIEW_NOTE = (
+    "(Diff view: only the changed regions of the file are shown. Each line starts with its "
+    "absolute file line number; '+' marks changed lines. Focus on the changed lines and "
+    "report line numbers exactly as shown in the left margin.)"
+)
+
+# Stands in for the code inside each task of a shared-context prompt (the code itself is sent once)
+SHARED_CODE_REF = "(the code shown once in the **Code** section above)"
+
+# Prepended to chunk views (large files, THOROUGH per-function reviews)
+CHUNK_VIEW_NOTE = (
+    "(Partial view: only part of the file is shown. Each line starts with its absolute file "
+    "line number. Review only the code shown and report line numbers exactly as shown in the left margin.)"
+)
+
+# What each review depth runs: agents, prompt style, output budget, per-function chunking
+EXECUTION_PLANS = {
+    ReviewDepth.QUICK: {
+        'agents': ('code_review',),
+        'compact_prompt': True,
+        'max_new_tokens': settings.review_quick_max_new_tokens,
+        'chunk_functions': False
+    },
+    ReviewDepth.STANDARD: {
+        'agents': ('code_review', 'testing', 'documentation'),
+        'compact_prompt': False,
+        'max_new_tokens': settings.review_standard_max_new_tokens,
+        'chunk_functions': False
+    },
+    ReviewDepth.THOROUGH: {
+        'agents': ('code_review', 'testing', 'documentation'),
+        'compact_prompt': False,
+        'max_new_tokens': settings.review_thorough_max_new_tokens,
+        'chunk_functions': True
+    }
+}
+
+# Agent result cache statuses that are not a finished run (anything else is 'done')
+UNFINISHED_AGENT_STATUSES = ('skipped', 'pending', 'timed_out', 'error')
+
+
+def agent_status(result: Dict[str, Any]) -> Dict[str, str]:
+    """Per-agent outcome of an orchestrator result: done | skipped | pending | timed_out | error"""
+    statuses = {}
+    for agent, cache in (result.get('cache') or {}).items():
+        if cache in UNFINISHED_AGENT_STATUSES:
+            statuses[agent] = cache
+        elif 'error' in (result.get('results') or {}).get(agent, {}):
+            statuses[agent] = 'error'
+        else:
+            statuses[agent] = 'done'
+    return statuses
+
 
 class CodeAnalyzer:
     """Code analyzer using Multi-Agent Orchestration with advanced detection"""
@@ -363,49 +431,98 @@ class CodeAnalyzer:
         code: str,
         language: str,
         filename: str = None,
-        ltm_context: str = ""
+        ltm_context: str = "",
+        full_source: Optional[str] = None,
+        prompt_mode: Optional[PromptMode] = None,
+        review_depth: Optional[ReviewDepth] = None,
+        deadline: Optional[float] = None,
+        on_late_result: Optional[Callable[[CodeReviewResult], Awaitable[None]]] = None
     ) -> CodeReviewResult:
-        """Complete code analysis with multi-agent system + advanced detection"""
-        logger.info("analyzing_code_with_multi_agents", language=language, has_ltm_context=bool(ltm_context))
+        """
+        Complete code analysis with multi-agent system + advanced detection
+        
+        When `full_source` is given, `code` is a line-numbered diff-hunk view of it:
+        AST extraction and line refinement run on the full file instead.
+        `prompt_mode` (default: settings.analysis_prompt_mode) picks separate per-agent
+        prompts or one shared-context call that sends the code once (STANDARD depth only).
+        `review_depth` selects the execution plan (see EXECUTION_PLANS).
+        
+        `deadline` (time.monotonic()) returns a partial result with the agents finished by
+        then (separate prompts; chunked files wait for every chunk review). The others
+        are marked in metrics['agent_status']: 'pending' when `on_late_result` is given
+        (they keep running and it receives the complete result), else 'timed_out'.
+        """
+        prompt_mode = PromptMode(prompt_mode or settings.analysis_prompt_mode)
+        review_depth = ReviewDepth(review_depth or ReviewDepth.STANDARD)
+        plan = EXECUTION_PLANS[review_depth]
+        version = f"{PROMPT_TEMPLATE_VERSION}:{review_depth.value}"
+        if review_depth != ReviewDepth.STANDARD:
+            prompt_mode = PromptMode.SEPARATE
+        logger.info("analyzing_code_with_multi_agents", language=language, has_ltm_context=bool(ltm_context), hunk_view=full_source is not None, review_depth=review_depth.value)
         print(f"🔍 Analyzing {language} code with LTM context: {bool(ltm_context)}")
         
+        source = full_source if full_source is not None else code
+        if full_source is not None:
+            code = f"{HUNK_VIEW_NOTE}\n{code}"
+        
         # AST parsing for Python/C++
-        ast_info = {}
-        func_context = var_context = ""
-        if language in ['python', 'cpp']:
-            ast_info = ast_parser.parse_file_content(code, language)
-            functions = ast_info.get('functions', [])
-            secrets = [v for v in ast_info.get('variables', []) if v.get('type') == 'potential_secret']
-            
-            if functions:
-                func_parts = [f"{f['name']} (lines {f['start_line']}-{f['end_line']})" for f in functions]
-                func_context = f"Functions: {', '.join(func_parts)}"
-            else:
-                func_context = "No functions detected"
-            
-            if secrets:
-                secret_parts = [f"{v['name']} at line {v['line']}" for v in secrets]
-                var_context = f"Potential secrets: {', '.join(secret_parts)}"
-            else:
-                var_context = "No hardcoded secrets detected"
-            
-            logger.info("ast_enhanced_analysis", functions=len(functions), secrets=len(secrets))
-            print(f"🌳 AST Parsed ({language}): {len(functions)} functions, {len(secrets)} secrets")
+        tree_key = self._tree_key(filename)
+        ast_info, func_context, var_context = self._ast_context(source, language, tree_key)
         
-        # Build ENHANCED prompts with advanced detection rules
-        code_review_prompt = self._build_enhanced_code_review_prompt(code, language, filename, ltm_context, func_context, var_context)
-        testing_prompt = self._build_testing_prompt(code, language, filename, ltm_context, func_context)
-        docs_prompt = self._build_docs_prompt(code, language, filename, ltm_context, func_context)
+        # Deterministic rule findings: reported as-is, the model is told not to repeat them
+        static_issues = self._static_issues(source, language, view_line_numbers(code) if full_source is not None else None, tree_key)
+        static_context = covered_summary(static_issues)
         
-        # Get multi-agent analysis
-        result = await self.orchestrator.analyze_code(
-            code=code,
-            language=language,
-            filename=filename,
-            code_review_prompt=code_review_prompt,
-            testing_prompt=testing_prompt,
-            docs_prompt=docs_prompt
-        )
+        # Build ENHANCED prompts with advanced detection rules (compact security-only prompt for QUICK)
+        if plan['compact_prompt']:
+            code_review_prompt = self._build_quick_review_prompt(code, language, filename, var_context, static_context)
+        else:
+            code_review_prompt = self._build_enhanced_code_review_prompt(code, language, filename, ltm_context, func_context, var_context, static_context)
+        testing_prompt = self._build_testing_prompt(code, language, filename, ltm_context, func_context) if 'testing' in plan['agents'] else None
+        docs_prompt = self._build_docs_prompt(code, language, filename, ltm_context, func_context) if 'documentation' in plan['agents'] else None
+        
+        separate_tokens = sum(estimate_tokens(p) for p in (code_review_prompt, testing_prompt, docs_prompt) if p)
+        
+        # Whole files: THOROUGH reviews function-sized chunks, other depths chunk files too large for one prompt
+        chunks: List[Chunk] = []
+        if full_source is None:
+            if plan['chunk_functions']:
+                chunks = chunker.split(source, language, ast_info, settings.review_thorough_chunk_tokens,
+                                       settings.review_thorough_max_chunks, settings.chunk_header_max_tokens, tree_key)
+            elif estimate_tokens(source) > settings.chunk_file_token_threshold:
+                chunks = chunker.split(source, language, ast_info, settings.chunk_target_tokens,
+                                       settings.chunk_max_chunks, settings.chunk_header_max_tokens, tree_key)
+        
+        # Get multi-agent analysis (every model call / cache hit is collected for the telemetry summary)
+        with telemetry.collect() as calls:
+            if len(chunks) > 1:
+                prompt_tokens, result = await self._analyze_chunked(
+                    code, language, filename, ltm_context, ast_info, var_context, static_context,
+                    chunks, testing_prompt, docs_prompt, plan, version, deadline
+                )
+            elif prompt_mode == PromptMode.SHARED:
+                shared_prompt = self._build_shared_prompt(code, language, filename, ltm_context, func_context, var_context, static_context)
+                prompt_tokens = estimate_tokens(shared_prompt)
+                result = await self.orchestrator.analyze_code_shared(
+                    code=code,
+                    language=language,
+                    prompt=shared_prompt,
+                    prompt_version=version
+                )
+            else:
+                prompt_tokens = separate_tokens
+                result = await self.orchestrator.analyze_code(
+                    code=code,
+                    language=language,
+                    filename=filename,
+                    code_review_prompt=code_review_prompt,
+                    testing_prompt=testing_prompt,
+                    docs_prompt=docs_prompt,
+                    prompt_version=version,
+                    agents=plan['agents'],
+                    max_new_tokens=plan['max_new_tokens'],
+                    deadline=deadline
+                )
         
         if not result['success']:
             logger.error("analysis_failed", error=result.get('error'))
@@ -415,46 +532,371 @@ class CodeAnalyzer:
                 metrics={'error': True}
             )
         
-        results = result['results']
-        
-        # Parse code review issues
-        issues = []
-        code_review = results.get('code_review', {})
+        def finish(result: Dict[str, Any]) -> CodeReviewResult:
+            """Issues, metrics and summary from the agent results (re-run when late agents finish)"""
+            results = result['results']
+            
+            # Parse code review issues
+            code_review = results.get('code_review', {})
+            issues = []
+            for issue_data in code_review.get('issues') or []:
+                issue = self._parse_issue(issue_data, ltm_context)
+                if issue is not None:
+                    issues.append(issue)
+            
+            # Refine issue lines with AST
+            for issue in issues:
+                self._refine_issue_line(issue, source, language)
+            issues = static_issues + [i for i in issues if not is_covered(i, static_issues)]
+            
+            review = self._build_result(
+                issues, code_review, results.get('testing', {}), results.get('documentation', {}),
+                ltm_context, ast_info, result.get('cache', {})
+            )
+            review.metrics['review_depth'] = review_depth.value
+            review.metrics['agents_run'] = list(plan['agents'])
+            review.metrics['chunks'] = len(chunks) if len(chunks) > 1 else 1
+            review.metrics['static_findings'] = len(static_issues)
+            # Estimated input tokens sent, vs. what separate prompts would have cost
+            review.metrics['prompt_mode'] = prompt_mode.value
+            review.metrics['prompt_tokens'] = {
+                'estimated_input_tokens': prompt_tokens,
+                'separate_mode_tokens': separate_tokens,
+                'saved_tokens': separate_tokens - prompt_tokens,
+                'saved_pct': round(100.0 * (separate_tokens - prompt_tokens) / separate_tokens, 1) if separate_tokens else 0.0
+            }
+            review.metrics['telemetry'] = telemetry.summarize(calls)  # Late agents' calls included
+            review.metrics['agent_status'] = agent_status(result)
+            review.metrics['agents_pending'] = [a for a, s in review.metrics['agent_status'].items() if s == 'pending']
+            return review
         
-        if 'issues' in code_review:
-            for issue_data in code_review['issues']:
+        pending = result.get('pending') or {}
+        if pending and on_late_result is None:
+            for task in pending.values():
+                task.cancel()
+            result['cache'].update(dict.fromkeys(pending, 'timed_out'))
+        review = finish(result)
+        if pending:
+            review.summary += f" ({', '.join(pending)}: {'still running' if on_late_result else 'timed out'})"
+            if on_late_result is not None:
+                run_in_background(self._complete_late(result, pending, finish, on_late_result))
+        return review
+    
+    async def _complete_late(
+        self,
+        result: Dict[str, Any],
+        pending: Dict[str, asyncio.Task],
+        finish: Callable[[Dict[str, Any]], CodeReviewResult],
+        on_late_result: Callable[[CodeReviewResult], Awaitable[None]]
+    ):
+        """
+        Wait for the agents that missed the deadline, then hand the complete result to
+        on_late_result. It is called however this ends (agents that were cancelled, or
+        still running when this task is cancelled, are marked 'timed_out'), so callers
+        waiting on it are never left hanging.
+        """
+        try:
+            for agent, task in pending.items():
                 try:
-                    description = issue_data.get('description', '')
-                    if ltm_context and 'similar' not in description.lower():
-                        description += f" [Pattern detected from LTM: Check past fixes in this repo]"
-                    
-                    issues.append(CodeIssue(
-                        id=f"issue-{uuid.uuid4().hex[:8]}",
-                        severity=Severity(issue_data.get('severity', 'MEDIUM')),
-                        category=IssueCategory(issue_data.get('category', 'security')),
-                        type=issue_data.get('type', 'unknown'),
-                        message=issue_data.get('message', ''),
-                        description=description,
-                        line=issue_data.get('line'),
-                        suggestion=issue_data.get('suggestion', ''),
-                        fixed_code=issue_data.get('fixed_code')
-                    ))
+                    result['results'][agent], result['cache'][agent] = await task
+                except asyncio.CancelledError:
+                    if asyncio.current_task().cancelling():
+                        raise  # This task was cancelled, not the agent
+                    result['results'][agent], result['cache'][agent] = {'error': 'cancelled'}, 'timed_out'
                 except Exception as e:
-                    logger.warning("failed_to_parse_issue", error=str(e))
+                    logger.error("late_agent_failed", agent=agent, error=str(e))
+                    result['results'][agent], result['cache'][agent] = {'error': str(e)}, 'error'
+        finally:
+            for agent, task in pending.items():
+                if not task.done():
+                    task.cancel()
+                if result['cache'].get(agent) == 'pending':
+                    result['results'][agent], result['cache'][agent] = {'error': 'cancelled'}, 'timed_out'
+            review = finish(result)
+            review.metrics['late_agents'] = list(pending)
+            logger.info("late_agents_complete", agents=list(pending), issues_count=len(review.issues))
+            try:
+                await on_late_result(review)
+            except Exception as e:
+                logger.error("late_result_delivery_failed", agents=list(pending), error=str(e))
+    
+    async def stream_analysis(
+        self,
+        code: str,
+        language: str,
+        filename: str = None,
+        ltm_context: str = "",
+        review_depth: Optional[ReviewDepth] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of analyze_code. Yields events in this order:
         
-        # Refine issue lines with AST
-        if issues and language in ['python', 'cpp']:
-            for issue in issues:
-                approx = issue.line or 1
-                exact = ast_parser.get_exact_line_for_issue(code, issue.type or 'general', approx, language)
-                if exact != approx:
-                    issue.line = exact
-                    logger.info("ast_line_refined", old=approx, new=exact, issue_type=issue.type)
+            {'event': 'issue', 'issue': {...}}                    - static rule findings first, then each
+                                                                    model issue as soon as it is parsed
+            {'event': 'agent_complete', 'agent': 'code_review', ...}
+            {'event': 'agent_complete', 'agent': 'testing' | 'documentation', ...}  - as each finishes
+            {'event': 'complete', 'result': {...}}                - same shape as analyze_code's result
+        
+        Testing and documentation agents start right away and run while code review streams.
+        `review_depth` picks the agents, prompt and output budget (THOROUGH is not chunked here).
+        """
+        review_depth = ReviewDepth(review_depth or ReviewDepth.STANDARD)
+        plan = EXECUTION_PLANS[review_depth]
+        version = f"{PROMPT_TEMPLATE_VERSION}:{review_depth.value}"
+        logger.info("streaming_analysis_started", language=language, has_ltm_context=bool(ltm_context))
+        print(f"📡 Streaming {language} analysis with LTM context: {bool(ltm_context)}")
+        
+        ast_info, func_context, var_context = self._ast_context(code, language)
+        static_issues = self._static_issues(code, language)
+        static_context = covered_summary(static_issues)
+        if plan['compact_prompt']:
+            code_review_prompt = self._build_quick_review_prompt(code, language, filename, var_context, static_context)
+        else:
+            code_review_prompt = self._build_enhanced_code_review_prompt(code, language, filename, ltm_context, func_context, var_context, static_context)
+        followup_prompts = {
+            'testing': lambda: self._build_testing_prompt(code, language, filename, ltm_context, func_context),
+            'documentation': lambda: self._build_docs_prompt(code, language, filename, ltm_context, func_context)
+        }
+        
+        async def run_followup(agent: str, prompt: str):
+            return agent, await self.orchestrator.run_agent(agent, code, language, prompt, version, plan['max_new_tokens'])
+        
+        # The follow-up tasks are created inside the block so they inherit the collector
+        with telemetry.collect() as calls:
+            followups = [
+                asyncio.ensure_future(run_followup(agent, build_prompt()))
+                for agent, build_prompt in followup_prompts.items()
+                if agent in plan['agents']
+            ]
+        
+            try:
+                issues: List[CodeIssue] = list(static_issues)
+                for issue in static_issues:
+                    yield {'event': 'issue', 'agent': 'static_rules', 'issue': issue.dict()}
+            
+                code_review: Dict[str, Any] = {}
+                cache_status: Dict[str, str] = {}
+                async for event in self.orchestrator.stream_code_review(code, language, code_review_prompt, version, plan['max_new_tokens']):
+                    if event['type'] == 'issue':
+                        issue = self._parse_issue(event['issue'], ltm_context)
+                        if issue is None:
+                            continue
+                        self._refine_issue_line(issue, code, language)
+                        if is_covered(issue, static_issues):
+                            continue
+                        issues.append(issue)
+                        yield {'event': 'issue', 'agent': 'code_review', 'issue': issue.dict()}
+                    else:
+                        code_review = event['result']
+                        cache_status['code_review'] = event['cache']
+            
+                yield {
+                    'event': 'agent_complete',
+                    'agent': 'code_review',
+                    'cache': cache_status['code_review'],
+                    'result': {
+                        'issues_found': len(issues) - len(static_issues),
+                        'summary': code_review.get('summary', ''),
+                        'positive_feedback': code_review.get('positive_feedback', []),
+                        'error': code_review.get('error')
+                    }
+                }
+            
+                # Then tests and docs, in completion order
+                agent_results: Dict[str, Dict[str, Any]] = {}
+                for next_done in asyncio.as_completed(followups):
+                    agent, (agent_result, agent_cache) = await next_done
+                    agent_results[agent] = agent_result
+                    cache_status[agent] = agent_cache
+                    yield {'event': 'agent_complete', 'agent': agent, 'cache': agent_cache, 'result': agent_result}
+            finally:
+                for task in followups:
+                    task.cancel()
+        
+        result = self._build_result(
+            issues, code_review, agent_results.get('testing', {}), agent_results.get('documentation', {}),
+            ltm_context, ast_info, cache_status
+        )
+        result.metrics['review_depth'] = review_depth.value
+        result.metrics['agents_run'] = list(plan['agents'])
+        result.metrics['static_findings'] = len(static_issues)
+        result.metrics['telemetry'] = telemetry.summarize(calls)
+        yield {'event': 'complete', 'result': result.dict()}
+    
+    async def _analyze_chunked(
+        self,
+        code: str,
+        language: str,
+        filename: str,
+        ltm_context: str,
+        ast_info: Optional[FileSymbols],
+        var_context: str,
+        static_context: str,
+        chunks: List[Chunk],
+        testing_prompt: Optional[str],
+        docs_prompt: Optional[str],
+        plan: Dict[str, Any],
+        version: str,
+        deadline: Optional[float] = None
+    ) -> tuple:
+        """
+        Code review per chunk (concurrently, at most settings.chunk_max_concurrency at once)
+        + whole-file tests/docs -> (prompt tokens, orchestrator-shaped result).
+        Each chunk's prompt lists only the functions it shows (from `ast_info`).
+        Issue lines are rebased to file lines (see Chunk.rebase) and de-duplicated across chunks.
+        `deadline` applies to tests/docs only (every chunk review is waited for).
+        """
+        lines = code.splitlines()
+        review_prompts = []
+        for chunk in chunks:
+            view = f"{CHUNK_VIEW_NOTE}\n{chunk.render(lines)}"
+            func_context = self._function_context(
+                (name, start, end) for name, start, end in ast_info.function_ranges()
+                if any(start <= last and end >= first for first, last in chunk.ranges)
+            ) if ast_info is not None else ""
+            if plan['compact_prompt']:
+                prompt = self._build_quick_review_prompt(view, language, filename, var_context, static_context)
+            else:
+                prompt = self._build_enhanced_code_review_prompt(view, language, filename, ltm_context, func_context, var_context, static_context)
+            review_prompts.append((view, prompt))
+        
+        logger.info("chunked_review_started", filename=filename, chunks=len(chunks))
+        print(f"🧩 Chunked review: {len(chunks)} chunks of {filename or 'code'}")
         
-        # Metrics
-        testing = results.get('testing', {})
-        docs = results.get('documentation', {})
+        semaphore = asyncio.Semaphore(max(1, settings.chunk_max_concurrency))
         
+        async def review(view: str, prompt: str):
+            async with semaphore:
+                return await self.orchestrator.run_agent('code_review', view, language, prompt, version, plan['max_new_tokens'])
+        
+        reviews = [review(view, prompt) for view, prompt in review_prompts]
+        others = self.orchestrator.analyze_code(
+            code=code,
+            language=language,
+            filename=filename,
+            testing_prompt=testing_prompt,
+            docs_prompt=docs_prompt,
+            prompt_version=version,
+            agents=tuple(a for a in plan['agents'] if a != 'code_review'),
+            max_new_tokens=plan['max_new_tokens'],
+            deadline=deadline
+        )
+        *chunk_results, result = await asyncio.gather(*reviews, others)
+        
+        code_review: Dict[str, Any] = {'issues': [], 'positive_feedback': []}
+        errors = []
+        seen = set()
+        for chunk, (chunk_result, _) in zip(chunks, chunk_results):
+            for issue in chunk_result.get('issues') or []:
+                if not isinstance(issue, dict):
+                    continue
+                issue = {**issue, 'line': chunk.rebase(issue.get('line'))}
+                key = (issue['line'], issue.get('type'))
+                if issue['line'] is not None and key in seen:
+                    continue  # Shared header lines are shown (and reported) in every chunk
+                seen.add(key)
+                code_review['issues'].append(issue)
+            for feedback in chunk_result.get('positive_feedback') or []:
+                if feedback not in code_review['positive_feedback']:
+                    code_review['positive_feedback'].append(feedback)
+            if 'error' in chunk_result:
+                errors.append(chunk_result['error'])
+        if errors and len(errors) == len(chunk_results):
+            code_review['error'] = errors[0]
+        
+        result['results']['code_review'] = code_review
+        statuses = {status for _, status in chunk_results}
+        result['cache']['code_review'] = statuses.pop() if len(statuses) == 1 else 'miss'
+        prompt_tokens = sum(estimate_tokens(p) for _, p in review_prompts) + sum(
+            estimate_tokens(p) for p in (testing_prompt, docs_prompt) if p
+        )
+        return prompt_tokens, result
+    
+    @staticmethod
+    def _tree_key(filename: Optional[str]) -> Optional[tuple]:
+        """(repo, path) parse-tree cache key inside a PR analysis (None for ad-hoc code)"""
+        repo = telemetry.current_repo.get()
+        return (repo, filename) if filename and repo != "adhoc" else None
+    
+    def _ast_context(self, source: str, language: str, cache_key: Optional[tuple] = None) -> tuple:
+        """FileSymbols (None for unsupported languages) plus the function / secret context lines used in the prompts"""
+        ast_info = None
+        func_context = var_context = ""
+        if ast_parser.supports(language):
+            ast_info = ast_parser.parse_file_content(source, language, cache_key)
+            secrets = ast_info.secrets()
+            
+            func_context = self._function_context(ast_info.function_ranges())
+            
+            if secrets:
+                secret_parts = [f"{name} at line {line}" for name, line in secrets]
+                var_context = f"Potential secrets: {', '.join(secret_parts)}"
+            else:
+                var_context = "No hardcoded secrets detected"
+            
+            logger.info("ast_enhanced_analysis", functions=ast_info.function_count, secrets=len(secrets))
+            print(f"🌳 AST Parsed ({language}): {ast_info.function_count} functions, {len(secrets)} secrets")
+        return ast_info, func_context, var_context
+    
+    @staticmethod
+    def _function_context(function_ranges: Iterable[Tuple[str, int, int]]) -> str:
+        """Prompt line listing (name, start, end) function ranges"""
+        func_parts = [f"{name} (lines {start}-{end})" for name, start, end in function_ranges]
+        return f"Functions: {', '.join(func_parts)}" if func_parts else "No functions detected"
+    
+    def _static_issues(self, source: str, language: str, shown: Optional[Set[int]] = None,
+                       cache_key: Optional[tuple] = None) -> List[CodeIssue]:
+        """Rule-engine findings for the file (only those on `shown` lines for diff views)"""
+        issues = rule_engine.run(source, language, cache_key)
+        if shown is not None:
+            issues = [i for i in issues if i.line in shown]
+        if issues:
+            print(f"📏 Static rules: {len(issues)} findings ({', '.join(sorted({i.rule_id for i in issues}))})")
+        return issues
+    
+    def _parse_issue(self, issue_data: Dict[str, Any], ltm_context: str = "") -> Optional[CodeIssue]:
+        """Model issue dict -> CodeIssue (None if it doesn't validate)"""
+        try:
+            description = issue_data.get('description', '')
+            if ltm_context and 'similar' not in description.lower():
+                description += f" [Pattern detected from LTM: Check past fixes in this repo]"
+            
+            return CodeIssue(
+                id=f"issue-{uuid.uuid4().hex[:8]}",
+                severity=Severity(issue_data.get('severity', 'MEDIUM')),
+                category=IssueCategory(issue_data.get('category', 'security')),
+                type=issue_data.get('type', 'unknown'),
+                message=issue_data.get('message', ''),
+                description=description,
+                line=issue_data.get('line'),
+                suggestion=issue_data.get('suggestion', ''),
+                fixed_code=issue_data.get('fixed_code')
+            )
+        except Exception as e:
+            logger.warning("failed_to_parse_issue", error=str(e))
+            return None
+    
+    def _refine_issue_line(self, issue: CodeIssue, source: str, language: str):
+        """Snap the model's approximate line to the exact AST line (Python/C++ only)"""
+        if language not in ['python', 'cpp']:
+            return
+        approx = issue.line or 1
+        exact = ast_parser.get_exact_line_for_issue(source, issue.type or 'general', approx, language)
+        if exact != approx:
+            issue.line = exact
+            logger.info("ast_line_refined", old=approx, new=exact, issue_type=issue.type)
+    
+    def _build_result(
+        self,
+        issues: List[CodeIssue],
+        code_review: Dict[str, Any],
+        testing: Dict[str, Any],
+        docs: Dict[str, Any],
+        ltm_context: str,
+        ast_info: Optional[FileSymbols],
+        cache_status: Dict[str, str]
+    ) -> CodeReviewResult:
+        """Metrics + summary for one analysis"""
         metrics = {
             'total_issues': len(issues),
             'critical_count': len([i for i in issues if i.severity == Severity.CRITICAL]),
@@ -464,7 +906,9 @@ class CodeAnalyzer:
             'tests_generated': len(testing.get('test_cases', [])),
             'documentation_generated': bool(docs.get('documentation')),
             'ltm_context_used': bool(ltm_context),
-            'ast_enhanced': bool(ast_info)
+            'ast_enhanced': bool(ast_info),
+            'cache': cache_status,
+            'cache_hits': sum(1 for status in cache_status.values() if status == 'hit')
         }
         
         summary = f"Multi-agent analysis: Found {len(issues)} issues"
@@ -487,15 +931,216 @@ class CodeAnalyzer:
             positive_feedback=code_review.get('positive_feedback', [])
         )
     
-    def _build_enhanced_code_review_prompt(self, code: str, language: str, filename: str, ltm_context: str, func_context: str = "", var_context: str = "") -> str:
+    async def analyze_files(
+        self,
+        files: Dict[str, str],
+        languages: Dict[str, str],
+        ltm_context: str = "",
+        max_concurrency: int = 4,
+        batches: Optional[List[List[str]]] = None,
+        deadline: Optional[float] = None,
+        sources: Optional[Dict[str, str]] = None,
+        review_depth: Optional[ReviewDepth] = None,
+        depths: Optional[Dict[str, ReviewDepth]] = None,
+        response_deadline: Optional[float] = None,
+        on_late_result: Optional[Callable[[CodeReviewResult], Awaitable[None]]] = None
+    ) -> CodeReviewResult:
+        """
+        Fan-out analysis: each file (or packed batch of small files) is analyzed as its
+        own bounded-concurrency task, then issues are merged with their `file` field set.
+        
+        Args:
+            files: filename -> source code
+            languages: filename -> language
+            ltm_context: Shared LTM context for every file
+            max_concurrency: Max model calls in flight at once
+            batches: Optional packing from FileScheduler (default: one file per call)
+            deadline: time.monotonic() after which no new batch is started
+            sources: filename -> full file, when `files` holds diff-hunk views (never packed)
+            review_depth: Execution plan for every file (see EXECUTION_PLANS)
+            depths: Per-file override of review_depth (a batch uses it only if all its files agree)
+            response_deadline: time.monotonic() after which each call returns the agents finished
+                so far (see analyze_code); files with agents still running list them in
+                metrics['agents_pending']
+            on_late_result: Receives the merged result again once every pending agent finished
+        """
+        batches = batches or [[name] for name in files]
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        skipped: List[Dict[str, str]] = []
+        late: Dict[str, asyncio.Future] = {}  # batch key -> complete result of a batch that returned early
+        
+        def late_slot(key: str) -> asyncio.Future:
+            return late.setdefault(key, asyncio.get_running_loop().create_future())
+        
+        async def deliver_late(key: str, late_result: CodeReviewResult):
+            late_slot(key).set_result(late_result)
+        
+        async def analyze_batch(batch: List[str]) -> Optional[CodeReviewResult]:
+            batch_depths = {(depths or {}).get(name, review_depth) for name in batch}
+            depth = batch_depths.pop() if len(batch_depths) == 1 else review_depth
+            key = "+".join(batch)
+            on_late = (lambda late_result: deliver_late(key, late_result)) if on_late_result is not None else None
+            async with semaphore:
+                if deadline is not None and time.monotonic() >= deadline:
+                    skipped.extend({'filename': name, 'reason': 'deadline'} for name in batch)
+                    return None
+                try:
+                    if len(batch) == 1:
+                        return await self.analyze_code(
+                            code=files[batch[0]],
+                            language=languages.get(batch[0], 'python'),
+                            filename=batch[0],
+                            ltm_context=ltm_context,
+                            full_source=(sources or {}).get(batch[0]),
+                            review_depth=depth,
+                            deadline=response_deadline,
+                            on_late_result=on_late
+                        )
+                    return await self._analyze_packed(batch, files, languages.get(batch[0], 'python'), ltm_context, depth,
+                                                      response_deadline, on_late)
+                except Exception as e:
+                    logger.error("file_analysis_failed", files=batch, error=str(e))
+                    return CodeReviewResult(summary=f"Analysis failed: {e}", issues=[], metrics={'error': True})
+        
+        logger.info("fan_out_analysis_started", files=len(files), calls=len(batches), max_concurrency=max_concurrency)
+        print(f"🔀 Analyzing {len(files)} files in {len(batches)} parallel calls (max {max_concurrency} at once)")
+        
+        batch_results = await asyncio.gather(*(analyze_batch(batch) for batch in batches))
+        
+        file_results = {
+            "+".join(batch): batch_result
+            for batch, batch_result in zip(batches, batch_results)
+            if batch_result is not None
+        }
+        analyzed = sum(len(batch) for batch, r in zip(batches, batch_results) if r is not None)
+        merged = self.merge_results(file_results, ltm_context, files_analyzed=analyzed)
+        merged.metrics['skipped_files'] = skipped
+        
+        waiting = [key for key, r in file_results.items() if (r.metrics or {}).get('agents_pending')]
+        if waiting and on_late_result is not None:
+            async def complete_late():
+                late_results = dict(file_results)
+                for key in waiting:
+                    late_results[key] = await late_slot(key)
+                late_merged = self.merge_results(late_results, ltm_context, files_analyzed=analyzed)
+                late_merged.metrics['skipped_files'] = skipped
+                late_merged.metrics['late_files'] = waiting
+                await on_late_result(late_merged)
+            
+            logger.info("fan_out_late_results_scheduled", files=waiting)
+            run_in_background(complete_late())
+        return merged
+    
+    async def _analyze_packed(self, batch: List[str], files: Dict[str, str], language: str, ltm_context: str,
+                              review_depth: Optional[ReviewDepth] = None, deadline: Optional[float] = None,
+                              on_late_result: Optional[Callable[[CodeReviewResult], Awaitable[None]]] = None) -> CodeReviewResult:
+        """Analyze several small same-language files in one call, then map issue lines back to each file"""
+        comment = '#' if language == 'python' else '//'
+        segments = []  # (first_line, last_line, filename) in combined coordinates
+        parts = []
+        line_no = 1
+        for filename in batch:
+            code = files[filename]
+            parts.append(f"{comment} File: {filename}\n{code}\n")
+            code_lines = code.count("\n") + 1
+            segments.append((line_no + 1, line_no + code_lines, filename))
+            line_no += code_lines + 1
+        
+        def unpack(result: CodeReviewResult) -> CodeReviewResult:
+            for issue in result.issues:
+                line = issue.line or 1
+                for first, last, filename in segments:
+                    if line <= last:
+                        issue.file = filename
+                        issue.line = max(1, line - first + 1)
+                        break
+                else:
+                    issue.file = segments[-1][2]
+            return result
+        
+        async def on_late(late_result: CodeReviewResult):
+            await on_late_result(unpack(late_result))
+        
+        result = await self.analyze_code(
+            code="".join(parts),
+            language=language,
+            filename=", ".join(batch),
+            ltm_context=ltm_context,
+            review_depth=review_depth,
+            deadline=deadline,
+            on_late_result=on_late if on_late_result is not None else None
+        )
+        return unpack(result)
+    
+    def merge_results(self, file_results: Dict[str, CodeReviewResult], ltm_context: str = "", files_analyzed: Optional[int] = None) -> CodeReviewResult:
+        """Merge per-file (or per-batch) results into one CodeReviewResult (issues tagged with their file)"""
+        issues: List[CodeIssue] = []
+        positive_feedback: List[str] = []
+        tests_generated = 0
+        docs_generated = False
+        cache_hits = 0
+        failed_files = []
+        agents_pending: Dict[str, List[str]] = {}
+        
+        for filename, file_result in file_results.items():
+            for issue in file_result.issues:
+                issue.file = issue.file or filename
+                issues.append(issue)
+            positive_feedback.extend(file_result.positive_feedback)
+            file_metrics = file_result.metrics or {}
+            tests_generated += file_metrics.get('tests_generated', 0)
+            docs_generated = docs_generated or bool(file_metrics.get('documentation_generated'))
+            cache_hits += file_metrics.get('cache_hits', 0)
+            if file_metrics.get('error'):
+                failed_files.append(filename)
+            if file_metrics.get('agents_pending'):
+                agents_pending[filename] = file_metrics['agents_pending']
+        
+        metrics = {
+            'total_issues': len(issues),
+            'critical_count': len([i for i in issues if i.severity == Severity.CRITICAL]),
+            'high_count': len([i for i in issues if i.severity == Severity.HIGH]),
+            'medium_count': len([i for i in issues if i.severity == Severity.MEDIUM]),
+            'low_count': len([i for i in issues if i.severity == Severity.LOW]),
+            'tests_generated': tests_generated,
+            'documentation_generated': docs_generated,
+            'ltm_context_used': bool(ltm_context),
+            'files_analyzed': files_analyzed if files_analyzed is not None else len(file_results),
+            'failed_files': failed_files,
+            'agents_pending': agents_pending,  # file -> agents still running when the result was returned
+            'cache_hits': cache_hits,
+            'telemetry': telemetry.merge_summaries([r.metrics.get('telemetry') for r in file_results.values() if r.metrics]),
+            'per_file': {name: r.metrics for name, r in file_results.items()}
+        }
+        
+        summary = f"Multi-agent analysis: Found {len(issues)} issues across {metrics['files_analyzed']} files"
+        if tests_generated > 0:
+            summary += f", generated {tests_generated} tests"
+        if docs_generated:
+            summary += ", created documentation"
+        if ltm_context:
+            summary += " (with LTM pattern matching)"
+        
+        logger.info("fan_out_analysis_complete", files=len(file_results), issues_count=len(issues), failed=len(failed_files))
+        
+        return CodeReviewResult(
+            summary=summary,
+            issues=issues,
+            metrics=metrics,
+            positive_feedback=positive_feedback
+        )
+    
+    def _build_enhanced_code_review_prompt(self, code: str, language: str, filename: str, ltm_context: str, func_context: str = "", var_context: str = "", static_context: str = "") -> str:
         """Enhanced code review prompt with ALL detection categories"""
         ltm_section = f"**LTM Context:** {ltm_context[:200]}..." if ltm_context else ""
         ast_section = f"**AST:** {func_context}. {var_context}." if func_context or var_context else ""
+        static_section = f"**Already reported by static rules (do NOT report these again):** {static_context}." if static_context else ""
         
         prompt = f"""You are a senior security architect and code quality expert with expertise in {language}.
 
 {ltm_section}
 {ast_section}
+{static_section}
 
 **File:** {filename or 'unknown.py'}
 **Language:** {language}
@@ -645,6 +1290,54 @@ class CodeAnalyzer:
         
         return prompt
     
+    def _build_quick_review_prompt(self, code: str, language: str, filename: str, var_context: str = "", static_context: str = "") -> str:
+        """Compact security-only prompt for QUICK reviews (pre-commit traffic)"""
+        ast_section = f"**AST:** {var_context}." if var_context else ""
+        static_section = f"**Already reported by static rules (do NOT report these again):** {static_context}." if static_context else ""
+        
+        return f"""You are a security reviewer doing a fast pre-commit check of {language} code.
+{ast_section}
+{static_section}
+
+**File:** {filename or 'unknown.py'}
+
+**Code:**
+{code}
+
+Report ONLY real security vulnerabilities: SQL/command injection, path traversal, hardcoded secrets,
+missing authentication/authorization checks, unsafe eval/deserialization, XSS.
+Skip style, quality and performance findings. At most 10 issues, most severe first.
+
+Return ONLY valid JSON, no extra text/markdown:
+{{"issues": [{{"severity": "CRITICAL|HIGH|MEDIUM|LOW", "category": "security", "type": "SQL Injection", "line": <line_number>, "message": "Brief description", "description": "One sentence on the risk", "suggestion": "One-line fix"}}]}}"""
+    
+    def _build_shared_prompt(self, code: str, language: str, filename: str, ltm_context: str, func_context: str = "", var_context: str = "", static_context: str = "") -> str:
+        """
+        Shared-context prompt: the code once, followed by the three agents' task
+        instructions (each referring back to it), answered as one JSON object
+        """
+        tasks = {
+            'code_review': self._build_enhanced_code_review_prompt(SHARED_CODE_REF, language, filename, ltm_context, func_context, var_context, static_context),
+            'testing': self._build_testing_prompt(SHARED_CODE_REF, language, filename, ltm_context, func_context),
+            'documentation': self._build_docs_prompt(SHARED_CODE_REF, language, filename, ltm_context, func_context)
+        }
+        task_sections = "\n\n".join(f"=== TASK \"{name}\" ===\n{prompt}" for name, prompt in tasks.items())
+        
+        return f"""You are a review team of a security/quality reviewer, a test engineer and a technical writer for {language} code.
+Perform all three tasks below on the SAME code, given once here.
+
+**File:** {filename or 'unknown.py'}
+**Language:** {language}
+
+**Code:**
+{code}
+
+{task_sections}
+
+**OUTPUT (overrides the per-task "return only" rules):**
+Return ONLY one valid JSON object, no extra text/markdown, with exactly these keys:
+{{"code_review": <JSON of task "code_review">, "testing": <JSON of task "testing">, "documentation": <JSON of task "documentation">}}"""
+    
     # def _build_testing_prompt(self, code: str, language: str, filename: str, ltm_context: str, func_context: str = "") -> str:
     #     """Enhanced testing prompt with better JSON formatting"""
     #     ltm_patterns = f"**LTM:** {ltm_context[:150]}... (Follow repo testing patterns.)" if ltm_context else ""
@@ -4,6 +4,7 @@ import json
 from typing import Dict, Any
 import structlog
 from app.config import get_settings
+from app.core.json_stream import parse_model_json
 
 logger = structlog.get_logger()
 settings = get_settings()
@@ -79,17 +80,8 @@ Return ONLY valid JSON (no markdown code blocks, no explanation):
             response_body = json.loads(response['body'].read())
             result_text = response_body['content'][0]['text']
             
-            # Extract JSON (handle markdown wrapping)
-            try:
-                result_json = json.loads(result_text)
-            except json.JSONDecodeError:
-                # Try to extract JSON from markdown
-                start_idx = result_text.find('{')
-                end_idx = result_text.rfind('}') + 1
-                if start_idx >= 0 and end_idx > start_idx:
-                    result_json = json.loads(result_text[start_idx:end_idx])
-                else:
-                    result_json = {"raw_response": result_text}
+            # Extract JSON (markdown wrapping, raw newlines, truncated output)
+            result_json = parse_model_json(result_text)
             
             logger.info("bedrock_invocation_success")
             
@@ -0,0 +1,144 @@
+# app/core/cache.py (Content-addressed cache for agent results: in-process LRU or Redis)
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import structlog
+from app.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+class CacheBackend(ABC):
+    """Minimal async key/value interface shared by all cache backends"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Dict[str, Any], ttl: int):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process cache with TTL expiry and LRU eviction"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            logger.debug("cache_evicted", key=evicted)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis-backed cache (TTL via SETEX; LRU via the server's maxmemory-policy)"""
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as aioredis
+        self.client = aioredis.from_url(redis_url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await self.client.get(key)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning("redis_cache_get_failed", error=str(e))
+            return None
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: int):
+        try:
+            await self.client.set(key, json.dumps(value), ex=ttl)
+        except Exception as e:
+            logger.warning("redis_cache_set_failed", error=str(e))
+
+    async def delete(self, key: str):
+        try:
+            await self.client.delete(key)
+        except Exception as e:
+            logger.warning("redis_cache_delete_failed", error=str(e))
+
+
+class AnalysisCache:
+    """Agent result cache keyed on (sha256(code), language, agent, prompt version, model id)"""
+
+    KEY_PREFIX = "devagent:analysis:"
+
+    def __init__(self, backend: CacheBackend, ttl: int = 86400):
+        self.backend = backend
+        self.ttl = ttl
+
+    @classmethod
+    def make_key(cls, code: str, language: str, agent: str, prompt_version: str, model_id: str) -> str:
+        code_hash = hashlib.sha256(code.encode("utf8")).hexdigest()
+        parts = "|".join([code_hash, language, agent, prompt_version, model_id])
+        return cls.KEY_PREFIX + hashlib.sha256(parts.encode("utf8")).hexdigest()
+
+    async def get(self, code: str, language: str, agent: str, prompt_version: str, model_id: str) -> Optional[Dict[str, Any]]:
+        key = self.make_key(code, language, agent, prompt_version, model_id)
+        return await self.backend.get(key)
+
+    async def set(self, code: str, language: str, agent: str, prompt_version: str, model_id: str, result: Dict[str, Any]):
+        # Never cache failures, unparsed or truncated (partially recovered) output - those should be retried next time
+        if not isinstance(result, dict) or 'error' in result or 'raw_response' in result or result.get('truncated'):
+            return
+        key = self.make_key(code, language, agent, prompt_version, model_id)
+        await self.backend.set(key, result, self.ttl)
+
+
+_analysis_cache: Optional[AnalysisCache] = None
+
+
+def create_cache_backend(kind: str) -> Optional[CacheBackend]:
+    """Build a cache backend by name (memory | redis | none)"""
+    kind = (kind or "none").lower()
+    if kind == "redis":
+        try:
+            return RedisCacheBackend(settings.redis_url)
+        except Exception as e:
+            logger.error("redis_cache_init_failed", error=str(e), fallback="memory")
+            return InMemoryCacheBackend(settings.analysis_cache_max_entries)
+    if kind == "memory":
+        return InMemoryCacheBackend(settings.analysis_cache_max_entries)
+    return None
+
+
+def get_analysis_cache() -> Optional[AnalysisCache]:
+    """Get the process-wide analysis cache (None when caching is disabled)"""
+    global _analysis_cache
+    if _analysis_cache is None:
+        backend = create_cache_backend(settings.analysis_cache_backend)
+        if backend is None:
+            return None
+        _analysis_cache = AnalysisCache(backend, ttl=settings.analysis_cache_ttl_seconds)
+        logger.info("analysis_cache_initialized", backend=type(backend).__name__)
+    return _analysis_cache
@@ -0,0 +1,220 @@
+# app/core/chunker.py (Split large files along AST function/class boundaries into token-bounded review chunks)
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Hashable, List, Optional, Tuple
+import structlog
+from app.core.diff import merge_ranges, render_line_view
+from app.core.parsers.ast_parser import parser as ast_parser
+from app.core.parsers.registry import registry
+from app.core.parsers.symbols import FileSymbols
+from app.utils.tokens import CHARS_PER_TOKEN
+
+logger = structlog.get_logger()
+
+LINE_MARGIN_CHARS = 9  # "  123 | " margin + newline added per line by render_line_view
+GLOBAL_MAX_LINES = 3  # Top-level statements up to this many lines, outside functions, are header globals
+
+Range = Tuple[int, int]
+
+
+@dataclass
+class Chunk:
+    """
+    One review unit: body line ranges (1-based, inclusive) plus the shared header
+    ranges (imports, globals) shown above them. Rendered with absolute line numbers.
+    """
+    ranges: List[Range]
+    header: List[Range] = field(default_factory=list)
+    tokens: int = 0  # Estimated tokens of the rendered view
+
+    def shown_ranges(self) -> List[Range]:
+        return merge_ranges(self.header + self.ranges)
+
+    def shown_lines(self) -> List[int]:
+        return [n for start, end in self.shown_ranges() for n in range(start, end + 1)]
+
+    def render(self, lines: List[str]) -> str:
+        return render_line_view(lines, self.shown_ranges())
+
+    def rebase(self, line: Optional[int]) -> Optional[int]:
+        """
+        File line of a line reported against this chunk: numbers shown in the view's
+        margin are kept; a line the chunk does not show is unknown (None), since any
+        such number could just as well be a file line as a position in the chunk.
+        """
+        if not isinstance(line, int):
+            return line
+        shown = self.shown_lines()
+        if not shown or line in shown:
+            return line
+        return None
+
+
+class _LineTokens:
+    """Estimated rendered tokens of any line range, from prefix sums of line lengths"""
+
+    def __init__(self, lines: List[str]):
+        self.count = len(lines)
+        self.blank = {n for n, line in enumerate(lines, 1) if not line.strip()}
+        self._chars = [0]
+        for line in lines:
+            self._chars.append(self._chars[-1] + len(line) + LINE_MARGIN_CHARS)
+
+    def __call__(self, start: int, end: int) -> int:
+        return (self._chars[end] - self._chars[start - 1]) // CHARS_PER_TOKEN + 1
+
+
+class Chunker:
+    """
+    Splits a file into review chunks:
+
+    - top-level imports and small globals form a header repeated in every chunk
+      (up to `header_max_tokens`; the rest is reviewed as ordinary code)
+    - definitions (with the comments directly above them) are the units; a unit
+      over the budget is split along its children (class -> methods -> statements),
+      and a node without children by lines
+    - consecutive units are packed greedily up to the token target, which grows
+      when the file would need more than `max_chunks` chunks
+
+    Languages without a grammar are split into line windows.
+    """
+
+    def split(
+        self,
+        source: str,
+        language: str,
+        symbols: Optional[FileSymbols] = None,
+        target_tokens: int = 3000,
+        max_chunks: int = 24,
+        header_max_tokens: int = 600,
+        cache_key: Optional[Hashable] = None
+    ) -> List[Chunk]:
+        lines = source.splitlines()
+        if not lines:
+            return []
+        tokens = _LineTokens(lines)
+        unit_budget = max(target_tokens - header_max_tokens, target_tokens // 2, 1)  # Fits next to any header
+
+        if ast_parser.supports(language):
+            if symbols is None or symbols.language != language:
+                symbols = ast_parser.parse_file_content(source, language, cache_key)
+            header, units = self._ast_units(source, language, symbols, tokens, unit_budget, cache_key)
+        else:
+            header, units = [], self._line_windows(1, len(lines), tokens, unit_budget)
+
+        header, overflow = self._cap_header(header, tokens, header_max_tokens)
+        units = sorted(units + overflow)
+        header_tokens = sum(tokens(s, e) for s, e in header)
+
+        budget = max(target_tokens - header_tokens, target_tokens // 2, 1)
+        packed = self._pack(units, tokens, budget)
+        while max_chunks and len(packed) > max_chunks:
+            budget = budget * 5 // 4 + 1
+            packed = self._pack(units, tokens, budget)
+
+        chunks = [
+            Chunk(ranges=merge_ranges(ranges), header=header,
+                  tokens=header_tokens + sum(tokens(s, e) for s, e in ranges))
+            for ranges in packed
+        ]
+        logger.info("file_chunked", language=language, lines=len(lines), chunks=len(chunks),
+                    units=len(units), header_lines=sum(e - s + 1 for s, e in header), budget=budget)
+        return chunks
+
+    def _ast_units(self, source: str, language: str, symbols: FileSymbols, tokens: _LineTokens,
+                   budget: int, cache_key: Optional[Hashable]) -> Tuple[List[Range], List[Range]]:
+        """(header ranges, unit ranges) from the top-level nodes of the tree"""
+        spec = registry.spec(language)
+        function_starts = sorted(start for _, start, _ in symbols.function_ranges())
+        root = ast_parser.parse_tree(source, language, cache_key).root_node
+
+        header: List[Range] = []
+        units: List[Range] = []
+        comment_start = None  # First line of the comments directly above the next definition
+        for node in root.named_children:
+            start, end = self._lines(node, tokens.count)
+            if node.type in spec.comment_types:
+                comment_start = comment_start or start
+                continue
+            i = bisect_left(function_starts, start)
+            defines_function = i < len(function_starts) and function_starts[i] <= end
+            if node.type in spec.import_types or (end - start < GLOBAL_MAX_LINES and not defines_function):
+                header.append((start, end))
+            else:
+                units.extend(self._split_node(node, comment_start or start, end, tokens, budget))
+            comment_start = None
+        return header, units
+
+    def _split_node(self, node, start: int, end: int, tokens: _LineTokens, budget: int) -> List[Range]:
+        """[start, end] as one unit if it fits, else split along the node's children"""
+        if tokens(start, end) <= budget:
+            return [(start, end)]
+        children = [c for c in node.named_children if self._lines(c, tokens.count)[1] >= start]
+        if not children:
+            return self._line_windows(start, end, tokens, budget)
+
+        pieces: List[Range] = []
+        cursor = start  # Lines before a child (signature, decorators) go with it
+        for child in children:
+            child_start, child_end = self._lines(child, tokens.count)
+            child_end = min(child_end, end)
+            if child_end < cursor:
+                continue
+            while cursor < child_start and cursor in tokens.blank:
+                cursor += 1  # Blank lines between children are left out
+            pieces.extend(self._split_node(child, cursor, child_end, tokens, budget))
+            cursor = child_end + 1
+        if cursor <= end:  # Closing lines stay with the last piece
+            pieces[-1] = (pieces[-1][0], end)
+        return pieces
+
+    @staticmethod
+    def _line_windows(start: int, end: int, tokens: _LineTokens, budget: int) -> List[Range]:
+        windows: List[Range] = []
+        window_start = start
+        for line in range(start, end + 1):
+            if line > window_start and tokens(window_start, line) > budget:
+                windows.append((window_start, line - 1))
+                window_start = line
+        windows.append((window_start, end))
+        return windows
+
+    @staticmethod
+    def _cap_header(header: List[Range], tokens: _LineTokens, max_tokens: int) -> Tuple[List[Range], List[Range]]:
+        """(header kept within max_tokens, overflow to review as ordinary units)"""
+        kept, overflow, used = [], [], 0
+        for start, end in header:
+            cost = tokens(start, end)
+            if used + cost <= max_tokens and not overflow:
+                kept.append((start, end))
+                used += cost
+            else:
+                overflow.append((start, end))
+        return merge_ranges(kept), overflow
+
+    @staticmethod
+    def _pack(units: List[Range], tokens: _LineTokens, budget: int) -> List[List[Range]]:
+        packed: List[List[Range]] = []
+        current: List[Range] = []
+        used = 0
+        for start, end in units:
+            cost = tokens(start, end)
+            if current and used + cost > budget:
+                packed.append(current)
+                current, used = [], 0
+            current.append((start, end))
+            used += cost
+        if current:
+            packed.append(current)
+        return packed
+
+    @staticmethod
+    def _lines(node, line_count: int) -> Range:
+        """1-based (start, end) lines of a node (a node ending at column 0 ends on the line before)"""
+        start = node.start_point[0] + 1
+        end = node.end_point[0] + (1 if node.end_point[1] > 0 else 0)
+        return start, min(max(start, end), line_count)
+
+
+# Global chunker (stateless)
+chunker = Chunker()
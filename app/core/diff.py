@@ -0,0 +1,127 @@
+# app/core/diff.py (Unified-diff hunks -> line-numbered review views with enclosing-function context)
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+def parse_patch(patch: str) -> List[Dict[str, Any]]:
+    """
+    Parse a GitHub `patch` (unified diff body) into hunks.
+
+    Each hunk: {'old_start', 'old_count', 'new_start', 'new_count', 'added': [new line numbers],
+                'removed_at': [new-file line each removed line sat before]}
+    """
+    hunks: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+    new_line = 0
+
+    for raw in (patch or "").splitlines():
+        header = HUNK_HEADER.match(raw)
+        if header:
+            old_start, old_count, new_start, new_count = header.groups()
+            current = {
+                'old_start': int(old_start),
+                'old_count': int(old_count) if old_count is not None else 1,
+                'new_start': int(new_start),
+                'new_count': int(new_count) if new_count is not None else 1,
+                'added': [],
+                'removed_at': []
+            }
+            hunks.append(current)
+            new_line = current['new_start']
+            continue
+        if current is None or raw.startswith('\\'):  # "\ No newline at end of file"
+            continue
+        if raw.startswith('+'):
+            current['added'].append(new_line)
+            new_line += 1
+        elif raw.startswith('-'):
+            current['removed_at'].append(new_line)
+        else:
+            new_line += 1
+
+    return hunks
+
+
+def changed_lines(patch: str) -> List[int]:
+    """Added/modified line numbers in the new file"""
+    return [line for hunk in parse_patch(patch) for line in hunk['added']]
+
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sort 1-based inclusive line ranges and merge overlapping / adjacent ones"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def review_ranges(
+    patch: str,
+    functions: List[Dict[str, Any]],
+    total_lines: int,
+    context_lines: int = 3,
+    max_function_lines: int = 120
+) -> List[Tuple[int, int]]:
+    """
+    Line ranges (1-based, inclusive) to show the model: every hunk, widened to the
+    innermost enclosing function (when it is not huge) plus a few lines of context.
+    """
+    ranges: List[Tuple[int, int]] = []
+    for hunk in parse_patch(patch):
+        start = hunk['new_start']
+        end = hunk['new_start'] + max(hunk['new_count'], 1) - 1
+
+        enclosing = [
+            f for f in functions
+            if f['start_line'] <= start and f['end_line'] >= end
+            and f['end_line'] - f['start_line'] < max_function_lines
+        ]
+        if enclosing:
+            innermost = min(enclosing, key=lambda f: f['end_line'] - f['start_line'])
+            start, end = innermost['start_line'], innermost['end_line']
+
+        ranges.append((max(1, start - context_lines), min(total_lines, end + context_lines)))
+
+    return merge_ranges(ranges)
+
+
+def build_hunk_view(
+    code: str,
+    patch: str,
+    functions: List[Dict[str, Any]],
+    context_lines: int = 3
+) -> str:
+    """
+    Render only the changed regions of `code`, each line prefixed with its absolute
+    file line number; changed lines are marked with '+'.
+
+        12 | def login(user, pwd):
+        13+|     sql = f"SELECT ... {user}"
+    """
+    lines = code.splitlines()
+    added = set(changed_lines(patch))
+    ranges = review_ranges(patch, functions, len(lines), context_lines)
+    return render_line_view(lines, ranges, added)
+
+
+def view_line_numbers(view: str) -> Set[int]:
+    """Absolute file line numbers shown in a view rendered by render_line_view"""
+    return {int(m.group(1)) for m in re.finditer(r'^\s*(\d+)[+ ]\| ', view, re.MULTILINE)}
+
+
+def render_line_view(lines: List[str], ranges: List[Tuple[int, int]], marked: Set[int] = frozenset()) -> str:
+    """Render 1-based inclusive line ranges with absolute line numbers ('+' on `marked` lines)"""
+    blocks = []
+    for start, end in ranges:
+        block = [
+            f"{n:>5}{'+' if n in marked else ' '}| {lines[n - 1]}"
+            for n in range(start, end + 1)
+        ]
+        blocks.append("\n".join(block))
+
+    return "\n  ...\n".join(blocks)
@@ -0,0 +1,133 @@
+# app/core/github_client.py (Async, pooled GitHub REST client with Link pagination)
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+import httpx
+import structlog
+from app.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+class GitHubClient:
+    """Shared async GitHub client: keep-alive connection pool, paginated listing, concurrent raw fetches"""
+
+    def __init__(self, token: str, base_url: Optional[str] = None, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max_concurrency or settings.github_max_concurrent_fetches
+        self.client = httpx.AsyncClient(
+            base_url=base_url or settings.github_api_url,
+            headers={
+                "Authorization": f"token {token}",
+                "Accept": "application/vnd.github.v3+json"
+            },
+            timeout=settings.github_request_timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency * 2,
+                max_keepalive_connections=self.max_concurrency
+            ),
+            follow_redirects=True  # raw_url redirects to raw.githubusercontent.com
+        )
+
+    async def paginate(self, url: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """GET every page of a list endpoint by following `Link: rel="next"` headers"""
+        items: List[Dict[str, Any]] = []
+        next_url: Optional[str] = url
+        next_params = {"per_page": 100, **(params or {})}
+        pages = 0
+
+        while next_url:
+            response = await self.client.get(next_url, params=next_params)
+            response.raise_for_status()
+            items.extend(response.json())
+            pages += 1
+            # The next link already carries per_page/page in its query string
+            next_url = response.links.get("next", {}).get("url")
+            next_params = None
+
+        logger.info("github_paginated_fetch", url=url, pages=pages, items=len(items))
+        return items
+
+    async def list_pr_files(self, repo_full_name: str, pr_number: int) -> List[Dict[str, Any]]:
+        """All changed files of a PR (GitHub caps this endpoint at 3000 files)"""
+        return await self.paginate(f"/repos/{repo_full_name}/pulls/{pr_number}/files")
+
+    async def fetch_raw(self, raw_url: str) -> Optional[str]:
+        """Fetch raw file content (None on failure)"""
+        try:
+            response = await self.client.get(raw_url)
+            if response.status_code == 200:
+                return response.text
+            logger.warning("github_raw_fetch_status", url=raw_url, status=response.status_code)
+        except httpx.HTTPError as e:
+            logger.warning("github_raw_fetch_failed", url=raw_url, error=str(e))
+        return None
+
+    async def fetch_raw_contents(self, files: List[Dict[str, Any]], max_concurrency: Optional[int] = None) -> Dict[str, str]:
+        """Fetch raw contents for PR file entries concurrently -> {filename: content}"""
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def fetch_one(file: Dict[str, Any]):
+            async with semaphore:
+                return file.get("filename", ""), await self.fetch_raw(file["raw_url"])
+
+        results = await asyncio.gather(*(fetch_one(f) for f in files if f.get("raw_url")))
+        return {filename: content for filename, content in results if content is not None}
+
+    async def compare_changed_files(self, repo_full_name: str, base_sha: str, head_sha: str) -> Optional[Set[str]]:
+        """Filenames changed between two commits (None if unknown, e.g. force-push or >300 files)"""
+        try:
+            response = await self.client.get(f"/repos/{repo_full_name}/compare/{base_sha}...{head_sha}")
+            response.raise_for_status()
+            files = response.json().get("files", [])
+        except httpx.HTTPError as e:
+            logger.warning("github_compare_failed", base=base_sha, head=head_sha, error=str(e))
+            return None
+        if len(files) >= 300:  # compare API truncates the file list at 300
+            return None
+        changed = set()
+        for f in files:
+            changed.add(f.get("filename", ""))
+            if f.get("previous_filename"):
+                changed.add(f["previous_filename"])
+        return changed
+
+    async def post_issue_comment(self, repo_full_name: str, issue_number: int, body: str) -> Dict[str, Any]:
+        """Create a comment on an issue / PR"""
+        response = await self.client.post(
+            f"/repos/{repo_full_name}/issues/{issue_number}/comments",
+            json={"body": body}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def update_issue_comment(self, repo_full_name: str, comment_id: int, body: str) -> Dict[str, Any]:
+        """Replace the body of an existing issue / PR comment"""
+        response = await self.client.patch(
+            f"/repos/{repo_full_name}/issues/comments/{comment_id}",
+            json={"body": body}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+# One pooled client per token, shared across requests and background tasks
+_clients: Dict[str, GitHubClient] = {}
+
+
+def get_github_client(token: str) -> GitHubClient:
+    """Get the shared client for a token (created on first use)"""
+    client = _clients.get(token)
+    if client is None:
+        client = GitHubClient(token)
+        _clients[token] = client
+    return client
+
+
+async def close_github_clients():
+    """Close all pooled connections (called on app shutdown)"""
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
@@ -0,0 +1,284 @@
+# app/core/json_stream.py (Incremental, tolerant extraction of model JSON: streamed array items + truncation repair)
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+# Arrays whose object items are emitted as soon as they complete
+ITEM_KEYS = ("issues", "test_cases")
+
+CLOSERS = {'{': '}', '[': ']'}
+
+# Objects tried by parse_model_json when the first '{' does not start valid JSON
+MAX_ROOT_ATTEMPTS = 3
+
+
+def loads_lenient(text: str) -> Any:
+    """json.loads that accepts raw control characters (unescaped newlines / tabs) inside strings"""
+    return json.loads(text, strict=False)
+
+
+class _Container:
+    """One open object / array on the scanner stack"""
+    __slots__ = ('char', 'key', 'in_array', 'after_colon', 'start')
+
+    def __init__(self, char: str, key: Optional[str], in_array: bool, start: int):
+        self.char = char
+        self.key = key  # Key this container is the value of (None for array elements / the root)
+        self.in_array = in_array  # Element of an array: must be complete to be kept
+        self.after_colon = False  # Object: next string is a value, not a key
+        self.start = start
+
+
+class StreamingJSONParser:
+    """
+    Scans model output text as it streams in and keeps enough state to:
+
+    - emit every object of the arrays under `keys` ("issues", "test_cases" ...)
+      as soon as its closing brace arrives, at any nesting depth (shared-context
+      answers nest them per agent)
+    - parse the finished answer even when it is wrapped in prose or markdown
+      fences, has raw newlines inside strings or trailing commas
+    - recover a truncated answer (output budget hit mid-JSON): the text is cut
+      after the last complete value that is not inside an array element, and
+      the open containers are closed, so every complete issue / test case is
+      kept and a cut-off element is dropped (a cut-off string field outside
+      arrays, e.g. documentation, is closed and kept)
+
+        parser = StreamingJSONParser()
+        for chunk in chunks:
+            for key, item in parser.feed(chunk):
+                ...
+        result = parser.result()
+    """
+
+    def __init__(self, keys: Iterable[str] = ITEM_KEYS):
+        self.keys = set(keys)
+        self.buffer = ""
+        self.pos = 0
+        self.root_start: Optional[int] = None
+        self.root_end: Optional[int] = None
+        self.stack: List[_Container] = []
+        self.in_string = False
+        self.escape = False
+        self.string_start = 0
+        self.string_is_value = False
+        self.last_key: Optional[str] = None
+        self.last_token = ''  # Last significant character outside strings
+        self.last_comma = -1
+        self.trailing_commas: List[int] = []
+        self.safe_cut: Optional[Tuple[int, str]] = None  # (end offset, closing brackets) of the last safe prefix
+        self.closed_arrays: set = set()  # Keys of item arrays that have been closed
+        self.items: Dict[str, int] = {}  # Items emitted per key
+
+    @property
+    def done(self) -> bool:
+        return self.root_end is not None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return self.buffer
+
+    def feed(self, chunk: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Append a chunk and return the (key, item) pairs completed by it"""
+        self.buffer += chunk
+        emitted: List[Tuple[str, Dict[str, Any]]] = []
+        buffer = self.buffer
+        while self.pos < len(buffer) and not self.done:
+            ch = buffer[self.pos]
+            if self.root_start is None:
+                if ch == '{':
+                    self.root_start = self.pos
+                    self.stack.append(_Container('{', None, False, self.pos))
+                    self._mark_safe(self.pos + 1)
+                self.pos += 1
+                continue
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    self._end_string()
+                self.pos += 1
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                self.string_start = self.pos
+                top = self.stack[-1]
+                self.string_is_value = top.char == '[' or top.after_colon
+            elif ch in '{[':
+                top = self.stack[-1]
+                key = self.last_key if top.char == '{' else None
+                self.stack.append(_Container(ch, key, top.char == '[', self.pos))
+                self._mark_safe(self.pos + 1)
+            elif ch in '}]':
+                if self.last_token == ',':
+                    self.trailing_commas.append(self.last_comma)
+                closed = self.stack.pop()
+                if closed.char == '[' and closed.key in self.keys:
+                    self.closed_arrays.add(closed.key)
+                if not self.stack:
+                    self.root_end = self.pos
+                else:
+                    parent = self.stack[-1]
+                    parent.after_colon = False
+                    if closed.char == '{' and closed.in_array and parent.key in self.keys and not self._inside_item():
+                        item = self._load_item(closed.start, self.pos + 1)
+                        if item is not None:
+                            self.items[parent.key] = self.items.get(parent.key, 0) + 1
+                            emitted.append((parent.key, item))
+                    self._mark_safe(self.pos + 1)
+            elif ch == ':':
+                self.stack[-1].after_colon = True
+            elif ch == ',':
+                self.stack[-1].after_colon = False
+                self.last_comma = self.pos
+                self._mark_safe(self.pos)
+            if not ch.isspace():
+                self.last_token = ch
+            self.pos += 1
+        return emitted
+
+    def _end_string(self):
+        top = self.stack[-1]
+        if self.string_is_value:
+            self._mark_safe(self.pos + 1)
+        elif top.char == '{':
+            raw = self.buffer[self.string_start:self.pos + 1]
+            try:
+                self.last_key = loads_lenient(raw)
+            except json.JSONDecodeError:
+                self.last_key = raw[1:-1]
+        self.last_token = '"'
+
+    def _inside_item(self) -> bool:
+        """True while any open container is an array element (cutting there would keep half an item)"""
+        return any(c.in_array for c in self.stack)
+
+    def _mark_safe(self, end: int):
+        if not self._inside_item():
+            self.safe_cut = (end, ''.join(CLOSERS[c.char] for c in reversed(self.stack)))
+
+    def _clean(self, start: int, end: int) -> str:
+        """buffer[start:end] without the trailing commas seen in that span"""
+        commas = [c for c in self.trailing_commas if start <= c < end]
+        if not commas:
+            return self.buffer[start:end]
+        parts, cursor = [], start
+        for comma in commas:
+            parts.append(self.buffer[cursor:comma])
+            cursor = comma + 1
+        parts.append(self.buffer[cursor:end])
+        return ''.join(parts)
+
+    def _load_item(self, start: int, end: int) -> Optional[Dict[str, Any]]:
+        try:
+            item = loads_lenient(self._clean(start, end))
+        except json.JSONDecodeError:
+            logger.warning("stream_item_parse_failed", preview=self.buffer[start:start + 100])
+            return None
+        return item if isinstance(item, dict) else None
+
+    def result(self) -> Dict[str, Any]:
+        """
+        The parsed answer: the whole object when it is complete, else the repaired
+        prefix with 'truncated': True. {"raw_response", "parsed": False} when no
+        JSON object can be recovered.
+        """
+        if self.root_start is not None and self.done:
+            try:
+                parsed = loads_lenient(self._clean(self.root_start, self.root_end + 1))
+                if isinstance(parsed, dict):
+                    return parsed
+            except json.JSONDecodeError as e:
+                logger.warning("model_json_invalid", error=str(e))
+
+        for candidate in self._repairs():
+            try:
+                parsed = loads_lenient(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(parsed, dict) and parsed:
+                parsed['truncated'] = True
+                logger.warning("model_json_recovered", chars=len(self.buffer), items=dict(self.items))
+                return parsed
+
+        logger.warning("json_extraction_failed", preview=self.buffer[:100])
+        return {"raw_response": self.buffer, "parsed": False}
+
+    def _repairs(self) -> List[str]:
+        """Closed-up prefixes of a truncated answer, most complete first"""
+        if self.root_start is None or self.done:
+            return []
+        candidates = []
+        # Cut inside a string value outside any array item: close the string and keep it
+        if self.in_string and self.string_is_value and self.stack[-1].char == '{' and not self._inside_item():
+            text = self.buffer[:len(self.buffer) - 1] if self.escape else self.buffer
+            closers = ''.join(CLOSERS[c.char] for c in reversed(self.stack))
+            candidates.append(self._clean(self.root_start, len(text)) + '"' + closers)
+        if self.safe_cut is not None:
+            end, closers = self.safe_cut
+            candidates.append(self._clean(self.root_start, end) + closers)
+        return candidates
+
+
+def parse_model_json(text: str, keys: Iterable[str] = ITEM_KEYS) -> Dict[str, Any]:
+    """Parse a complete (possibly fenced, prose-wrapped or truncated) model answer"""
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, dict):
+            return parsed
+    except json.JSONDecodeError:
+        pass
+    offset = 0
+    for _ in range(MAX_ROOT_ATTEMPTS):
+        parser = StreamingJSONParser(keys)
+        parser.feed(text[offset:])
+        result = parser.result()
+        if parser.root_start is None or 'raw_response' not in result:
+            break
+        offset += parser.root_start + 1  # Braces in leading prose: try the next object
+    if 'raw_response' in result:
+        result['raw_response'] = text
+    return result
+
+
+class JSONArrayStreamer:
+    """
+    Feed model output text as it streams in; get back every object of the array
+    under `key` (e.g. "issues") as soon as its closing brace arrives.
+
+        streamer = JSONArrayStreamer("issues")
+        for chunk in chunks:
+            for issue in streamer.feed(chunk):
+                ...
+        result = streamer.result()
+    """
+
+    def __init__(self, key: str = "issues"):
+        self.key = key
+        self.parser = StreamingJSONParser((key,))
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Append a chunk and return the array items completed by it"""
+        return [item for _, item in self.parser.feed(chunk)]
+
+    def result(self) -> Dict[str, Any]:
+        """The whole answer (see StreamingJSONParser.result)"""
+        return self.parser.result()
+
+    @property
+    def done(self) -> bool:
+        """The array has been closed"""
+        return self.key in self.parser.closed_arrays
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return self.parser.text
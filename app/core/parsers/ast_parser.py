@@ -171,15 +171,15 @@
 # api_key = "sk-1234567890abcdef"  # Hardcoded secret
 # """
     
-#     py_result = parser.parse_file_content(py_code, 'python')
+#     py_result = parser.parse_file_content(py_code, 'python').to_ast_result()
 #     print("\n=== Python AST Test ===")
-#     print(f"Functions: {len(py_result['functions'])}")
-#     for func in py_result['functions']:
-#         print(f"  - {func['name']} (lines {func['start_line']}-{func['end_line']})")
+#     print(f"Functions: {len(py_result.functions)}")
+#     for func in py_result.functions:
+#         print(f"  - {func.name} (lines {func.start_line}-{func.end_line})")
     
-#     print(f"Variables: {len(py_result['variables'])}")
-#     for var in py_result['variables']:
-#         print(f"  - {var['name']} at line {var['line']}: {var['value'][:20]}... ({var['type']})")
+#     print(f"Variables: {len(py_result.variables)}")
+#     for var in py_result.variables:
+#         print(f"  - {var.name} at line {var.line}: {var.value[:20]}... ({var.type})")
     
 #     # C++ test
 #     cpp_code = """
@@ -194,15 +194,15 @@
 # const std::string API_KEY = "sk-1234567890abcdef";  // Hardcoded
 # """
     
-#     cpp_result = parser.parse_file_content(cpp_code, 'cpp')
+#     cpp_result = parser.parse_file_content(cpp_code, 'cpp').to_ast_result()
 #     print("\n=== C++ AST Test ===")
-#     print(f"Functions: {len(cpp_result['functions'])}")
-#     for func in cpp_result['functions']:
-#         print(f"  - {func['name']} (lines {func['start_line']}-{func['end_line']})")
+#     print(f"Functions: {len(cpp_result.functions)}")
+#     for func in cpp_result.functions:
+#         print(f"  - {func.name} (lines {func.start_line}-{func.end_line})")
     
-#     print(f"Variables: {len(cpp_result['variables'])}")
-#     for var in cpp_result['variables']:
-#         print(f"  - {var['name']} at line {var['line']}: {var['value'][:20]}... ({var['type']})")
+#     print(f"Variables: {len(cpp_result.variables)}")
+#     for var in cpp_result.variables:
+#         print(f"  - {var.name} at line {var.line}: {var.value[:20]}... ({var.type})")
     
 #     # Exact line refinement
 #     exact_py = parser.get_exact_line_for_issue(py_code, 'sqli', 3, 'python')
@@ -215,162 +215,269 @@
 #     test_ast_parser()
 
 # app/core/parsers/ast_parser.py (COMPLETE: Python/C++ AST Parser with Secret Detection)
-from tree_sitter_languages import get_language, get_parser
 import structlog
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Set, Hashable, Optional
 import re
+from app.config import get_settings
+from app.core.parsers.tree_cache import ParseTreeCache
+from app.core.parsers.symbols import FileSymbols
+from app.core.parsers.registry import registry
 
 logger = structlog.get_logger()
+settings = get_settings()
+
+# Substrings of string values that mark a potential secret
+SECRET_HINTS = ('key', 'secret', 'pass', 'api', 'token')
+
+# Declarator children naming a C++ function (free, member, qualified, destructor, operator)
+CPP_FUNCTION_NAME_TYPES = {'identifier', 'field_identifier', 'qualified_identifier', 'destructor_name', 'operator_name'}
+
+# Name-like node types across grammars (fallback when a node has no `name` field)
+NAME_NODE_TYPES = {'identifier', 'simple_identifier', 'field_identifier', 'property_identifier', 'name', 'constant'}
+
+# Declaration values that define a function (const f = () => ...)
+FUNCTION_VALUE_TYPES = {'arrow_function', 'function', 'function_expression', 'generator_function', 'lambda_literal'}
+
+VALUE_PREVIEW_CHARS = 50
+
+
+def _slice(source: bytes, node) -> str:
+    """Text of a node, sliced from the parsed source bytes"""
+    return source[node.start_byte:node.end_byte].decode('utf8', errors='replace')
+
+
+def _preview(source: bytes, node) -> str:
+    """Value text for variable entries (truncated to VALUE_PREVIEW_CHARS)"""
+    text = _slice(source, node)
+    return text[:VALUE_PREVIEW_CHARS] + '...' if node.end_byte - node.start_byte > VALUE_PREVIEW_CHARS else text
+
+
+def _first_field(node, *fields):
+    for field in fields:
+        child = node.child_by_field_name(field)
+        if child is not None:
+            return child
+    return None
+
+
+# ----- per-language node handlers: (node, source bytes, FileSymbols being filled) -----
+
+def _add_function(symbols: FileSymbols, name: str, node):
+    symbols.add_function(name, node.start_point[0] + 1, node.end_point[0] + 1)
+
+
+def _add_variable(symbols: FileSymbols, name: str, node, value: str, var_type: str = 'potential_secret'):
+    symbols.add_variable(name, node.start_point[0] + 1, value, var_type)
+
+
+def _add_string_variable(symbols: FileSymbols, name: str, node, var_value: str):
+    """Quoted values only; typed potential_secret / string_assignment by SECRET_HINTS"""
+    if '"' in var_value or "'" in var_value:
+        lowered = var_value.lower()
+        var_type = 'potential_secret' if any(s in lowered for s in SECRET_HINTS) else 'string_assignment'
+        _add_variable(symbols, name, node, var_value, var_type)
+
+
+def _python_function(node, source: bytes, symbols: FileSymbols):
+    name_node = next((c for c in node.named_children if c.type == 'identifier'), None)
+    _add_function(symbols, _slice(source, name_node) if name_node else 'anonymous', node)
+
+
+def _python_assignment(node, source: bytes, symbols: FileSymbols):
+    left = node.child_by_field_name('left')
+    right = node.child_by_field_name('right')
+    if left and right:
+        _add_string_variable(symbols, _slice(source, left).strip(), node, _preview(source, right))
+
+
+def _cpp_function(node, source: bytes, symbols: FileSymbols):
+    declarator = node.child_by_field_name('declarator')
+    if declarator:
+        name_node = next((c for c in declarator.named_children if c.type in CPP_FUNCTION_NAME_TYPES), None)
+        _add_function(symbols, _slice(source, name_node) if name_node else 'anonymous', node)
+
+
+def _cpp_init_declarator(node, source: bytes, symbols: FileSymbols):
+    # const std::string API_KEY = "value"
+    declarator = node.named_children[0] if node.named_child_count else None
+    initializer = node.child_by_field_name('value')
+    if not (declarator and initializer):
+        return
+    var_name = next((_slice(source, c).strip() for c in declarator.named_children if c.type == 'identifier'), 'unknown_var')
+    if initializer.type == 'string_literal' or b'"' in source[initializer.start_byte:initializer.end_byte]:
+        var_value = _preview(source, initializer)
+        if any(s in var_value.lower() for s in SECRET_HINTS):
+            _add_variable(symbols, var_name, node, var_value)
+
+
+def _cpp_string_literal(node, source: bytes, symbols: FileSymbols):
+    var_value = _preview(source, node)
+    if not any(s in var_value.lower() for s in SECRET_HINTS):
+        return
+    var_name = 'literal_string'
+    if node.parent:
+        for sibling in node.parent.named_children:
+            if sibling.type == 'identifier' and sibling.end_byte < node.start_byte:
+                var_name = _slice(source, sibling).strip()
+                break
+    _add_variable(symbols, var_name, node, var_value)
+
+
+def _named_function(node, source: bytes, symbols: FileSymbols):
+    """Function / method declarations with a `name` field (or a name-like child)"""
+    name_node = node.child_by_field_name('name') or next(
+        (c for c in node.named_children if c.type in NAME_NODE_TYPES), None
+    )
+    _add_function(symbols, _slice(source, name_node) if name_node else 'anonymous', node)
+
+
+def _declaration(node, source: bytes, symbols: FileSymbols):
+    """
+    `name = value` declarations (variable_declarator, const_spec, let, assignment ...):
+    function values become functions, quoted values string variables.
+    """
+    name_node = _first_field(node, 'name', 'pattern', 'left') or (node.named_children[0] if node.named_child_count else None)
+    value = _first_field(node, 'value', 'right') or (node.named_children[-1] if node.named_child_count > 1 else None)
+    if name_node is None or value is None or value == name_node:
+        return
+    match = re.search(r'[$A-Za-z_][\w$]*', _slice(source, name_node))
+    if not match:
+        return
+    if value.type in FUNCTION_VALUE_TYPES:
+        _add_function(symbols, match.group(0), node)
+    else:
+        _add_string_variable(symbols, match.group(0), node, _preview(source, value))
+
+
+C_FAMILY_EXTRACTOR = {
+    'function_definition': _cpp_function,
+    'init_declarator': _cpp_init_declarator,
+    'string_literal': _cpp_string_literal
+}
+JS_EXTRACTOR = {
+    'function_declaration': _named_function,
+    'generator_function_declaration': _named_function,
+    'method_definition': _named_function,
+    'variable_declarator': _declaration
+}
+
+# Node type -> handler, per language (parse_file_content compiles each table into one capture query)
+EXTRACTORS = {
+    'python': {'function_definition': _python_function, 'assignment': _python_assignment},
+    'cpp': C_FAMILY_EXTRACTOR,
+    'c': C_FAMILY_EXTRACTOR,
+    'javascript': JS_EXTRACTOR,
+    'typescript': JS_EXTRACTOR,
+    'tsx': JS_EXTRACTOR,
+    'go': {'function_declaration': _named_function, 'method_declaration': _named_function,
+           'const_spec': _declaration, 'var_spec': _declaration},
+    'java': {'method_declaration': _named_function, 'constructor_declaration': _named_function,
+             'variable_declarator': _declaration},
+    'c_sharp': {'method_declaration': _named_function, 'constructor_declaration': _named_function,
+                'variable_declarator': _declaration},
+    'kotlin': {'function_declaration': _named_function, 'property_declaration': _declaration},
+    'rust': {'function_item': _named_function, 'const_item': _declaration, 'static_item': _declaration,
+             'let_declaration': _declaration},
+    'php': {'function_definition': _named_function, 'method_declaration': _named_function,
+            'assignment_expression': _declaration},
+    'ruby': {'method': _named_function, 'singleton_method': _named_function, 'assignment': _declaration},
+}
+for _language, _handlers in EXTRACTORS.items():
+    registry.register_extractor(_language, _handlers)
+
 
 class ASTParser:
-    """Tree-sitter parser for Python and C++ (precise line numbers and code structure)"""
+    """Tree-sitter parser for every registry language (grammars load on first use; see registry.py)"""
     
     def __init__(self):
-        self.parsers = {}
-        self.languages = {}
-        try:
-            # Python (bundled)
-            self.languages['python'] = get_language('python')
-            self.parsers['python'] = get_parser('python')
-            
-            # C++ (bundled as 'cpp')
-            self.languages['cpp'] = get_language('cpp')
-            self.parsers['cpp'] = get_parser('cpp')
-            
-            logger.info("ast_parser_initialized", languages=list(self.parsers.keys()))
-            print(f"🌳 AST Parser Ready: {list(self.parsers.keys())} languages")
-        except Exception as e:
-            logger.error("ast_parser_init_failed", error=str(e))
-            self.parsers = {}
+        self.queries = {}
+        self.tree_cache = ParseTreeCache(settings.ast_tree_cache_max_entries)
+        logger.info("ast_parser_initialized", languages=registry.languages)
+        print(f"🌳 AST Parser Ready: {len(registry.languages)} languages (grammars load on first use)")
+    
+    @staticmethod
+    def supports(language: Optional[str]) -> bool:
+        return registry.supports(language)
+    
+    def parse_tree(self, code: str, language: str, cache_key: Optional[Hashable] = None):
+        """
+        Parse tree of `code`. With a `cache_key` (e.g. (repo, path)) the previous
+        tree of that key is edited and re-parsed incrementally (see ParseTreeCache).
+        """
+        source = bytes(code, "utf8")
+        if cache_key is None:
+            return registry.parser(language).parse(source)
+        return self.tree_cache.parse(cache_key, source, language, registry.parser(language))
     
-    def parse_file_content(self, code: str, language: str) -> Dict[str, Any]:
+    def parse_file_content(self, code: str, language: str, cache_key: Optional[Hashable] = None) -> FileSymbols:
         """
         Parse code content to extract:
         - Functions/classes with line ranges
-        - Variables/assignments (secrets in Python/C++)
+        - Variables/assignments (string values, flagged potential secrets)
         - Exact line numbers for nodes
+        
+        Returns a compact FileSymbols (no tree-sitter objects; the tree itself
+        stays in the parse-tree cache when a `cache_key` is given).
+        
+        The tree is walked once, with no depth limit, by a precompiled query
+        capturing the node types of the language's extractor (registry handler
+        table); captured nodes are dispatched to their handlers, which slice
+        text from the source bytes.
         """
-        if language not in self.parsers:
+        handlers = registry.extractor(language)
+        if not handlers or not self.supports(language):
             logger.warning("unsupported_language_for_parsing", language=language)
-            return {'functions': [], 'variables': [], 'lines': len(code.splitlines())}
+            return FileSymbols(language or 'unknown', total_lines=len(code.splitlines()))
         
-        parser = self.parsers[language]
-        tree = parser.parse(bytes(code, "utf8"))
-        root_node = tree.root_node
+        source = bytes(code, "utf8")
+        root_node = self.parse_tree(code, language, cache_key).root_node
         
-        functions = []
-        variables = []
+        symbols = FileSymbols(language, total_lines=root_node.end_point[0] + 1)
+        for node, node_type in self._extraction_query(language, handlers).captures(root_node):
+            handlers[node_type](node, source, symbols)
         
-        def traverse(node, depth=0):
-            if node is None:
-                return
-            node_type = node.type
-            start_line = node.start_point[0] + 1
-            end_line = node.end_point[0] + 1
-            
-            if language == 'python':
-                if node_type == 'function_definition':
-                    name_node = None
-                    for child in node.named_children:
-                        if child.type == 'identifier':
-                            name_node = child
-                            break
-                    func_name = name_node.text.decode('utf8') if name_node else 'anonymous'
-                    functions.append({
-                        'name': func_name,
-                        'start_line': start_line,
-                        'end_line': end_line,
-                        'params': [],
-                        'body_lines': (start_line, end_line)
-                    })
-                
-                elif node_type == 'assignment':
-                    left = node.child_by_field_name('left')
-                    right = node.child_by_field_name('right')
-                    if left and right:
-                        var_name = left.text.decode('utf8').strip()
-                        var_value = right.text.decode('utf8')[:50] + '...' if len(right.text) > 50 else right.text.decode('utf8')
-                        if '"' in var_value or "'" in var_value:
-                            var_type = 'potential_secret' if any(s in var_value.lower() for s in ['key', 'secret', 'pass', 'api', 'token']) else 'string_assignment'
-                            variables.append({
-                                'name': var_name,
-                                'line': start_line,
-                                'value': var_value,
-                                'type': var_type
-                            })
-            
-            elif language == 'cpp':
-                if node_type == 'function_definition':
-                    declarator = node.child_by_field_name('declarator')
-                    if declarator:
-                        name_node = None
-                        for child in declarator.named_children:
-                            if child.type == 'identifier':
-                                name_node = child
-                                break
-                        func_name = name_node.text.decode('utf8') if name_node else 'anonymous'
-                        functions.append({
-                            'name': func_name,
-                            'start_line': start_line,
-                            'end_line': end_line,
-                            'params': [],
-                            'body_lines': (start_line, end_line)
-                        })
-                
-                # FIXED: Handle C++ const/var initialization
-                elif node_type == 'init_declarator':
-                    # const std::string API_KEY = "value"
-                    declarator = node.named_children[0] if node.named_children else None
-                    initializer = node.child_by_field_name('value')
-                    
-                    if declarator and initializer:
-                        var_name = 'unknown_var'
-                        for child in declarator.named_children:
-                            if child.type == 'identifier':
-                                var_name = child.text.decode('utf8').strip()
-                                break
-                        
-                        if initializer.type == 'string_literal' or '"' in initializer.text.decode('utf8'):
-                            var_value = initializer.text.decode('utf8')[:50] + '...' if len(initializer.text) > 50 else initializer.text.decode('utf8')
-                            if any(s in var_value.lower() for s in ['key', 'secret', 'pass', 'api', 'token']):
-                                variables.append({
-                                    'name': var_name,
-                                    'line': start_line,
-                                    'value': var_value,
-                                    'type': 'potential_secret'
-                                })
-                
-                # Also check standalone string_literal nodes
-                elif node_type == 'string_literal':
-                    var_value = node.text.decode('utf8')[:50] + '...' if len(node.text) > 50 else node.text.decode('utf8')
-                    if any(s in var_value.lower() for s in ['key', 'secret', 'pass', 'api', 'token']):
-                        var_name = 'literal_string'
-                        if node.parent:
-                            for sibling in node.parent.named_children:
-                                if sibling.type == 'identifier' and sibling.end_byte < node.start_byte:
-                                    var_name = sibling.text.decode('utf8').strip()
-                                    break
-                        variables.append({
-                            'name': var_name,
-                            'line': start_line,
-                            'value': var_value,
-                            'type': 'potential_secret'
-                        })
-            
-            if depth < 8:
-                for child in node.named_children:
-                    traverse(child, depth + 1)
-        
-        traverse(root_node)
+        logger.info("ast_parsing_complete", language=language, functions_count=symbols.function_count, variables_count=symbols.variable_count)
+        return symbols
+    
+    def _extraction_query(self, language: str, handlers: Dict[str, Any]):
+        """One query capturing every handled node type, each under its own type name (compiled once per table)"""
+        key = (language, tuple(handlers))
+        query = self.queries.get(key)
+        if query is None:
+            query = registry.language(language).query(
+                "\n".join(f"({node_type}) @{node_type}" for node_type in handlers)
+            )
+            self.queries[key] = query
+        return query
+    
+    def classify_lines(self, code: str, language: str, cache_key: Optional[Hashable] = None) -> Dict[str, Set[int]]:
+        """
+        Lines covered by comments (Python docstrings included) and by import /
+        #include statements -> {'comment': {line, ...}, 'import': {line, ...}}
+        """
+        kinds: Dict[str, Set[int]] = {'comment': set(), 'import': set()}
+        if not self.supports(language):
+            return kinds
         
-        logger.info("ast_parsing_complete", language=language, functions_count=len(functions), variables_count=len(variables))
-        return {
-            'tree': tree,
-            'root_node': root_node,
-            'functions': functions,
-            'variables': variables,
-            'total_lines': root_node.end_point[0] + 1
-        }
+        spec = registry.spec(language)
+        comment_types, import_types = spec.comment_types, spec.import_types
+        stack = [self.parse_tree(code, language, cache_key).root_node]
+        while stack:
+            node = stack.pop()
+            kind = None
+            if node.type in comment_types:
+                kind = 'comment'
+            elif node.type in import_types:
+                kind = 'import'
+            elif (language == 'python' and node.type == 'expression_statement'
+                  and node.named_child_count == 1 and node.named_children[0].type == 'string'):
+                kind = 'comment'  # docstring / bare string statement
+            
+            if kind:
+                kinds[kind].update(range(node.start_point[0] + 1, node.end_point[0] + 2))
+            else:
+                stack.extend(node.named_children)
+        return kinds
     
     def get_exact_line_for_issue(self, code: str, issue_type: str, approx_line: int, language: str = 'python') -> int:
         """Refine issue line with pattern matching"""
@@ -406,14 +513,14 @@ def test_ast_parser():
 
 api_key = "sk-1234567890abcdef"'''
     
-    py_result = parser.parse_file_content(py_code, 'python')
+    py_result = parser.parse_file_content(py_code, 'python').to_ast_result()
     print("\n=== Python AST Test ===")
-    print(f"Functions: {len(py_result['functions'])}")
-    for func in py_result['functions']:
-        print(f"  - {func['name']} (lines {func['start_line']}-{func['end_line']})")
-    print(f"Variables: {len(py_result['variables'])}")
-    for var in py_result['variables']:
-        print(f"  - {var['name']} at line {var['line']}: {var['value'][:20]}... ({var['type']})")
+    print(f"Functions: {len(py_result.functions)}")
+    for func in py_result.functions:
+        print(f"  - {func.name} (lines {func.start_line}-{func.end_line})")
+    print(f"Variables: {len(py_result.variables)}")
+    for var in py_result.variables:
+        print(f"  - {var.name} at line {var.line}: {var.value[:20]}... ({var.type})")
     
     cpp_code = '''#include <string>
 
@@ -424,14 +531,14 @@ std::string getUser(std::string userInput) {
 
 const std::string API_KEY = "sk-1234567890abcdef";'''
     
-    cpp_result = parser.parse_file_content(cpp_code, 'cpp')
+    cpp_result = parser.parse_file_content(cpp_code, 'cpp').to_ast_result()
     print("\n=== C++ AST Test ===")
-    print(f"Functions: {len(cpp_result['functions'])}")
-    for func in cpp_result['functions']:
-        print(f"  - {func['name']} (lines {func['start_line']}-{func['end_line']})")
-    print(f"Variables: {len(cpp_result['variables'])}")
-    for var in cpp_result['variables']:
-        print(f"  - {var['name']} at line {var['line']}: {var['value'][:20]}... ({var['type']})")
+    print(f"Functions: {len(cpp_result.functions)}")
+    for func in cpp_result.functions:
+        print(f"  - {func.name} (lines {func.start_line}-{func.end_line})")
+    print(f"Variables: {len(cpp_result.variables)}")
+    for var in cpp_result.variables:
+        print(f"  - {var.name} at line {var.line}: {var.value[:20]}... ({var.type})")
 
 if __name__ == "__main__":
     test_ast_parser()
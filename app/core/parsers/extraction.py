@@ -0,0 +1,138 @@
+# app/core/parsers/extraction.py (Parallel AST extraction in worker processes for multi-file PRs)
+import asyncio
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+import structlog
+from app.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+def extract_file(code: str, language: Optional[str], cache_key: Optional[tuple] = None) -> Dict[str, Any]:
+    """
+    Parse + extract one file -> plain data only (no Tree / Node objects cross the
+    process boundary): its FileSymbols, the line kinds used by the prefilter and
+    the rule engine's secret count.
+
+    Runs inside a worker process (or inline as the fallback); `cache_key` reuses
+    that process' parse-tree cache.
+    """
+    from app.core.parsers.ast_parser import parser as ast_parser
+    from app.core.rules import rule_engine
+
+    result = {
+        'symbols': ast_parser.parse_file_content(code, language, cache_key),
+        'line_kinds': {'comment': [], 'import': []},
+        'secret_findings': 0
+    }
+    if ast_parser.supports(language):
+        kinds = ast_parser.classify_lines(code, language, cache_key)
+        result['line_kinds'] = {kind: sorted(lines) for kind, lines in kinds.items()}
+        result['secret_findings'] = len([
+            i for i in rule_engine.run(code, language, cache_key) if i.rule_id == 'hardcoded-secret'
+        ])
+    return result
+
+
+class ExtractionPool:
+    """
+    Sends extract_file() calls to worker processes so parsing never blocks the
+    event loop and PRs with many files use every core.
+
+    Each worker is its own single-process executor and a file is always routed
+    to the same one (by hash of its (repo, path) key), so successive pushes hit
+    that worker's parse-tree cache and are re-parsed incrementally.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._executors: List[Optional[ProcessPoolExecutor]] = [None] * self.workers
+        # spawn: forking a process that runs an event loop and boto3 threads is unsafe
+        self._context = multiprocessing.get_context("spawn")
+
+    def _executor(self, cache_key: Optional[tuple]) -> Tuple[int, ProcessPoolExecutor]:
+        slot = zlib.crc32(repr(cache_key).encode()) % self.workers
+        executor = self._executors[slot]
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=1, mp_context=self._context)
+            self._executors[slot] = executor
+        return slot, executor
+
+    async def extract(self, code: str, language: Optional[str], cache_key: Optional[tuple] = None) -> Dict[str, Any]:
+        """extract_file() in the key's worker (inline if that worker died; it is replaced next time)"""
+        slot, executor = self._executor(cache_key)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, extract_file, code, language, cache_key)
+        except BrokenProcessPool as e:
+            logger.warning("ast_worker_broken", slot=slot, error=str(e))
+            self._executors[slot] = None
+            return extract_file(code, language)
+
+    async def extract_many(self, repo: str, files: Dict[str, Tuple[str, Optional[str]]]) -> Dict[str, Dict[str, Any]]:
+        """{filename: (code, language)} -> {filename: extraction}; failed files are left out"""
+        filenames = list(files)
+        results = await asyncio.gather(
+            *(self.extract(code, language, (repo, filename)) for filename, (code, language) in files.items()),
+            return_exceptions=True
+        )
+        extracted = {}
+        for filename, result in zip(filenames, results):
+            if isinstance(result, Exception):
+                logger.warning("ast_file_parse_failed", filename=filename, error=str(result))
+                continue
+            extracted[filename] = result
+        return extracted
+
+    def shutdown(self):
+        for executor in self._executors:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executors = [None] * self.workers
+
+
+class InlineExtraction:
+    """Same interface, parsing on the event loop (ast_process_pool_enabled=False)"""
+
+    async def extract(self, code: str, language: Optional[str], cache_key: Optional[tuple] = None) -> Dict[str, Any]:
+        return extract_file(code, language, cache_key)
+
+    async def extract_many(self, repo: str, files: Dict[str, Tuple[str, Optional[str]]]) -> Dict[str, Dict[str, Any]]:
+        extracted = {}
+        for filename, (code, language) in files.items():
+            try:
+                extracted[filename] = extract_file(code, language, (repo, filename))
+            except Exception as e:
+                logger.warning("ast_file_parse_failed", filename=filename, error=str(e))
+        return extracted
+
+    def shutdown(self):
+        pass
+
+
+_extraction_pool = None
+
+
+def get_extraction_pool():
+    """Process-wide extraction pool (worker processes start lazily, on first use)"""
+    global _extraction_pool
+    if _extraction_pool is None:
+        if settings.ast_process_pool_enabled:
+            _extraction_pool = ExtractionPool(settings.ast_process_workers or None)
+        else:
+            _extraction_pool = InlineExtraction()
+        logger.info("ast_extraction_pool_initialized", kind=type(_extraction_pool).__name__,
+                    workers=getattr(_extraction_pool, 'workers', 0))
+    return _extraction_pool
+
+
+def shutdown_extraction_pool():
+    """Stop the AST worker processes (called on app shutdown)"""
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown()
+        _extraction_pool = None
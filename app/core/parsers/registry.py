@@ -0,0 +1,132 @@
+# app/core/parsers/registry.py (Language registry: file extensions, lazily loaded tree-sitter grammars, pluggable extractors)
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+# Node handler used by ASTParser.parse_file_content: (node, source bytes, FileSymbols being filled)
+NodeHandler = Callable[[Any, bytes, Any], None]
+
+C_COMMENT_TYPES = frozenset({'comment'})
+SPLIT_COMMENT_TYPES = frozenset({'line_comment', 'block_comment'})
+
+
+@dataclass(frozen=True)
+class LanguageSpec:
+    """One supported language: its file extensions and tree-sitter grammar"""
+    name: str
+    extensions: Tuple[str, ...]
+    grammar: Optional[str] = None  # tree_sitter_languages name (defaults to `name`)
+    comment_types: FrozenSet[str] = C_COMMENT_TYPES
+    import_types: FrozenSet[str] = frozenset()
+
+
+BUILTIN_LANGUAGES = (
+    LanguageSpec('python', ('.py', '.pyi'),
+                 import_types=frozenset({'import_statement', 'import_from_statement', 'future_import_statement'})),
+    LanguageSpec('cpp', ('.cpp', '.cc', '.cxx', '.c++', '.h', '.hh', '.hpp', '.hxx', '.ipp'),
+                 import_types=frozenset({'preproc_include', 'using_declaration'})),
+    LanguageSpec('c', ('.c',), import_types=frozenset({'preproc_include'})),
+    LanguageSpec('javascript', ('.js', '.jsx', '.mjs', '.cjs'), import_types=frozenset({'import_statement'})),
+    LanguageSpec('typescript', ('.ts', '.mts', '.cts'), import_types=frozenset({'import_statement'})),
+    LanguageSpec('tsx', ('.tsx',), import_types=frozenset({'import_statement'})),
+    LanguageSpec('go', ('.go',), import_types=frozenset({'import_declaration'})),
+    LanguageSpec('java', ('.java',), comment_types=SPLIT_COMMENT_TYPES, import_types=frozenset({'import_declaration'})),
+    LanguageSpec('kotlin', ('.kt', '.kts'), comment_types=frozenset({'line_comment', 'multiline_comment'}),
+                 import_types=frozenset({'import_header'})),
+    LanguageSpec('rust', ('.rs',), comment_types=SPLIT_COMMENT_TYPES, import_types=frozenset({'use_declaration'})),
+    LanguageSpec('c_sharp', ('.cs',), import_types=frozenset({'using_directive'})),
+    LanguageSpec('php', ('.php',), import_types=frozenset({'namespace_use_declaration'})),
+    LanguageSpec('ruby', ('.rb',)),
+)
+
+
+class ParserRegistry:
+    """
+    Maps file extensions to languages and hands out tree-sitter languages and
+    parsers, loading each grammar on first use (nothing is loaded at import
+    time). A grammar that fails to load is remembered as unavailable.
+
+    Symbol extraction is pluggable per language: register_extractor() takes a
+    {node type: handler} table that ASTParser turns into one capture query.
+    """
+
+    def __init__(self):
+        self._specs: Dict[str, LanguageSpec] = {}
+        self._extensions: Dict[str, str] = {}
+        self._extractors: Dict[str, Dict[str, NodeHandler]] = {}
+        self._loaded: Dict[str, Tuple[Any, Any]] = {}  # language -> (Language, Parser)
+        self._unavailable: Dict[str, str] = {}  # language -> load error
+
+    def register(self, spec: LanguageSpec, extractor: Optional[Dict[str, NodeHandler]] = None):
+        self._specs[spec.name] = spec
+        for extension in spec.extensions:
+            self._extensions[extension] = spec.name
+        if extractor is not None:
+            self.register_extractor(spec.name, extractor)
+
+    def register_extractor(self, language: str, handlers: Dict[str, NodeHandler]):
+        """Set (replace) the node handlers of a registered language"""
+        if language not in self._specs:
+            raise ValueError(f"Unknown language: {language}")
+        self._extractors[language] = dict(handlers)
+
+    def detect_language(self, filename: str) -> Optional[str]:
+        """Language of a file by extension (None if unknown)"""
+        return self._extensions.get(os.path.splitext(filename)[1].lower())
+
+    def spec(self, language: str) -> Optional[LanguageSpec]:
+        return self._specs.get(language)
+
+    def extractor(self, language: str) -> Dict[str, NodeHandler]:
+        return self._extractors.get(language, {})
+
+    @property
+    def languages(self) -> List[str]:
+        return list(self._specs)
+
+    @property
+    def loaded(self) -> List[str]:
+        return list(self._loaded)
+
+    def _load(self, language: str) -> Optional[Tuple[Any, Any]]:
+        entry = self._loaded.get(language)
+        if entry is not None or language not in self._specs or language in self._unavailable:
+            return entry
+        grammar = self._specs[language].grammar or language
+        try:
+            from tree_sitter_languages import get_language, get_parser
+            entry = (get_language(grammar), get_parser(grammar))
+        except Exception as e:
+            self._unavailable[language] = str(e)
+            logger.error("grammar_load_failed", language=language, error=str(e))
+            return None
+        self._loaded[language] = entry
+        logger.info("grammar_loaded", language=language)
+        return entry
+
+    def supports(self, language: Optional[str]) -> bool:
+        """True if the language's grammar is (or can be) loaded"""
+        return language is not None and self._load(language) is not None
+
+    def language(self, language: str):
+        """tree-sitter Language (KeyError if unsupported)"""
+        entry = self._load(language)
+        if entry is None:
+            raise KeyError(language)
+        return entry[0]
+
+    def parser(self, language: str):
+        """tree-sitter Parser (KeyError if unsupported)"""
+        entry = self._load(language)
+        if entry is None:
+            raise KeyError(language)
+        return entry[1]
+
+
+# Global registry (extractors are registered by ast_parser)
+registry = ParserRegistry()
+for _spec in BUILTIN_LANGUAGES:
+    registry.register(_spec)
@@ -0,0 +1,111 @@
+# app/core/parsers/symbols.py (Compact per-file AST symbols: interned names + int arrays, no syntax trees)
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from app.models import ASTFunction, ASTVariable, ASTResult
+
+
+class FileSymbols:
+    """
+    Functions and string variables extracted from one file.
+
+    Names and variable types are interned, line numbers live in flat int
+    arrays (function i spans function_lines[2i]..function_lines[2i+1]), and
+    no tree-sitter objects are referenced, so instances are small, cheap to
+    pickle between processes and never keep a syntax tree alive. Convert with
+    to_ast_result() where the API model is needed.
+    """
+
+    __slots__ = (
+        'language', 'file', 'total_lines',
+        'function_names', 'function_lines',
+        'variable_names', 'variable_lines', 'variable_values', 'variable_types'
+    )
+
+    def __init__(self, language: str, total_lines: int = 0, file: Optional[str] = None):
+        self.language = language
+        self.file = file
+        self.total_lines = total_lines
+        self.function_names: List[str] = []
+        self.function_lines = array('i')
+        self.variable_names: List[str] = []
+        self.variable_lines = array('i')
+        self.variable_values: List[str] = []
+        self.variable_types: List[str] = []
+
+    def add_function(self, name: str, start_line: int, end_line: int):
+        self.function_names.append(sys.intern(name))
+        self.function_lines.append(start_line)
+        self.function_lines.append(end_line)
+
+    def add_variable(self, name: str, line: int, value: str, var_type: str):
+        self.variable_names.append(sys.intern(name))
+        self.variable_lines.append(line)
+        self.variable_values.append(value)
+        self.variable_types.append(sys.intern(var_type))
+
+    @property
+    def function_count(self) -> int:
+        return len(self.function_names)
+
+    @property
+    def variable_count(self) -> int:
+        return len(self.variable_names)
+
+    def function_ranges(self) -> Iterator[Tuple[str, int, int]]:
+        """(name, start_line, end_line) per function, in source order"""
+        lines = self.function_lines
+        for i, name in enumerate(self.function_names):
+            yield name, lines[2 * i], lines[2 * i + 1]
+
+    def functions(self) -> List[Dict[str, Any]]:
+        """Function dicts ({'name', 'start_line', 'end_line'}) for diff/prefilter helpers"""
+        return [{'name': name, 'start_line': start, 'end_line': end} for name, start, end in self.function_ranges()]
+
+    def secrets(self) -> List[Tuple[str, int]]:
+        """(name, line) of variables flagged as potential secrets"""
+        return [
+            (name, self.variable_lines[i])
+            for i, name in enumerate(self.variable_names)
+            if self.variable_types[i] == 'potential_secret'
+        ]
+
+    def to_ast_result(self) -> ASTResult:
+        file = self.file or ''
+        return ASTResult(
+            functions=[
+                ASTFunction(name=name, file=file, start_line=start, end_line=end)
+                for name, start, end in self.function_ranges()
+            ],
+            variables=[
+                ASTVariable(name=name, file=file, line=self.variable_lines[i],
+                            value=self.variable_values[i], type=self.variable_types[i])
+                for i, name in enumerate(self.variable_names)
+            ],
+            total_lines=self.total_lines,
+            language=self.language
+        )
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+        self.function_names = [sys.intern(n) for n in self.function_names]
+        self.variable_names = [sys.intern(n) for n in self.variable_names]
+        self.variable_types = [sys.intern(t) for t in self.variable_types]
+
+    def __repr__(self) -> str:
+        return f"FileSymbols({self.file or '?'}, {self.language}, functions={self.function_count}, variables={self.variable_count})"
+
+
+def combined_ast_info(symbols: Iterable[FileSymbols]) -> Dict[str, Any]:
+    """Several files' symbols as one {'functions', 'variables', 'total_lines'} payload (API / PR comment)"""
+    info: Dict[str, Any] = {'functions': [], 'variables': [], 'total_lines': 0}
+    for file_symbols in symbols:
+        result = file_symbols.to_ast_result()
+        info['functions'].extend(f.dict() for f in result.functions)
+        info['variables'].extend(v.dict() for v in result.variables)
+        info['total_lines'] += result.total_lines
+    return info
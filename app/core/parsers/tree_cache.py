@@ -0,0 +1,117 @@
+# app/core/parsers/tree_cache.py (LRU cache of parse trees with incremental re-parsing)
+import difflib
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+
+def _line_offsets(lines: List[bytes]) -> List[int]:
+    """Byte offset of the start of each line, plus the end of the source"""
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+    return offsets
+
+
+def _point(lines: List[bytes], index: int) -> Tuple[int, int]:
+    """(row, column) of the start of line `index` (end of source when index == len(lines))"""
+    if index < len(lines) or not lines or lines[-1].endswith(b"\n"):
+        return (index, 0)
+    return (index - 1, len(lines[-1]))  # last line has no trailing newline
+
+
+def line_edits(old: bytes, new: bytes) -> List[Tuple[int, int, int, Tuple[int, int], Tuple[int, int], Tuple[int, int]]]:
+    """
+    Tree.edit() arguments turning `old` into `new`, from a line diff, last
+    edit first: applied in that order every edit's old coordinates are still
+    valid, since only text after them has moved.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    old_offsets, new_offsets = _line_offsets(old_lines), _line_offsets(new_lines)
+
+    # Only diff the region between the common prefix and suffix (cost follows the edit size)
+    prefix, limit = 0, min(len(old_lines), len(new_lines))
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+
+    edits = []
+    matcher = difflib.SequenceMatcher(
+        None, old_lines[prefix:len(old_lines) - suffix], new_lines[prefix:len(new_lines) - suffix], autojunk=False
+    )
+    for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+        if tag == 'equal':
+            continue
+        i1, i2, j1, j2 = i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix
+        start_byte = old_offsets[i1]
+        new_end_point = _point(new_lines, j2)
+        # Rows after the edit start are shifted by where the edit starts in each version
+        new_end_point = (new_end_point[0] - j1 + i1, new_end_point[1])
+        edits.append((
+            start_byte,
+            old_offsets[i2],
+            start_byte + new_offsets[j2] - new_offsets[j1],
+            _point(old_lines, i1),
+            _point(old_lines, i2),
+            new_end_point
+        ))
+    return edits
+
+
+class ParseTreeCache:
+    """
+    Last parse tree (and its source) per key, typically (repo, path).
+
+    When a new version of a cached file is parsed, the line diff against the
+    cached source is applied to the old tree as Tree.edit() calls and the file
+    is re-parsed incrementally, so the work scales with the size of the edit.
+    LRU-bounded: evicted entries drop the only reference to their tree, which
+    frees its native memory.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (language, source, tree)
+        self.stats = {'hits': 0, 'incremental': 0, 'full': 0, 'evictions': 0}
+
+    def parse(self, key: Hashable, source: bytes, language: str, parser: Any):
+        """Parse tree of `source`, reusing (and replacing) the cached tree of `key`"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == language:
+            _, old_source, old_tree = entry
+            if old_source == source:
+                self.stats['hits'] += 1
+                self._entries.move_to_end(key)
+                return old_tree
+            edits = line_edits(old_source, source)
+            for edit in edits:
+                old_tree.edit(*edit)
+            tree = parser.parse(source, old_tree)
+            self.stats['incremental'] += 1
+            logger.debug("tree_reparsed_incrementally", key=str(key), edits=len(edits))
+        else:
+            tree = parser.parse(source)
+            self.stats['full'] += 1
+
+        self._entries[key] = (language, source, tree)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+            logger.debug("tree_cache_evicted", key=str(evicted))
+        return tree
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        return entry[2] if entry is not None else None
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
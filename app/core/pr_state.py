@@ -0,0 +1,103 @@
+# app/core/pr_state.py (Per-PR analysis state for incremental re-review on synchronize pushes)
+from typing import Any, Dict, List, Optional, Set
+import structlog
+from app.config import get_settings
+from app.core.cache import CacheBackend, create_cache_backend
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+class PRStateStore:
+    """
+    Remembers, per (repo, PR), the head SHA of the last analysis and for every
+    reviewed file its blob SHA and issues:
+
+        {'head_sha': str, 'files': {filename: {'blob_sha': str, 'issues': [issue dicts]}}}
+    """
+
+    KEY_PREFIX = "devagent:pr_state:"
+
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+
+    def _key(self, repo_full_name: str, pr_number: int) -> str:
+        return f"{self.KEY_PREFIX}{repo_full_name}#{pr_number}"
+
+    async def load(self, repo_full_name: str, pr_number: int) -> Optional[Dict[str, Any]]:
+        return await self.backend.get(self._key(repo_full_name, pr_number))
+
+    async def save(self, repo_full_name: str, pr_number: int, state: Dict[str, Any]):
+        await self.backend.set(self._key(repo_full_name, pr_number), state, self.ttl)
+
+    @staticmethod
+    def split_unchanged(
+        state: Optional[Dict[str, Any]],
+        files: List[Dict[str, Any]],
+        changed_since: Optional[Set[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Split PR files into those needing analysis and those whose previous issues can be
+        carried forward (same blob SHA, and not touched by the before..after compare).
+
+        Returns {'to_analyze': [file entries], 'carried': {filename: [issue dicts]}}
+        """
+        if not state:
+            return {'to_analyze': list(files), 'carried': {}}
+
+        previous = state.get('files', {})
+        to_analyze, carried = [], {}
+        for file in files:
+            filename = file.get('filename', '')
+            entry = previous.get(filename)
+            unchanged = (
+                entry is not None
+                and file.get('sha') is not None
+                and entry.get('blob_sha') == file.get('sha')
+                and (changed_since is None or filename not in changed_since)
+            )
+            if unchanged:
+                carried[filename] = entry.get('issues', [])
+            else:
+                to_analyze.append(file)
+        return {'to_analyze': to_analyze, 'carried': carried}
+
+    @staticmethod
+    def build_state(
+        head_sha: Optional[str],
+        files: List[Dict[str, Any]],
+        analyzed: List[str],
+        issues: List[Dict[str, Any]],
+        carried: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """New state: analyzed files with their fresh issues + carried-forward files"""
+        blob_shas = {f.get('filename', ''): f.get('sha') for f in files}
+        issues_by_file: Dict[str, List[Dict[str, Any]]] = {name: [] for name in analyzed}
+        for issue in issues:
+            if issue.get('file') in issues_by_file:
+                issues_by_file[issue['file']].append(issue)
+
+        state_files = {
+            name: {'blob_sha': blob_shas.get(name), 'issues': file_issues}
+            for name, file_issues in issues_by_file.items()
+            if blob_shas.get(name)
+        }
+        for name, file_issues in carried.items():
+            state_files[name] = {'blob_sha': blob_shas.get(name), 'issues': file_issues}
+        return {'head_sha': head_sha, 'files': state_files}
+
+
+_pr_state_store: Optional[PRStateStore] = None
+
+
+def get_pr_state_store() -> Optional[PRStateStore]:
+    """Get the process-wide PR state store (None when disabled)"""
+    global _pr_state_store
+    if _pr_state_store is None:
+        backend = create_cache_backend(settings.pr_state_backend)
+        if backend is None:
+            return None
+        _pr_state_store = PRStateStore(backend, ttl=settings.pr_state_ttl_seconds)
+        logger.info("pr_state_store_initialized", backend=type(backend).__name__)
+    return _pr_state_store
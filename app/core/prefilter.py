@@ -0,0 +1,233 @@
+# app/core/prefilter.py (Deterministic pre-analysis: skip or downgrade PR files that don't need a full model review)
+import re
+from typing import Any, Dict, Hashable, List, Optional, Set
+import structlog
+from app.core.diff import parse_patch
+from app.core.parsers.ast_parser import parser as ast_parser
+from app.core.parsers.registry import registry
+
+logger = structlog.get_logger()
+
+# Vendored / third-party trees and generated sources (matched against the repo-relative path)
+GENERATED_PATH_PATTERNS = [
+    r'(^|/)(vendor|vendors|third_party|thirdparty|third-party|external|extern|node_modules|site-packages)/',
+    r'(^|/)(generated|gen|__generated__)/',
+    r'_pb2(_grpc)?\.py$',
+    r'\.pb\.(h|cc)$',
+    r'\.grpc\.pb\.(h|cc)$',
+    r'(^|/)moc_[^/]+\.cpp$',
+    r'(^|/)ui_[^/]+\.h$',
+    r'\.min\.js$',
+]
+
+# Header markers of generated files (checked in the first lines only)
+GENERATED_CONTENT_MARKERS = re.compile(
+    r'@generated|do not edit|auto-?generated|code generated by|generated by the protocol buffer compiler',
+    re.IGNORECASE
+)
+GENERATED_HEADER_LINES = 5
+
+# Text fallbacks for removed lines (they are not in the new file's AST)
+C_STYLE_COMMENTS = ('//', '/*')
+COMMENT_PREFIXES = {
+    'python': ('#', '"""', "'''"), 'ruby': ('#',), 'php': ('//', '/*', '#'),
+    **{language: C_STYLE_COMMENTS for language in ('cpp', 'c', 'javascript', 'typescript', 'tsx', 'go', 'java',
+                                                   'kotlin', 'rust', 'c_sharp')}
+}
+IMPORT_PREFIXES = {
+    'python': ('import ', 'from '), 'cpp': ('#include', 'using '), 'c': ('#include',),
+    'javascript': ('import ',), 'typescript': ('import ',), 'tsx': ('import ',),
+    'go': ('import ',), 'java': ('import ',), 'kotlin': ('import ',), 'rust': ('use ',),
+    'c_sharp': ('using ',), 'php': ('use ',), 'ruby': ('require ', 'require_relative ')
+}
+
+# Languages where a change of leading indentation changes the program
+INDENTATION_SENSITIVE_LANGUAGES = {'python'}
+
+# String delimiters whose contents are compared verbatim by the whitespace check
+STRING_QUOTES = ('"', "'", '`')
+
+SKIP = "skip"    # no model call at all
+CHEAP = "cheap"  # QUICK review (security-only, small budget)
+FULL = "full"    # normal review
+
+
+class PreFilter:
+    """
+    Classifies each PR file before any model call:
+
+        skip  - generated/vendored path or header, pure rename, whitespace-only
+                or comment-only change
+        cheap - only imports (and comments) changed, or no function body touched
+        full  - everything else (including files without a patch)
+
+    Decisions: {'filename', 'decision': skip|cheap|full, 'reason'}
+    """
+
+    def __init__(self):
+        self.path_patterns = [re.compile(p, re.IGNORECASE) for p in GENERATED_PATH_PATTERNS]
+
+    def classify_entry(self, file: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """Decide from the PR file entry alone (before fetching content); None = needs content"""
+        filename = file.get('filename', '')
+        if any(p.search(filename) for p in self.path_patterns):
+            return self._decision(filename, SKIP, 'generated_or_vendored_path')
+        if file.get('status') == 'renamed' and not file.get('changes'):
+            return self._decision(filename, SKIP, 'rename_only')
+
+        patch = file.get('patch')
+        if patch:
+            keep_indent = registry.detect_language(filename) in INDENTATION_SENSITIVE_LANGUAGES
+            if all(self._normalized(old, keep_indent) == self._normalized(new, keep_indent)
+                   for old, new in self._hunk_texts(patch)):
+                return self._decision(filename, SKIP, 'whitespace_only')
+        return None
+
+    def classify(
+        self,
+        file: Dict[str, Any],
+        content: Optional[str],
+        language: str,
+        functions: Optional[List[Dict[str, Any]]] = None,
+        cache_key: Optional[Hashable] = None,
+        line_kinds: Optional[Dict[str, Set[int]]] = None
+    ) -> Dict[str, str]:
+        """
+        Full decision using the fetched content and its tree-sitter AST (`cache_key`:
+        see ASTParser.parse_tree; `line_kinds`: classify_lines() output computed elsewhere)
+        """
+        filename = file.get('filename', '')
+        early = self.classify_entry(file)
+        if early is not None:
+            return early
+
+        patch = file.get('patch')
+        if content is None or not patch:
+            return self._decision(filename, FULL, 'no_patch' if content is not None else 'content_unavailable')
+
+        header = "\n".join(content.splitlines()[:GENERATED_HEADER_LINES])
+        if GENERATED_CONTENT_MARKERS.search(header):
+            return self._decision(filename, SKIP, 'generated_content')
+
+        hunks = parse_patch(patch)
+        added_lines = [n for h in hunks for n in h['added']]
+        # A deletion touches the lines on both sides of where it was
+        touched = set(added_lines) | {m for h in hunks for n in h['removed_at'] for m in (n - 1, n)}
+        _, removed_texts = self._patch_texts(patch)
+
+        lines = content.splitlines()
+        kinds = line_kinds if line_kinds is not None else ast_parser.classify_lines(content, language, cache_key)
+        blank = {n for n in added_lines if n > len(lines) or not lines[n - 1].strip()}
+        comment_lines = kinds['comment'] | blank
+        removed_kinds = {self._text_kind(text, language) for text in removed_texts}
+
+        if set(added_lines) <= comment_lines and removed_kinds <= {'blank', 'comment'}:
+            return self._decision(filename, SKIP, 'comments_only')
+        if set(added_lines) <= comment_lines | kinds['import'] and removed_kinds <= {'blank', 'comment', 'import'}:
+            return self._decision(filename, CHEAP, 'imports_only')
+
+        function_lines: Set[int] = set()
+        for function in functions or []:
+            function_lines.update(range(function['start_line'], function['end_line'] + 1))
+        if functions is not None and not (touched & function_lines):
+            return self._decision(filename, CHEAP, 'no_functions_changed')
+
+        return self._decision(filename, FULL, 'code_changed')
+
+    @staticmethod
+    def _decision(filename: str, decision: str, reason: str) -> Dict[str, str]:
+        return {'filename': filename, 'decision': decision, 'reason': reason}
+
+    @staticmethod
+    def _patch_texts(patch: str) -> tuple:
+        """(added line texts, removed line texts) of a unified diff body"""
+        added, removed = [], []
+        for raw in patch.splitlines():
+            if raw.startswith('+') and not raw.startswith('+++'):
+                added.append(raw[1:])
+            elif raw.startswith('-') and not raw.startswith('---'):
+                removed.append(raw[1:])
+        return added, removed
+
+    @staticmethod
+    def _hunk_texts(patch: str) -> List[tuple]:
+        """
+        (old text, new text) line lists per hunk, context lines included, so a line
+        that only moved (e.g. a check now after the call it guarded) still differs
+        """
+        hunks: List[tuple] = []
+        for raw in patch.splitlines():
+            if raw.startswith('@@') or not hunks:
+                hunks.append(([], []))
+                if raw.startswith('@@'):
+                    continue
+            old, new = hunks[-1]
+            if raw.startswith(('+++', '---', '\\')):
+                continue
+            if raw.startswith('+'):
+                new.append(raw[1:])
+            elif raw.startswith('-'):
+                old.append(raw[1:])
+            else:
+                old.append(raw[1:])
+                new.append(raw[1:])
+        return hunks
+
+    @classmethod
+    def _normalized(cls, texts: List[str], keep_indent: bool = False) -> List[str]:
+        """Lines with insignificant whitespace removed (blank lines dropped); order matters"""
+        return [n for n in (cls._normalized_line(t, keep_indent) for t in texts) if n]
+
+    @staticmethod
+    def _normalized_line(text: str, keep_indent: bool = False) -> str:
+        """
+        Whitespace between tokens dropped (one space kept between two word characters,
+        so `return x` != `returnx`), string literals kept verbatim, and the leading
+        indentation kept when `keep_indent`. Strings are tracked within the line only.
+        """
+        code = text.lstrip()
+        if not code:
+            return ""
+        out = [text[:len(text) - len(code)].expandtabs(8)] if keep_indent else []
+        quote, previous, spaced = None, "", False
+        i = 0
+        while i < len(code):
+            char = code[i]
+            if quote is not None:
+                if char == '\\' and i + 1 < len(code):
+                    char = code[i:i + 2]
+                    i += 1
+                elif char == quote:
+                    quote = None
+            elif char.isspace():
+                spaced = True
+                i += 1
+                continue
+            else:
+                if spaced and (previous.isalnum() or previous == '_') and (char.isalnum() or char == '_'):
+                    out.append(" ")
+                if char in STRING_QUOTES:
+                    quote = char
+            out.append(char)
+            previous, spaced = char[-1], False
+            i += 1
+        return "".join(out)
+
+    @staticmethod
+    def _text_kind(text: str, language: str) -> str:
+        stripped = text.strip()
+        if not stripped:
+            return 'blank'
+        if stripped.startswith(COMMENT_PREFIXES.get(language, ('#',))):
+            return 'comment'
+        if stripped.startswith(IMPORT_PREFIXES.get(language, ())):
+            return 'import'
+        return 'code'
+
+
+def summarize_decisions(decisions: List[Dict[str, str]]) -> Dict[str, int]:
+    """Counts per decision, for logging"""
+    counts = {SKIP: 0, CHEAP: 0, FULL: 0}
+    for decision in decisions:
+        counts[decision['decision']] += 1
+    return counts
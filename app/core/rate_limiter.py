@@ -0,0 +1,158 @@
+# app/core/rate_limiter.py (Per-model Bedrock governor: RPM/TPM token buckets + AIMD concurrency)
+import asyncio
+import time
+from typing import Any, Dict, Optional
+import structlog
+from app.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+# botocore error codes that mean "slow down" rather than "this request is bad"
+THROTTLING_ERROR_CODES = {"ThrottlingException", "TooManyRequestsException"}
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """True for Bedrock throttling errors (botocore ClientError with a throttling code)"""
+    response = getattr(error, "response", None) or {}
+    return response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled continuously at `rate` per second"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= amount  # may go negative when actual usage exceeds the estimate
+
+    def drain(self):
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class ModelGovernor:
+    """
+    Queues calls for one model id until the RPM and TPM budgets and the adaptive
+    concurrency limit allow them. Concurrency follows AIMD: +1/limit per success,
+    halved on every throttling error. Abandoned calls (timed out or cancelled) give
+    their slot back without the increase.
+    """
+
+    def __init__(self, model_id: str, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int):
+        self.model_id = model_id
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self._cond = asyncio.Condition()
+        # Metrics
+        self.total_calls = 0
+        self.throttled_calls = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def acquire(self, estimated_tokens: int) -> Dict[str, Any]:
+        """Wait for a slot; returns a permit to pass back to release()"""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._cond:
+                while True:
+                    timeout: Optional[float] = None
+                    if self.in_flight < max(1, int(self.limit)):
+                        timeout = max(self.requests.time_until(1), self.tokens.time_until(estimated_tokens))
+                        if timeout <= 0:
+                            self.requests.consume(1)
+                            self.tokens.consume(estimated_tokens)
+                            self.in_flight += 1
+                            break
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.total_calls += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        if waited > 1.0:
+            logger.info("bedrock_call_queued", model=self.model_id, wait_seconds=round(waited, 2), queue_depth=self.waiting)
+        return {'estimated_tokens': estimated_tokens, 'wait_seconds': waited}
+
+    async def release(self, permit: Dict[str, Any], throttled: bool = False, actual_tokens: Optional[int] = None,
+                      abandoned: bool = False):
+        async with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled_calls += 1
+                self.limit = max(1.0, self.limit / 2)
+                self.requests.drain()  # pause new calls until the RPM bucket refills
+                logger.warning("bedrock_throttled", model=self.model_id, new_limit=self.limit)
+            else:
+                if not abandoned:
+                    self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+                if actual_tokens is not None:
+                    # Settle the estimate against real usage
+                    self.tokens.consume(actual_tokens - permit['estimated_tokens'])
+            self._cond.notify_all()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'model_id': self.model_id,
+            'queue_depth': self.waiting,
+            'in_flight': self.in_flight,
+            'concurrency_limit': round(self.limit, 2),
+            'total_calls': self.total_calls,
+            'throttled_calls': self.throttled_calls,
+            'avg_wait_seconds': round(self.total_wait_seconds / self.total_calls, 3) if self.total_calls else 0.0,
+            'max_wait_seconds': round(self.max_wait_seconds, 3)
+        }
+
+
+class BedrockGovernor:
+    """Registry of per-model governors sharing the configured budgets"""
+
+    def __init__(self):
+        self.models: Dict[str, ModelGovernor] = {}
+
+    def for_model(self, model_id: str) -> ModelGovernor:
+        governor = self.models.get(model_id)
+        if governor is None:
+            governor = ModelGovernor(
+                model_id,
+                requests_per_minute=settings.bedrock_requests_per_minute,
+                tokens_per_minute=settings.bedrock_tokens_per_minute,
+                max_concurrency=settings.bedrock_max_concurrency
+            )
+            self.models[model_id] = governor
+        return governor
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {model_id: governor.metrics() for model_id, governor in self.models.items()}
+
+
+# Global governor (shared by every orchestrator in the process)
+governor = BedrockGovernor()
@@ -0,0 +1,259 @@
+# app/core/rules.py (Deterministic tree-sitter rules: hardcoded secrets, SQL string building, shell execution)
+import re
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import structlog
+from app.models import CodeIssue, Severity, IssueCategory
+from app.core.parsers.ast_parser import parser as ast_parser
+from app.core.parsers.registry import registry
+
+logger = structlog.get_logger()
+
+SECRET_NAME = re.compile(r'api[_-]?key|apikey|secret|passw(or)?d|passwd|pwd|token|access[_-]?key|private[_-]?key|credential', re.IGNORECASE)
+KNOWN_SECRET_VALUE = re.compile(
+    r'AKIA[0-9A-Z]{16}|sk-[A-Za-z0-9]{16,}|sk_live_[A-Za-z0-9]{16,}|ghp_[A-Za-z0-9]{30,}|'
+    r'xox[baprs]-[A-Za-z0-9-]{10,}|-----BEGIN [A-Z ]*PRIVATE KEY-----'
+)
+PLACEHOLDER_VALUE = re.compile(r'^(x+|\*+|changeme|change_me|your[_-].*|<.*>|\$\{.*\}|example|dummy|test|none|null|todo)$', re.IGNORECASE)
+SQL_TEXT = re.compile(r'^\s*(select\s|insert\s+into|update\s+\w+\s+set|delete\s+from|replace\s+into|drop\s+table|alter\s+table|truncate\s)', re.IGNORECASE)
+MIN_SECRET_LENGTH = 6
+
+PYTHON_SHELL_FUNCTIONS = {'system', 'popen'}
+CPP_SHELL_FUNCTIONS = {'system', 'popen', 'execl', 'execlp'}
+CPP_FORMAT_FUNCTIONS = {'sprintf', 'snprintf', 'asprintf'}
+
+
+@dataclass(frozen=True)
+class Rule:
+    """What a rule reports (the match logic lives in the per-language pattern tables)"""
+    id: str
+    issue_type: str  # Same vocabulary as the review prompt / DETECTION_CATEGORY_MAP
+    severity: Severity
+    message: str
+    suggestion: str
+    cwe: int
+
+
+RULES = {
+    rule.id: rule for rule in (
+        Rule('hardcoded-secret', 'Hardcoded Secret', Severity.CRITICAL,
+             "Hardcoded secret in `{name}`",
+             "Load the value from the environment or a secrets manager and rotate the exposed credential.", 798),
+        Rule('sql-string-building', 'SQL Injection', Severity.CRITICAL,
+             "SQL query built from string concatenation/formatting",
+             "Use a parameterized query (placeholders + a separate parameters argument) instead of building SQL text.", 89),
+        Rule('shell-true', 'Command Injection', Severity.HIGH,
+             "Subprocess call with shell=True",
+             "Pass the command as an argument list and drop shell=True; never interpolate user input into shell strings.", 78),
+        Rule('shell-exec', 'Command Injection', Severity.HIGH,
+             "`{name}` called with a non-literal command",
+             "Use an exec-style API with an argument list (subprocess.run([...]) / execv) and validate inputs.", 78),
+    )
+}
+
+
+def _text(node) -> str:
+    return node.text.decode('utf8', errors='replace') if node is not None else ''
+
+
+def _literal(node) -> str:
+    """String literal contents without prefix (f, r, b, u8, L ...) and quotes"""
+    text = _text(node).lstrip('abcfrtuUBFRL8')
+    for quote in ('"""', "'''", '"', "'"):
+        if text.startswith(quote) and text.endswith(quote) and len(text) >= 2 * len(quote):
+            return text[len(quote):-len(quote)]
+    return text
+
+
+def _last_identifier(node) -> str:
+    names = re.findall(r'[A-Za-z_]\w*', _text(node))
+    return names[-1] if names else ''
+
+
+# ----- checks: captures -> (rule id, anchor node, name) or None -----
+
+def _secret_assignment(c: Dict[str, Any]):
+    name, value = _last_identifier(c['name']), c['value']
+    if any(child.type == 'interpolation' for child in value.named_children):
+        return None
+    literal = _literal(value)
+    if not SECRET_NAME.search(name) or len(literal) < MIN_SECRET_LENGTH or PLACEHOLDER_VALUE.match(literal):
+        return None
+    return 'hardcoded-secret', c['name'], name
+
+
+def _known_secret_literal(c: Dict[str, Any]):
+    if not KNOWN_SECRET_VALUE.search(_literal(c['value'])):
+        return None
+    return 'hardcoded-secret', c['value'], 'string literal'
+
+
+def _sql_concatenation(c: Dict[str, Any]):
+    operator = c['expr'].child_by_field_name('operator')
+    if _text(operator) not in ('+', '%') or not SQL_TEXT.match(_literal(c['sql'])):
+        return None
+    return 'sql-string-building', c['expr'], ''
+
+
+def _sql_interpolated(c: Dict[str, Any]):
+    if not SQL_TEXT.match(_literal(c['sql'])):
+        return None
+    return 'sql-string-building', c['sql'], ''
+
+
+def _sql_format_call(c: Dict[str, Any]):
+    if _text(c['method']) != 'format' or not SQL_TEXT.match(_literal(c['sql'])):
+        return None
+    return 'sql-string-building', c['expr'], ''
+
+
+def _cpp_sql_format_call(c: Dict[str, Any]):
+    literal = _literal(c['sql'])
+    if _text(c['fn']) not in CPP_FORMAT_FUNCTIONS or '%' not in literal or not SQL_TEXT.match(literal):
+        return None
+    return 'sql-string-building', c['expr'], ''
+
+
+def _shell_true(c: Dict[str, Any]):
+    if _text(c['kw']) != 'shell':
+        return None
+    return 'shell-true', c['expr'], ''
+
+
+def _python_shell_exec(c: Dict[str, Any]):
+    if _text(c['mod']) != 'os' or _text(c['fn']) not in PYTHON_SHELL_FUNCTIONS:
+        return None
+    arg = c['arg']
+    if arg.type == 'string' and not any(child.type == 'interpolation' for child in arg.named_children):
+        return None  # constant command
+    return 'shell-exec', c['expr'], f"os.{_text(c['fn'])}"
+
+
+def _cpp_shell_exec(c: Dict[str, Any]):
+    if _text(c['fn']) not in CPP_SHELL_FUNCTIONS or c['arg'].type == 'string_literal':
+        return None
+    return 'shell-exec', c['expr'], _text(c['fn'])
+
+
+# One tree-sitter pattern per entry: the pattern index of a match maps back to its check
+PATTERNS: Dict[str, List[Tuple[str, Callable]]] = {
+    'python': [
+        ("(assignment left: (_) @name right: (string) @value)", _secret_assignment),
+        ("(keyword_argument name: (identifier) @name value: (string) @value)", _secret_assignment),
+        ("(string) @value", _known_secret_literal),
+        ("(binary_operator left: (string) @sql) @expr", _sql_concatenation),
+        ("(string (interpolation)) @sql", _sql_interpolated),
+        ("(call function: (attribute object: (string) @sql attribute: (identifier) @method)) @expr", _sql_format_call),
+        ("(call arguments: (argument_list (keyword_argument name: (identifier) @kw value: (true)))) @expr", _shell_true),
+        ("(call function: (attribute object: (identifier) @mod attribute: (identifier) @fn) arguments: (argument_list . (_) @arg)) @expr", _python_shell_exec),
+    ],
+    'cpp': [
+        ("(init_declarator declarator: (_) @name value: (string_literal) @value)", _secret_assignment),
+        ("(assignment_expression left: (_) @name right: (string_literal) @value)", _secret_assignment),
+        ("(string_literal) @value", _known_secret_literal),
+        ("(binary_expression left: (string_literal) @sql) @expr", _sql_concatenation),
+        ("(call_expression function: (identifier) @fn arguments: (argument_list (string_literal) @sql)) @expr", _cpp_sql_format_call),
+        ("(call_expression function: (identifier) @fn arguments: (argument_list . (_) @arg)) @expr", _cpp_shell_exec),
+    ]
+}
+PATTERNS['c'] = PATTERNS['cpp']  # The C++ patterns only use node types shared with the C grammar
+
+
+class RuleEngine:
+    """
+    Runs every rule of a language in one tree pass: all patterns are compiled
+    (once, lazily) into a single tree-sitter query whose matches are dispatched
+    to the per-pattern checks.
+    """
+
+    def __init__(self):
+        self._queries: Dict[str, Any] = {}
+
+    def supports(self, language: str) -> bool:
+        return language in PATTERNS and registry.supports(language)
+
+    def _query(self, language: str):
+        query = self._queries.get(language)
+        if query is None:
+            source = "\n".join(pattern for pattern, _ in PATTERNS[language])
+            query = registry.language(language).query(source)
+            self._queries[language] = query
+            logger.info("rule_query_compiled", language=language, patterns=len(PATTERNS[language]))
+        return query
+
+    def run(self, code: str, language: str, cache_key: Optional[Hashable] = None) -> List[CodeIssue]:
+        """Findings for `code`, one per (rule, line), ordered by line (`cache_key`: see ASTParser.parse_tree)"""
+        if not self.supports(language):
+            return []
+
+        lines = code.splitlines()
+        checks = PATTERNS[language]
+        tree = ast_parser.parse_tree(code, language, cache_key)
+        findings: Dict[Tuple[str, int], CodeIssue] = {}
+        for pattern_index, captures in self._query(language).matches(tree.root_node):
+            try:
+                hit = checks[pattern_index][1](captures)
+            except Exception as e:
+                logger.warning("rule_check_failed", language=language, pattern=pattern_index, error=str(e))
+                continue
+            if hit is None:
+                continue
+            rule_id, anchor, name = hit
+            line, column = anchor.start_point[0] + 1, anchor.start_point[1] + 1
+            if (rule_id, line) not in findings:
+                findings[(rule_id, line)] = self._issue(RULES[rule_id], line, column, name, lines)
+
+        issues = sorted(findings.values(), key=lambda i: (i.line, i.column))
+        if issues:
+            logger.info("static_rules_matched", language=language, findings=len(issues))
+        return issues
+
+    @staticmethod
+    def _issue(rule: Rule, line: int, column: int, name: str, lines: List[str]) -> CodeIssue:
+        return CodeIssue(
+            id=f"issue-{uuid.uuid4().hex[:8]}",
+            severity=rule.severity,
+            category=IssueCategory.security,
+            type=rule.issue_type,
+            message=rule.message.format(name=name),
+            description=f"Detected deterministically by static rule `{rule.id}` (CWE-{rule.cwe}).",
+            line=line,
+            column=column,
+            code_snippet=lines[line - 1].strip() if line <= len(lines) else None,
+            suggestion=rule.suggestion,
+            references=[f"https://cwe.mitre.org/data/definitions/{rule.cwe}.html"],
+            rule_id=rule.id
+        )
+
+
+def finding_kind(issue_type: Optional[str]) -> Optional[str]:
+    """Coarse kind of an issue type, to match model findings against rule findings"""
+    text = (issue_type or '').lower()
+    if 'sql' in text:
+        return 'sql'
+    if 'command' in text or 'shell' in text:
+        return 'command'
+    if any(word in text for word in ('secret', 'password', 'credential', 'api key', 'api_key', 'token')):
+        return 'secret'
+    return None
+
+
+def is_covered(issue: CodeIssue, static_issues: List[CodeIssue]) -> bool:
+    """True if a model issue repeats a rule finding (same kind, within one line)"""
+    kind = finding_kind(issue.type)
+    if kind is None or issue.line is None:
+        return False
+    return any(
+        finding_kind(s.type) == kind and s.line is not None and abs(s.line - issue.line) <= 1
+        for s in static_issues
+    )
+
+
+def covered_summary(static_issues: List[CodeIssue]) -> str:
+    """Prompt line listing what the rules already reported"""
+    return "; ".join(f"{i.type} at line {i.line}" for i in static_issues)
+
+
+# Global engine (queries compiled on first use per language)
+rule_engine = RuleEngine()
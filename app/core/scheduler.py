@@ -0,0 +1,130 @@
+# app/core/scheduler.py (Token-budgeted PR file scheduler: rank changed files, pack into model calls)
+import math
+from typing import Any, Dict, List, Optional
+import structlog
+from app.utils.tokens import estimate_tokens
+
+logger = structlog.get_logger()
+
+# Path fragments that make a file worth reviewing first
+SENSITIVE_PATH_PATTERNS = (
+    'auth', 'login', 'password', 'passwd', 'secret', 'token', 'credential', 'crypto',
+    'security', 'permission', 'session', 'payment', 'billing', 'admin', 'sql', 'db',
+    'config', 'settings', 'api', 'upload', 'webhook',
+)
+
+# Fixed prompt overhead per model call (instructions + JSON schema)
+PROMPT_OVERHEAD_TOKENS = 1500
+
+
+class FileScheduler:
+    """Rank changed files and pack them into model calls under a token budget"""
+    
+    def __init__(self, token_budget: int, call_token_budget: int, max_candidates: Optional[int] = None,
+                 chunk_tokens: Optional[int] = None):
+        self.token_budget = token_budget
+        self.call_token_budget = call_token_budget
+        self.max_candidates = max_candidates
+        self.chunk_tokens = chunk_tokens  # Code tokens per review chunk of an oversized file (default: a full call)
+    
+    @staticmethod
+    def is_sensitive_path(filename: str) -> bool:
+        lowered = filename.lower()
+        return any(pattern in lowered for pattern in SENSITIVE_PATH_PATTERNS)
+    
+    def score(self, file: Dict[str, Any], secret_hits: int = 0) -> float:
+        """Priority score: churn (log-scaled) + sensitive path bonus + AST secret hits"""
+        churn = file.get('additions', 0) + file.get('deletions', 0)
+        score = math.log1p(churn)
+        if self.is_sensitive_path(file.get('filename', '')):
+            score += 5.0
+        score += 10.0 * secret_hits
+        return score
+    
+    def rank(self, files: List[Dict[str, Any]], secret_hits: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+        """Files sorted by descending priority"""
+        secret_hits = secret_hits or {}
+        return sorted(
+            files,
+            key=lambda f: self.score(f, secret_hits.get(f.get('filename', ''), 0)),
+            reverse=True
+        )
+    
+    def select_candidates(self, files: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Pre-rank on PR metadata only, to choose which files are worth fetching"""
+        ranked = self.rank(files)
+        if self.max_candidates is None or len(ranked) <= self.max_candidates:
+            return {'candidates': ranked, 'skipped': []}
+        skipped = [{'filename': f.get('filename', ''), 'reason': 'candidate_limit'} for f in ranked[self.max_candidates:]]
+        return {'candidates': ranked[:self.max_candidates], 'skipped': skipped}
+    
+    def plan(
+        self,
+        files: List[Dict[str, Any]],
+        contents: Dict[str, str],
+        languages: Dict[str, str],
+        secret_hits: Optional[Dict[str, int]] = None,
+        pack: bool = True,
+        groups: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Pack ranked files into batches (one batch = one model call).
+        With pack=False every file gets its own call (the budget still applies).
+        A file larger than one call gets a batch of its own, reviewed in chunks; every
+        chunk's prompt overhead is charged against the token budget.
+        `groups` (filename -> label) keeps differently-labelled files out of the same
+        batch, e.g. pre-filter tiers that are reviewed at different depths.
+        
+        Returns:
+            {'batches': [[filename, ...], ...], 'skipped': [{'filename', 'reason'}], 'tokens_planned': int}
+        """
+        per_call_capacity = self.call_token_budget - PROMPT_OVERHEAD_TOKENS
+        batches: List[List[str]] = []
+        open_batches: Dict[tuple, Dict[str, Any]] = {}  # (language, group) -> {'files': [...], 'tokens': n}
+        skipped: List[Dict[str, str]] = []
+        tokens_planned = 0
+        
+        for file in self.rank(files, secret_hits):
+            filename = file.get('filename', '')
+            if filename not in contents:
+                skipped.append({'filename': filename, 'reason': 'content_unavailable'})
+                continue
+            
+            tokens = estimate_tokens(contents[filename])
+            if tokens > per_call_capacity:
+                # Oversized: its own batch, split into chunk calls by the analyzer
+                chunk_capacity = min(self.chunk_tokens or per_call_capacity, per_call_capacity)
+                cost = tokens + math.ceil(tokens / max(1, chunk_capacity)) * PROMPT_OVERHEAD_TOKENS
+                if tokens_planned + cost > self.token_budget:
+                    skipped.append({'filename': filename, 'reason': 'token_budget'})
+                    continue
+                batches.append([filename])
+                tokens_planned += cost
+                continue
+            
+            language = languages.get(filename, 'python')
+            batch_key = (language, (groups or {}).get(filename, ''))
+            batch = open_batches.get(batch_key)
+            new_call = not pack or batch is None or batch['tokens'] + tokens > per_call_capacity
+            cost = tokens + (PROMPT_OVERHEAD_TOKENS if new_call else 0)
+            if tokens_planned + cost > self.token_budget:
+                skipped.append({'filename': filename, 'reason': 'token_budget'})
+                continue
+            
+            # Files of the same language share a call until it is full
+            if new_call:
+                batch = {'files': [], 'tokens': 0}
+                open_batches[batch_key] = batch
+                batches.append(batch['files'])
+            batch['files'].append(filename)
+            batch['tokens'] += tokens
+            tokens_planned += cost
+        
+        logger.info(
+            "pr_schedule_planned",
+            batches=len(batches),
+            files=sum(len(b) for b in batches),
+            skipped=len(skipped),
+            tokens_planned=tokens_planned
+        )
+        return {'batches': batches, 'skipped': skipped, 'tokens_planned': tokens_planned}
@@ -0,0 +1,213 @@
+# app/core/telemetry.py (Per-call Bedrock token / cost / latency accounting + Prometheus export)
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import structlog
+from app.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+try:
+    from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+    PROMETHEUS_AVAILABLE = True
+except ImportError:  # pragma: no cover - metrics export is disabled, per-analysis summaries still work
+    PROMETHEUS_AVAILABLE = False
+
+# Repository the current analysis belongs to (set by the PR pipeline, "adhoc" for the API)
+current_repo: ContextVar[str] = ContextVar("devagent_repo", default="adhoc")
+
+# Calls recorded while an analysis is running (see collect())
+_current_calls: ContextVar[Optional[List["CallRecord"]]] = ContextVar("devagent_calls", default=None)
+
+# (attempt number, hedged) of the agent policy attempt making the current call (see agent_policy)
+current_attempt: ContextVar[Tuple[int, bool]] = ContextVar("devagent_attempt", default=(1, False))
+
+
+@dataclass
+class CallRecord:
+    """One model call (or cache lookup that replaced it)"""
+    agent: str
+    model_id: str
+    repo: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_seconds: float = 0.0
+    queue_wait_seconds: float = 0.0
+    retries: int = 0
+    cache: str = "miss"  # hit | miss | disabled
+    outcome: str = "success"  # success | error | throttled | timeout | cancelled (lost a hedge race)
+    stop_reason: str = ""  # Nova stopReason: end_turn | max_tokens | ...
+    continuation: bool = False  # Follow-up call resuming an answer cut at max_new_tokens
+    attempt: int = 1  # Agent policy attempt (retries start new attempts)
+    hedged: bool = False  # Duplicate request sent because the attempt outlived the agent's p95
+
+    @property
+    def cost_usd(self) -> float:
+        return (self.input_tokens * settings.bedrock_input_price_per_1k_tokens
+                + self.output_tokens * settings.bedrock_output_price_per_1k_tokens) / 1000.0
+
+
+if PROMETHEUS_AVAILABLE:
+    CALLS = Counter(
+        "devagent_bedrock_calls_total", "Bedrock model calls",
+        ["model", "agent", "repo", "outcome"]
+    )
+    TOKENS = Counter(
+        "devagent_bedrock_tokens_total", "Bedrock tokens consumed",
+        ["model", "agent", "repo", "direction"]
+    )
+    COST = Counter(
+        "devagent_bedrock_cost_usd_total", "Estimated Bedrock spend in USD",
+        ["model", "agent", "repo"]
+    )
+    CONTINUATIONS = Counter(
+        "devagent_bedrock_continuations_total", "Bedrock calls resuming an answer cut at max_new_tokens",
+        ["model", "agent"]
+    )
+    HEDGES = Counter(
+        "devagent_bedrock_hedged_calls_total", "Duplicate Bedrock calls sent after the agent's p95 latency",
+        ["model", "agent"]
+    )
+    RETRIES = Counter(
+        "devagent_bedrock_retries_total", "Bedrock calls re-sent after throttling",
+        ["model", "agent"]
+    )
+    LATENCY = Histogram(
+        "devagent_bedrock_call_latency_seconds", "Bedrock call latency (excluding governor queueing)",
+        ["model", "agent"],
+        buckets=(0.5, 1, 2, 5, 10, 20, 30, 45, 60, 90, 120, 180)
+    )
+    QUEUE_WAIT = Histogram(
+        "devagent_bedrock_queue_wait_seconds", "Time spent waiting for the rate-limit governor",
+        ["model", "agent"],
+        buckets=(0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60)
+    )
+    CACHE_LOOKUPS = Counter(
+        "devagent_analysis_cache_lookups_total", "Analysis cache lookups",
+        ["agent", "repo", "result"]
+    )
+
+
+def record_call(record: CallRecord):
+    """Export one model call and add it to the running analysis' summary (if any)"""
+    calls = _current_calls.get()
+    if calls is not None:
+        calls.append(record)
+
+    if PROMETHEUS_AVAILABLE:
+        CALLS.labels(record.model_id, record.agent, record.repo, record.outcome).inc()
+        TOKENS.labels(record.model_id, record.agent, record.repo, "input").inc(record.input_tokens)
+        TOKENS.labels(record.model_id, record.agent, record.repo, "output").inc(record.output_tokens)
+        COST.labels(record.model_id, record.agent, record.repo).inc(record.cost_usd)
+        if record.retries:
+            RETRIES.labels(record.model_id, record.agent).inc(record.retries)
+        if record.continuation:
+            CONTINUATIONS.labels(record.model_id, record.agent).inc()
+        if record.hedged:
+            HEDGES.labels(record.model_id, record.agent).inc()
+        LATENCY.labels(record.model_id, record.agent).observe(record.latency_seconds)
+        QUEUE_WAIT.labels(record.model_id, record.agent).observe(record.queue_wait_seconds)
+
+    logger.info("bedrock_call_recorded", **asdict(record))
+
+
+def record_cache_lookup(agent: str, result: str, model_id: str):
+    """Count a cache hit as a zero-token call in the summary (misses show up as real calls)"""
+    repo = current_repo.get()
+    if PROMETHEUS_AVAILABLE:
+        CACHE_LOOKUPS.labels(agent, repo, result).inc()
+    if result == "hit":
+        calls = _current_calls.get()
+        if calls is not None:
+            calls.append(CallRecord(agent=agent, model_id=model_id, repo=repo, cache="hit"))
+
+
+@contextmanager
+def collect() -> Iterator[List[CallRecord]]:
+    """Collect the calls made inside the block (including from tasks it spawns)"""
+    calls: List[CallRecord] = []
+    token = _current_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _current_calls.reset(token)
+
+
+def summarize(calls: List[CallRecord]) -> Dict[str, Any]:
+    """Per-analysis summary for CodeReviewResult.metrics['telemetry']"""
+    by_agent: Dict[str, Dict[str, Any]] = {}
+    for call in calls:
+        agent = by_agent.setdefault(call.agent, {
+            'calls': 0, 'cache_hits': 0, 'input_tokens': 0, 'output_tokens': 0,
+            'latency_seconds': 0.0, 'retries': 0, 'continuations': 0, 'truncated': 0,
+            'timeouts': 0, 'hedges': 0, 'failed_attempts': 0, 'cost_usd': 0.0
+        })
+        if call.cache == "hit":
+            agent['cache_hits'] += 1
+            continue
+        agent['calls'] += 1
+        agent['input_tokens'] += call.input_tokens
+        agent['output_tokens'] += call.output_tokens
+        agent['latency_seconds'] = round(agent['latency_seconds'] + call.latency_seconds, 3)
+        agent['retries'] += call.retries
+        agent['continuations'] += int(call.continuation)
+        agent['truncated'] += int(call.stop_reason == "max_tokens")
+        agent['timeouts'] += int(call.outcome == "timeout")
+        agent['hedges'] += int(call.hedged)
+        agent['failed_attempts'] += int(call.outcome in ("error", "throttled", "timeout"))
+        agent['cost_usd'] = round(agent['cost_usd'] + call.cost_usd, 6)
+    return merge_summaries([{'by_agent': by_agent}])
+
+
+def merge_summaries(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-file summaries into one (totals are recomputed from by_agent)"""
+    by_agent: Dict[str, Dict[str, Any]] = {}
+    for summary in summaries:
+        for name, stats in (summary or {}).get('by_agent', {}).items():
+            merged = by_agent.setdefault(name, dict.fromkeys(stats, 0))
+            for key, value in stats.items():
+                merged[key] = round(merged[key] + value, 6)
+
+    totals = {key: 0 for key in ('calls', 'cache_hits', 'input_tokens', 'output_tokens', 'retries',
+                                     'continuations', 'truncated', 'timeouts', 'hedges', 'failed_attempts')}
+    latency = cost = 0.0
+    for stats in by_agent.values():
+        for key in totals:
+            totals[key] += stats.get(key, 0)
+        latency += stats.get('latency_seconds', 0.0)
+        cost += stats.get('cost_usd', 0.0)
+
+    return {
+        **totals,
+        'total_tokens': totals['input_tokens'] + totals['output_tokens'],
+        'model_latency_seconds': round(latency, 3),  # summed across (possibly parallel) calls
+        'estimated_cost_usd': round(cost, 6),
+        'by_agent': by_agent
+    }
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Prometheus exposition for GET /metrics -> (body, content type)"""
+    if not PROMETHEUS_AVAILABLE:
+        return b"# prometheus_client is not installed\n", "text/plain; charset=utf-8"
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class CallTimer:
+    """Measures one model call; fill in usage/retries, then finish()"""
+
+    def __init__(self, agent: str, model_id: str):
+        attempt, hedged = current_attempt.get()
+        self.record = CallRecord(agent=agent, model_id=model_id, repo=current_repo.get(), attempt=attempt, hedged=hedged)
+        self.started = time.monotonic()
+
+    def finish(self, outcome: str = "success", usage: Optional[Dict[str, int]] = None):
+        usage = usage or {}
+        self.record.input_tokens = usage.get("inputTokens", 0)
+        self.record.output_tokens = usage.get("outputTokens", 0)
+        self.record.latency_seconds = round(time.monotonic() - self.started - self.record.queue_wait_seconds, 3)
+        self.record.outcome = outcome
+        record_call(self.record)
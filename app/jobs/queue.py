@@ -0,0 +1,394 @@
+# app/jobs/queue.py (Durable PR-analysis job queue: Redis or SQLite, per-repo fairness, dedup + supersede)
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+import structlog
+from app.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+def make_job(repo_full_name: str, pr_number: int, head_sha: Optional[str], event: str, before_sha: Optional[str] = None) -> Dict[str, Any]:
+    """New job dict (dedup key = repo + PR + head SHA)"""
+    return {
+        'id': f"job-{uuid.uuid4().hex[:12]}",
+        'repo': repo_full_name,
+        'pr_number': pr_number,
+        'head_sha': head_sha or "",
+        'before_sha': before_sha,
+        'event': event,
+        'attempts': 0,
+        'dedup_key': f"{repo_full_name}#{pr_number}@{head_sha or ''}",
+        'created_at': time.time()
+    }
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with full jitter for the given number of failed attempts"""
+    ceiling = min(settings.job_retry_max_seconds, settings.job_retry_base_seconds * (2 ** max(0, attempts - 1)))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class JobQueue(ABC):
+    """Queue interface shared by the Redis and SQLite backends"""
+
+    @abstractmethod
+    async def enqueue(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns {'status': 'queued' | 'duplicate', 'job_id': str}"""
+        ...
+
+    @abstractmethod
+    async def dequeue(self) -> Optional[Dict[str, Any]]:
+        """Next runnable job (round-robin across repos) or None"""
+        ...
+
+    @abstractmethod
+    async def complete(self, job: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    async def fail(self, job: Dict[str, Any], error: str) -> str:
+        """Schedule a retry with backoff; returns 'retrying' or 'failed' (attempts exhausted)"""
+        ...
+
+    @abstractmethod
+    async def is_superseded(self, job: Dict[str, Any]) -> bool:
+        """True when a newer head SHA has been queued for the same PR"""
+        ...
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, int]:
+        ...
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Durable single-host queue. Safe across worker processes sharing the same file:
+    every state transition runs in a BEGIN IMMEDIATE transaction.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                repo TEXT NOT NULL,
+                pr_number INTEGER NOT NULL,
+                head_sha TEXT NOT NULL,
+                dedup_key TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                last_error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_runnable ON jobs (status, available_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_pr ON jobs (repo, pr_number, status);
+            CREATE TABLE IF NOT EXISTS repo_turns (
+                repo TEXT PRIMARY KEY,
+                last_served REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pr_heads (
+                repo TEXT NOT NULL,
+                pr_number INTEGER NOT NULL,
+                head_sha TEXT NOT NULL,
+                PRIMARY KEY (repo, pr_number)
+            );
+        """)
+        logger.info("sqlite_job_queue_initialized", path=path)
+
+    def _transaction(self, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    async def enqueue(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        def run(conn):
+            now = time.time()
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed', 'superseded') AND updated_at < ?",
+                (now - settings.job_dedup_ttl_seconds,)
+            )
+            existing = conn.execute("SELECT id, status FROM jobs WHERE dedup_key = ?", (job['dedup_key'],)).fetchone()
+            if existing and existing['status'] in ('queued', 'running', 'done'):
+                return {'status': 'duplicate', 'job_id': existing['id']}
+            if existing:
+                conn.execute("DELETE FROM jobs WHERE id = ?", (existing['id'],))
+
+            # Older SHAs of the same PR that have not started yet are superseded
+            superseded = conn.execute(
+                "UPDATE jobs SET status = 'superseded', updated_at = ? "
+                "WHERE repo = ? AND pr_number = ? AND status = 'queued' AND head_sha != ?",
+                (now, job['repo'], job['pr_number'], job['head_sha'])
+            ).rowcount
+            conn.execute(
+                "INSERT INTO jobs (id, repo, pr_number, head_sha, dedup_key, payload, status, attempts, available_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'queued', 0, ?, ?)",
+                (job['id'], job['repo'], job['pr_number'], job['head_sha'], job['dedup_key'], json.dumps(job), now, now)
+            )
+            conn.execute(
+                "INSERT INTO pr_heads (repo, pr_number, head_sha) VALUES (?, ?, ?) "
+                "ON CONFLICT(repo, pr_number) DO UPDATE SET head_sha = excluded.head_sha",
+                (job['repo'], job['pr_number'], job['head_sha'])
+            )
+            return {'status': 'queued', 'job_id': job['id'], 'superseded': superseded}
+
+        return await asyncio.to_thread(self._transaction, run)
+
+    async def dequeue(self) -> Optional[Dict[str, Any]]:
+        def run(conn):
+            now = time.time()
+            # Recover jobs whose worker died mid-run
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', available_at = ? WHERE status = 'running' AND updated_at < ?",
+                (now, now - settings.job_visibility_timeout_seconds)
+            )
+            # Fairness: serve the repo that was served least recently
+            repo_row = conn.execute(
+                "SELECT j.repo FROM jobs j LEFT JOIN repo_turns t ON t.repo = j.repo "
+                "WHERE j.status = 'queued' AND j.available_at <= ? "
+                "GROUP BY j.repo ORDER BY COALESCE(MAX(t.last_served), 0) ASC, MIN(j.available_at) ASC LIMIT 1",
+                (now,)
+            ).fetchone()
+            if repo_row is None:
+                return None
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE repo = ? AND status = 'queued' AND available_at <= ? "
+                "ORDER BY available_at ASC LIMIT 1",
+                (repo_row['repo'], now)
+            ).fetchone()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (now, row['id'])
+            )
+            conn.execute(
+                "INSERT INTO repo_turns (repo, last_served) VALUES (?, ?) "
+                "ON CONFLICT(repo) DO UPDATE SET last_served = excluded.last_served",
+                (row['repo'], now)
+            )
+            job = json.loads(row['payload'])
+            job['attempts'] = row['attempts'] + 1
+            return job
+
+        return await asyncio.to_thread(self._transaction, run)
+
+    async def complete(self, job: Dict[str, Any]):
+        def run(conn):
+            conn.execute("UPDATE jobs SET status = 'done', updated_at = ? WHERE id = ?", (time.time(), job['id']))
+        await asyncio.to_thread(self._transaction, run)
+
+    async def fail(self, job: Dict[str, Any], error: str) -> str:
+        def run(conn):
+            now = time.time()
+            if job['attempts'] >= settings.job_max_attempts:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', last_error = ?, updated_at = ? WHERE id = ?",
+                    (error, now, job['id'])
+                )
+                return 'failed'
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', available_at = ?, last_error = ?, updated_at = ? WHERE id = ?",
+                (now + retry_delay(job['attempts']), error, now, job['id'])
+            )
+            return 'retrying'
+
+        return await asyncio.to_thread(self._transaction, run)
+
+    async def is_superseded(self, job: Dict[str, Any]) -> bool:
+        def run():
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT head_sha FROM pr_heads WHERE repo = ? AND pr_number = ?",
+                    (job['repo'], job['pr_number'])
+                ).fetchone()
+                return row is not None and row['head_sha'] != job['head_sha']
+
+        return await asyncio.to_thread(run)
+
+    async def stats(self) -> Dict[str, int]:
+        def run():
+            with self._lock:
+                rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+                return {row['status']: row['n'] for row in rows}
+
+        return await asyncio.to_thread(run)
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Redis-backed queue shared by every worker process / ECS task:
+      jobs:repos         ring of repos with queued work (rotated for round-robin fairness)
+      jobs:repo:{repo}   FIFO of job ids per repo
+      jobs:job:{id}      job payload
+      jobs:delayed       zset of retrying job ids by available_at
+      jobs:processing    zset of running job ids by visibility deadline
+      jobs:dedup:{key}   dedup marker for (repo, PR, head SHA)
+      jobs:latest:{pr}   newest head SHA queued for a PR (older ones are superseded)
+    """
+
+    PREFIX = "devagent:jobs:"
+
+    # Pop the next job id and register its visibility deadline in one step, so a
+    # worker dying mid-claim leaves the job in processing for _promote_due to recover
+    CLAIM_SCRIPT = """
+    local job_id = redis.call('LPOP', KEYS[1])
+    if job_id then
+        redis.call('ZADD', KEYS[2], ARGV[1], job_id)
+    end
+    return job_id
+    """
+
+    # Move a due job from delayed/processing back onto its repo queue in one step;
+    # only the caller whose ZREM succeeds requeues it
+    PROMOTE_SCRIPT = """
+    if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+        return 0
+    end
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+    redis.call('LREM', KEYS[3], 0, ARGV[2])
+    redis.call('RPUSH', KEYS[3], ARGV[2])
+    return 1
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, client=None):
+        if client is None:
+            import redis.asyncio as aioredis
+            client = aioredis.from_url(redis_url, decode_responses=True)
+        self.client = client
+        self._claim = self.client.register_script(self.CLAIM_SCRIPT)
+        self._promote = self.client.register_script(self.PROMOTE_SCRIPT)
+
+    def _k(self, *parts: str) -> str:
+        return self.PREFIX + ":".join(parts)
+
+    async def ping(self):
+        await self.client.ping()
+
+    async def enqueue(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        dedup_ttl = settings.job_dedup_ttl_seconds
+        if not await self.client.set(self._k("dedup", job['dedup_key']), job['id'], nx=True, ex=dedup_ttl):
+            return {'status': 'duplicate', 'job_id': await self.client.get(self._k("dedup", job['dedup_key']))}
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(self._k("job", job['id']), json.dumps(job), ex=dedup_ttl)
+        pipe.set(self._k("latest", f"{job['repo']}#{job['pr_number']}"), job['head_sha'], ex=dedup_ttl)
+        pipe.rpush(self._k("repo", job['repo']), job['id'])
+        pipe.lrem(self._k("repos"), 0, job['repo'])
+        pipe.rpush(self._k("repos"), job['repo'])
+        await pipe.execute()
+        return {'status': 'queued', 'job_id': job['id']}
+
+    async def _promote_due(self):
+        """Move due retries and expired running jobs back onto their repo queues"""
+        now = time.time()
+        for zset in ("delayed", "processing"):
+            for job_id in await self.client.zrangebyscore(self._k(zset), 0, now):
+                raw = await self.client.get(self._k("job", job_id))
+                if raw is None:
+                    # Payload expired, nothing left to run
+                    await self.client.zrem(self._k(zset), job_id)
+                    continue
+                repo = json.loads(raw)['repo']
+                await self._promote(keys=[self._k(zset), self._k("repo", repo), self._k("repos")], args=[job_id, repo])
+
+    async def dequeue(self) -> Optional[Dict[str, Any]]:
+        await self._promote_due()
+        for _ in range(await self.client.llen(self._k("repos"))):
+            # Rotate the ring: take the head repo and move it to the tail
+            repo = await self.client.lmove(self._k("repos"), self._k("repos"), "LEFT", "RIGHT")
+            if repo is None:
+                return None
+            deadline = time.time() + settings.job_visibility_timeout_seconds
+            job_id = await self._claim(keys=[self._k("repo", repo), self._k("processing")], args=[deadline])
+            if job_id is None:
+                await self.client.lrem(self._k("repos"), 0, repo)
+                continue
+            raw = await self.client.get(self._k("job", job_id))
+            if raw is None:
+                await self.client.zrem(self._k("processing"), job_id)
+                continue
+            job = json.loads(raw)
+            if await self.is_superseded(job):
+                logger.info("job_superseded", job_id=job_id, repo=repo, pr_number=job['pr_number'])
+                await self.client.zrem(self._k("processing"), job_id)
+                await self.client.delete(self._k("job", job_id))
+                continue
+            job['attempts'] += 1
+            await self.client.set(self._k("job", job_id), json.dumps(job), keepttl=True)
+            return job
+        return None
+
+    async def complete(self, job: Dict[str, Any]):
+        await self.client.zrem(self._k("processing"), job['id'])
+        await self.client.delete(self._k("job", job['id']))
+
+    async def fail(self, job: Dict[str, Any], error: str) -> str:
+        await self.client.zrem(self._k("processing"), job['id'])
+        if job['attempts'] >= settings.job_max_attempts:
+            await self.client.delete(self._k("job", job['id']))
+            # Let a later webhook for the same SHA try again
+            await self.client.delete(self._k("dedup", job['dedup_key']))
+            return 'failed'
+        job['last_error'] = error
+        await self.client.set(self._k("job", job['id']), json.dumps(job), keepttl=True)
+        await self.client.zadd(self._k("delayed"), {job['id']: time.time() + retry_delay(job['attempts'])})
+        return 'retrying'
+
+    async def is_superseded(self, job: Dict[str, Any]) -> bool:
+        latest = await self.client.get(self._k("latest", f"{job['repo']}#{job['pr_number']}"))
+        return latest is not None and latest != job['head_sha']
+
+    async def stats(self) -> Dict[str, int]:
+        repos = await self.client.lrange(self._k("repos"), 0, -1)
+        queued = 0
+        for repo in repos:
+            queued += await self.client.llen(self._k("repo", repo))
+        return {
+            'queued': queued,
+            'delayed': await self.client.zcard(self._k("delayed")),
+            'running': await self.client.zcard(self._k("processing"))
+        }
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+async def get_job_queue() -> Optional[JobQueue]:
+    """Process-wide job queue (Redis, falling back to SQLite; None when disabled)"""
+    global _job_queue
+    if _job_queue is not None:
+        return _job_queue
+
+    backend = (settings.job_queue_backend or "none").lower()
+    if backend == "redis":
+        try:
+            queue = RedisJobQueue(settings.redis_url)
+            await queue.ping()
+            _job_queue = queue
+            logger.info("job_queue_initialized", backend="redis")
+            return _job_queue
+        except Exception as e:
+            logger.error("redis_job_queue_unavailable", error=str(e), fallback="sqlite")
+            backend = "sqlite"
+    if backend == "sqlite":
+        _job_queue = SQLiteJobQueue(settings.job_queue_sqlite_path)
+        return _job_queue
+    return None
@@ -0,0 +1,115 @@
+# app/jobs/worker.py (Queue workers for PR analyses - run in-process or via `python -m app.jobs.worker`)
+import asyncio
+from typing import Any, Dict, List, Optional
+import structlog
+from app.config import get_settings
+from app.jobs.queue import JobQueue, get_job_queue
+from app.routers.github import LateCommentUpdate, analyze_pr_diff, post_analysis_comment
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+class JobFailed(Exception):
+    """Raised when an analysis attempt failed and should be retried"""
+
+
+class AnalysisWorker:
+    """Pulls PR-analysis jobs from the queue with a fixed concurrency cap"""
+
+    def __init__(self, queue: JobQueue, concurrency: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.queue = queue
+        self.concurrency = concurrency or settings.job_worker_concurrency
+        self.poll_interval = poll_interval or settings.job_poll_interval_seconds
+        self._stop = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Start worker loops on the running event loop"""
+        self._stop.clear()
+        self._tasks = [asyncio.create_task(self._loop(i)) for i in range(self.concurrency)]
+        logger.info("analysis_workers_started", concurrency=self.concurrency)
+
+    async def stop(self):
+        """Stop taking new jobs and wait for in-flight ones to finish"""
+        self._stop.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("analysis_workers_stopped")
+
+    async def _loop(self, worker_id: int):
+        while not self._stop.is_set():
+            try:
+                job = await self.queue.dequeue()
+            except Exception as e:
+                logger.error("job_dequeue_failed", worker=worker_id, error=str(e))
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.run_job(job, worker_id)
+
+    async def run_job(self, job: Dict[str, Any], worker_id: int = 0):
+        """Run one job: success -> complete, failure -> retry with backoff (or give up)"""
+        log = logger.bind(job_id=job['id'], repo=job['repo'], pr_number=job['pr_number'], attempt=job['attempts'], worker=worker_id)
+        try:
+            await self.handle(job)
+            await self.queue.complete(job)
+            log.info("job_completed")
+        except Exception as e:
+            outcome = await self.queue.fail(job, str(e))
+            log.warning("job_attempt_failed", error=str(e), outcome=outcome)
+            if outcome == 'failed':
+                # Out of retries: surface the failure on the PR, as the inline path always did
+                await post_analysis_comment(job['pr_number'], job['repo'], settings.github_token, job['event'], {"error": str(e)})
+
+    async def handle(self, job: Dict[str, Any]):
+        """Analyze the PR at the job's head SHA and post the comment (unless a newer push superseded it)"""
+        if await self.queue.is_superseded(job):
+            logger.info("job_skipped_superseded", job_id=job['id'], head_sha=job['head_sha'])
+            return
+
+        async def still_current() -> bool:
+            return not await self.queue.is_superseded(job)
+
+        # Agents that miss the response deadline finish in the background and edit the comment
+        late = LateCommentUpdate(job['pr_number'], job['repo'], settings.github_token, job['event'], still_current)
+        comment = None
+        try:
+            analysis = await analyze_pr_diff(
+                job['pr_number'], job['repo'], settings.github_token, job['head_sha'] or None, job.get('before_sha'),
+                on_late_analysis=late.deliver
+            )
+            if "error" in analysis:
+                raise JobFailed(analysis["error"])
+
+            if await self.queue.is_superseded(job):
+                logger.info("job_result_discarded_superseded", job_id=job['id'], head_sha=job['head_sha'])
+                return
+            comment = await post_analysis_comment(job['pr_number'], job['repo'], settings.github_token, job['event'], analysis)
+        finally:
+            late.posted(comment)
+
+
+async def main():
+    """Standalone worker process"""
+    queue = await get_job_queue()
+    if queue is None:
+        raise SystemExit("job_queue_backend is 'none' - nothing to work on")
+    worker = AnalysisWorker(queue)
+    worker.start()
+    print(f"👷 Analysis worker running ({worker.concurrency} concurrent jobs)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await worker.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
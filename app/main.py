@@ -92,12 +92,20 @@
 # app/main.py (Updated with GitHub Router Integration)
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import structlog
 from datetime import datetime
 from app.config import get_settings
 from app.api.v1.endpoints import router as api_router
 from app.routers.github import router as github_router  # ✅ New: Import GitHub router
+from app.agents.multi_agent_orchestrator import shutdown_bedrock_executor
+from app.core.github_client import close_github_clients
+from app.core.parsers.extraction import shutdown_extraction_pool
+from app.jobs.queue import get_job_queue
+from app.jobs.worker import AnalysisWorker
+from app.core.rate_limiter import governor
+from app.core.agent_policy import latencies as agent_latencies
+from app.core import telemetry
 
 
 # Configure structured logging
@@ -142,12 +150,24 @@ app.include_router(github_router, prefix="/api/v1/github")  # ✅ New: GitHub we
 async def startup_event():
     """Run on application startup"""
     logger.info("application_starting", environment=settings.environment)
+    
+    if settings.job_workers_in_process:
+        queue = await get_job_queue()
+        if queue is not None:
+            app.state.analysis_worker = AnalysisWorker(queue)
+            app.state.analysis_worker.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
     logger.info("application_stopping")
+    worker = getattr(app.state, "analysis_worker", None)
+    if worker is not None:
+        await worker.stop()
+    shutdown_bedrock_executor()
+    shutdown_extraction_pool()
+    await close_github_clients()
 
 
 @app.get("/")
@@ -171,6 +191,13 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (Bedrock tokens, cost, latency, retries, cache lookups)"""
+    body, content_type = telemetry.render_latest()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/api/v1/status")
 async def api_status():
     """API status with configuration info"""
@@ -179,7 +206,9 @@ async def api_status():
         "aws_region": settings.aws_region,
         "bedrock_configured": settings.bedrock_supervisor_agent_id is not None,
         "github_configured": settings.github_token is not None,  # ✅ Updated: Check GitHub token
-        "database": "connected" if settings.database_url else "not configured"
+        "database": "connected" if settings.database_url else "not configured",
+        "bedrock_governor": governor.metrics(),  # Per-model queue depth, wait time, AIMD limit
+        "agent_latency": agent_latencies.metrics()  # Per-agent p50 / p95 (hedging delay) of successful calls
     }
 
 
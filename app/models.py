@@ -206,6 +206,7 @@ from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
+from app.core.parsers.registry import registry
 
 
 class ReviewDepth(str, Enum):
@@ -215,6 +216,12 @@ class ReviewDepth(str, Enum):
     THOROUGH = "thorough"
 
 
+class PromptMode(str, Enum):
+    """How the three agents receive the code"""
+    SEPARATE = "separate"  # One prompt (and model call) per agent, each embedding the code
+    SHARED = "shared"  # Code sent once in a single multi-task call returning all three sections
+
+
 class Severity(str, Enum):
     """Issue severity levels"""
     CRITICAL = "CRITICAL"
@@ -248,11 +255,13 @@ class AnalyzeCodeRequest(BaseModel):
     filename: Optional[str] = Field(None, description="Optional filename")
     context: Optional[str] = Field(None, description="Additional context")
     review_depth: ReviewDepth = Field(default=ReviewDepth.STANDARD)
+    prompt_mode: Optional[PromptMode] = Field(None, description="separate | shared (default from settings)")
+    deadline_seconds: Optional[float] = Field(None, gt=0, description="Return the agents finished by then; the rest are reported as timed_out")
     
     @validator('language')
     def validate_language(cls, v):
-        """Validate supported languages"""
-        supported = ['python', 'cpp', 'javascript', 'typescript', 'java', 'go', 'php']
+        """Validate supported languages (every language registered with the parser registry)"""
+        supported = registry.languages
         if v.lower() not in supported:
             raise ValueError(f"Language must be one of: {', '.join(supported)}")
         return v.lower()
@@ -304,6 +313,7 @@ class CodeIssue(BaseModel):
     suggestion: str = Field(..., description="How to fix")
     fixed_code: Optional[str] = None
     references: List[str] = Field(default_factory=list)
+    rule_id: Optional[str] = Field(None, description="Static rule that produced this issue (None for model findings)")
 
 
 class CodeReviewResult(BaseModel):
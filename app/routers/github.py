@@ -423,16 +423,28 @@
 #     return {"status": "test_complete", "repo": repo_full_name, "pr_number": pr_number, "analysis": analysis}
 
 # app/routers/github.py (FIXED: Proper diff format + correct prompt passing)
+import asyncio
 import json
-import requests
-from typing import Dict, Any
+from typing import Awaitable, Callable, Dict, Any, List, Optional
 from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
 from app.config import get_settings
 from app.core.analyzer import CodeAnalyzer
+from app.models import CodeReviewResult, ReviewDepth
 from app.memory.manager import MemoryManager
 from app.core.parsers.ast_parser import parser as ast_parser
+from app.core.github_client import get_github_client
+from app.core.scheduler import FileScheduler
+from app.core.diff import build_hunk_view
+from app.core.pr_state import PRStateStore, get_pr_state_store
+from app.core.prefilter import PreFilter, SKIP, CHEAP, summarize_decisions
+from app.core.parsers.extraction import get_extraction_pool
+from app.core.parsers.symbols import FileSymbols, combined_ast_info
+from app.core.parsers.registry import registry
+from app.core import telemetry
+from app.jobs.queue import get_job_queue, make_job
 import hashlib
 import hmac
+import time
 from datetime import datetime
 import structlog
 
@@ -440,10 +452,19 @@ router = APIRouter(tags=["github"])
 settings = get_settings()
 logger = structlog.get_logger()
 
-
-async def analyze_pr_diff(pr_number: int, repo_full_name: str, github_token: str, latest_sha: str = None) -> Dict[str, Any]:
-    """Analyze PR with proper diff format"""
+async def analyze_pr_diff(pr_number: int, repo_full_name: str, github_token: str, latest_sha: str = None,
+                          before_sha: str = None,
+                          on_late_analysis: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None) -> Dict[str, Any]:
+    """
+    Analyze PR with proper diff format (incremental when a previous analysis of this PR exists).
+    
+    Returns after pr_response_deadline_seconds with the agents finished by then; the others
+    are listed under "pending_agents". With pr_late_results_enabled, they keep running and
+    `on_late_analysis` receives the complete analysis (same shape, "late": True).
+    """
     
+    started = time.monotonic()
+    telemetry.current_repo.set(repo_full_name)  # Label this PR's model calls with the repo
     actor_id = repo_full_name
     session_id = f"pr-{pr_number}-{latest_sha[:8] if latest_sha else 'unknown'}"
     memory = MemoryManager(actor_id, session_id)
@@ -455,109 +476,252 @@ async def analyze_pr_diff(pr_number: int, repo_full_name: str, github_token: str
     logger.info("ltm_context_retrieved", ltm_results=len(ltm_security_patterns))
     print(f"📚 Retrieved {len(ltm_security_patterns)} LTM patterns for context")
     
-    headers = {"Authorization": f"token {github_token}", "Accept": "application/vnd.github.v3+json"}
-    files_url = f"https://api.github.com/repos/{repo_full_name}/pulls/{pr_number}/files?per_page=100"
+    github = get_github_client(github_token)
     
     try:
-        response = requests.get(files_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        files = response.json()
+        # All pages of changed files (Link-header pagination, pooled connection)
+        files = await github.list_pr_files(repo_full_name, pr_number)
         
         # Detect language
         detected_languages = set()
         for f in files:
-            fname = f.get("filename", "")
-            if fname.endswith(".py"):
-                detected_languages.add("python")
-            elif fname.endswith((".cpp", ".cc", ".cxx", ".h", ".hpp")):
-                detected_languages.add("cpp")
+            file_language = registry.detect_language(f.get("filename", ""))
+            if file_language:
+                detected_languages.add(file_language)
         
-        language = list(detected_languages)[0] if detected_languages else "python"
+        language = list(detected_languages)[0] if detected_languages else "unknown"
         
         # Filter supported files
-        supported_extensions = {".py", ".cpp", ".cc", ".cxx", ".h", ".hpp"}
-        recent_files = [f for f in files if f.get("status") in ["added", "modified"] 
-                       and any(f.get("filename", "").endswith(ext) for ext in supported_extensions)]
+        supported_files = [f for f in files if f.get("status") in ["added", "modified", "renamed"]
+                          and registry.detect_language(f.get("filename", ""))]
         
-        if not recent_files:
+        if not supported_files:
             return {"summary": "No recent changes to analyze", "issues": [], "language": "unknown", 
                     "tests_generated": 0, "docs_generated": False, "ltm_context": "", "ast_info": {}}
         
+        # INCREMENTAL: carry forward issues of files whose blob is unchanged since the last analysis
+        incremental = settings.pr_incremental_review and settings.pr_analysis_mode == "per_file"
+        state_store = get_pr_state_store() if incremental else None
+        previous_state = await state_store.load(repo_full_name, pr_number) if state_store else None
+        changed_since = None
+        if previous_state and before_sha and latest_sha:
+            changed_since = await github.compare_changed_files(repo_full_name, before_sha, latest_sha)
+        split = PRStateStore.split_unchanged(previous_state, supported_files, changed_since)
+        carried = split['carried']
+        if carried:
+            logger.info("pr_incremental_review", previous_head=previous_state.get('head_sha'),
+                       carried_files=len(carried), to_analyze=len(split['to_analyze']))
+            print(f"♻️ Incremental review: {len(split['to_analyze'])} changed files, {len(carried)} carried forward")
+        
+        # SCHEDULING: rank by churn / sensitive paths, fetch only the top candidates
+        scheduler = FileScheduler(
+            token_budget=settings.pr_token_budget,
+            call_token_budget=settings.pr_call_token_budget,
+            max_candidates=settings.pr_max_candidate_files,
+            chunk_tokens=settings.chunk_target_tokens
+        )
+        # PRE-FILTER (entry only): generated/vendored paths, pure renames, whitespace-only patches
+        prefilter = PreFilter()
+        prefiltered: List[Dict[str, str]] = []
+        to_review = []
+        for file in split['to_analyze']:
+            decision = prefilter.classify_entry(file)
+            if decision is not None:
+                prefiltered.append(decision)
+            else:
+                to_review.append(file)
+        selection = scheduler.select_candidates(to_review)
+        recent_files = selection['candidates']
+        skipped_files = list(selection['skipped'])
+        
         logger.info("pr_recent_diff_extracted", recent_file_count=len(recent_files), language=language)
         print(f"📄 Extracted {len(recent_files)} recent {language.upper()} files")
         
-        # AST PARSING: Fetch raw file content
-        ast_info_result = {"functions": [], "variables": [], "total_lines": 0}
-        file_contents = {}
+        # AST PARSING: Fetch raw file content concurrently (bounded by github_max_concurrent_fetches)
+        file_symbols: Dict[str, FileSymbols] = {}
+        file_contents = await github.fetch_raw_contents(recent_files)
+        secret_hits: Dict[str, int] = {}
+        file_line_kinds: Dict[str, Dict[str, set]] = {}
         
-        if language in ['python', 'cpp']:
-            for file in recent_files[:5]:
-                filename = file.get("filename", "")
-                raw_url = file.get("raw_url")
-                
-                if raw_url:
-                    try:
-                        raw_resp = requests.get(raw_url, headers=headers, timeout=10)
-                        if raw_resp.status_code == 200:
-                            file_code = raw_resp.text
-                            file_contents[filename] = file_code
-                            
-                            file_ast = ast_parser.parse_file_content(file_code, language)
-                            
-                            for func in file_ast.get('functions', []):
-                                func['file'] = filename
-                                ast_info_result['functions'].append(func)
-                            
-                            for var in file_ast.get('variables', []):
-                                var['file'] = filename
-                                ast_info_result['variables'].append(var)
-                            
-                            ast_info_result['total_lines'] += file_ast.get('total_lines', 0)
-                            
-                            logger.info("ast_parsed_file", filename=filename, 
-                                       functions=len(file_ast.get('functions', [])), 
-                                       variables=len(file_ast.get('variables', [])))
-                            print(f"  🌳 Parsed {filename}: {len(file_ast.get('functions', []))} funcs, {len(file_ast.get('variables', []))} vars")
-                    except Exception as e:
-                        logger.warning("ast_file_fetch_failed", filename=filename, error=str(e))
+        # Parse + extract in the AST worker processes (all files at once, off the event loop)
+        extracted = await get_extraction_pool().extract_many(
+            repo_full_name, {filename: (file_code, registry.detect_language(filename)) for filename, file_code in file_contents.items()}
+        )
+        for filename, file_ast in extracted.items():
+            symbols = file_ast['symbols']
+            symbols.file = filename
+            file_symbols[filename] = symbols
+            file_line_kinds[filename] = {kind: set(lines) for kind, lines in file_ast['line_kinds'].items()}
+            secret_hits[filename] = file_ast['secret_findings']
             
-            secrets = [v for v in ast_info_result['variables'] if v.get('type') == 'potential_secret']
-            logger.info("ast_parsed_for_pr", total_files=len(recent_files), 
-                       functions=len(ast_info_result['functions']), secrets=len(secrets))
-            print(f"🌳 Total AST: {len(ast_info_result['functions'])} functions, {len(secrets)} secrets from {len(recent_files)} files")
-        
-        # BUILD CLEAN CODE FOR ANALYSIS (NO DIFF MARKERS)
-        analysis_code = ""
-        for filename, code in file_contents.items():
-            analysis_code += f"# File: {filename}\n{code}\n\n"
-        
-        if not analysis_code:
-            # Fallback: Use patches if no raw files
-            analysis_code = ""
-            for file in recent_files[:5]:
-                patch = file.get("patch", "")
-                if patch:
-                    analysis_code += f"# File: {file.get('filename', 'unknown')}\n{patch}\n\n"
+            logger.info("ast_parsed_file", filename=filename, 
+                       functions=symbols.function_count, 
+                       variables=symbols.variable_count)
+            print(f"  🌳 Parsed {filename}: {symbols.function_count} funcs, {symbols.variable_count} vars")
+        
+        function_total = sum(s.function_count for s in file_symbols.values())
+        secret_total = sum(len(s.secrets()) for s in file_symbols.values())
+        logger.info("ast_parsed_for_pr", total_files=len(recent_files), 
+                   functions=function_total, secrets=secret_total)
+        print(f"🌳 Total AST: {function_total} functions, {secret_total} secrets from {len(recent_files)} files")
+        
+        # PRE-FILTER (AST): comment/import-only changes skip the model or drop to a QUICK review,
+        # as do changes that touch no function body
+        file_depths: Dict[str, ReviewDepth] = {}
+        review_tiers: Dict[str, str] = {}
+        for file in list(recent_files):
+            filename = file.get("filename", "")
+            file_language = registry.detect_language(filename)
+            functions = file_symbols[filename].functions() if filename in file_symbols and ast_parser.supports(file_language) else None
+            decision = prefilter.classify(file, file_contents.get(filename), file_language, functions,
+                                          line_kinds=file_line_kinds.get(filename))
+            if decision['decision'] == SKIP:
+                prefiltered.append(decision)
+                recent_files.remove(file)
+                file_contents.pop(filename, None)
+            elif decision['decision'] == CHEAP:
+                prefiltered.append(decision)
+                file_depths[filename] = ReviewDepth.QUICK
+                review_tiers[filename] = CHEAP
+        if prefiltered:
+            logger.info("pr_prefilter_applied", counts=summarize_decisions(prefiltered), files=prefiltered)
+            print(f"⚡ Pre-filter: {len(prefiltered)} files short-circuited")
+        
+        # HUNK MODE: send only changed hunks + enclosing functions, keep full files for AST/line mapping
+        review_contents = dict(file_contents)
+        hunk_sources: Dict[str, str] = {}
+        if settings.pr_review_mode == "hunks":
+            for file in recent_files:
+                filename = file.get("filename", "")
+                if filename in file_contents and file.get("patch"):
+                    symbols = file_symbols.get(filename)
+                    view = build_hunk_view(file_contents[filename], file["patch"], symbols.functions() if symbols else [])
+                    if view:
+                        review_contents[filename] = view
+                        hunk_sources[filename] = file_contents[filename]
+            logger.info("pr_hunk_views_built", files=len(hunk_sources),
+                       full_chars=sum(len(c) for c in hunk_sources.values()),
+                       hunk_chars=sum(len(review_contents[n]) for n in hunk_sources))
+        
+        # Fallback: Use patches for files whose raw content could not be fetched
+        for file in recent_files:
+            filename = file.get("filename", "unknown")
+            patch = file.get("patch", "")
+            if filename not in file_contents and patch:
+                review_contents[filename] = patch
+        
+        # PACK: rank again with AST secret hits and fit files into the token budget
+        # (hunk views carry absolute line numbers, so they are never packed together)
+        file_languages = {name: registry.detect_language(name) or language for name in review_contents}
+        plan = scheduler.plan(recent_files, review_contents, file_languages, secret_hits,
+                              pack=settings.pr_review_mode != "hunks", groups=review_tiers)
+        skipped_files.extend(plan['skipped'])
+        scheduled = [name for batch in plan['batches'] for name in batch]
+        deadline = started + settings.pr_analysis_deadline_seconds
+        response_deadline = started + settings.pr_response_deadline_seconds if settings.pr_response_deadline_seconds else None
         
-        # ANALYZE WITH LTM
         analyzer = CodeAnalyzer()
-        result = await analyzer.analyze_code(
-            code=analysis_code, 
-            language=language, 
-            filename="recent_pr_diff",
-            ltm_context=ltm_context
-        )
-        
-        # Extract results
-        summary = getattr(result, 'summary', 'Multi-agent analysis complete') or "Analysis complete"
-        issues = [issue.dict() for issue in getattr(result, 'issues', [])]
-        
-        # Metrics
-        metrics = getattr(result, 'metrics', {})
-        tests_generated = metrics.get('tests_generated', 0) if isinstance(metrics, dict) else 0
-        docs_generated = metrics.get('documentation_generated', False) if isinstance(metrics, dict) else False
-        
-        logger.info("analysis_parsed_success", pr_number=pr_number, issues_count=len(issues))
+        on_late_result = None
+        if on_late_analysis is not None and settings.pr_late_results_enabled:
+            async def on_late_result(late_result: CodeReviewResult):
+                late_analysis = await build_analysis(late_result, late=True)
+                late_analysis["late"] = True
+                logger.info("pr_late_analysis_ready", pr_number=pr_number, issues_count=len(late_analysis["issues"]))
+                await on_late_analysis(late_analysis)
+        
+        if settings.pr_analysis_mode == "per_file":
+            # FAN-OUT: one bounded-concurrency task per batch, issues keep their file
+            result = await analyzer.analyze_files(
+                files={name: review_contents[name] for name in scheduled},
+                languages=file_languages,
+                ltm_context=ltm_context,
+                max_concurrency=settings.pr_analysis_max_concurrency,
+                batches=plan['batches'],
+                deadline=deadline,
+                sources=hunk_sources,
+                review_depth=ReviewDepth(settings.pr_review_depth),
+                depths=file_depths,
+                response_deadline=response_deadline,
+                on_late_result=on_late_result
+            )
+            skipped_files.extend(result.metrics.get('skipped_files', []))
+        else:
+            # BUILD CLEAN CODE FOR ANALYSIS (NO DIFF MARKERS)
+            analysis_code = ""
+            for filename in scheduled:
+                analysis_code += f"# File: {filename}\n{review_contents[filename]}\n\n"
+            
+            # ANALYZE WITH LTM
+            result = await analyzer.analyze_code(
+                code=analysis_code, 
+                language=language, 
+                filename="recent_pr_diff",
+                ltm_context=ltm_context,
+                review_depth=ReviewDepth(settings.pr_review_depth),
+                deadline=response_deadline,
+                on_late_result=on_late_result
+            )
+        
+        if skipped_files:
+            logger.info("pr_files_skipped", count=len(skipped_files), files=skipped_files)
+            print(f"⏭️ Skipped {len(skipped_files)} files (budget/deadline)")
+        
+        async def build_analysis(result: CodeReviewResult, late: bool = False) -> Dict[str, Any]:
+            """
+            Comment payload (and saved PR state) from the analyzer result - also run for late
+            results, whose state is not saved once a newer push of the PR has saved its own
+            """
+            # Extract results
+            summary = getattr(result, 'summary', 'Multi-agent analysis complete') or "Analysis complete"
+            issues = [issue.dict() for issue in getattr(result, 'issues', [])]
+            
+            if state_store:
+                analyzed = [name for name in scheduled
+                            if not any(s.get('filename') == name for s in skipped_files)
+                            and name not in result.metrics.get('failed_files', [])]
+                analyzed += [d['filename'] for d in prefiltered if d['decision'] == SKIP]  # reviewed: nothing to report
+                new_state = PRStateStore.build_state(latest_sha, supported_files, analyzed, issues, carried)
+                stored = await state_store.load(repo_full_name, pr_number) if late else None
+                if stored and stored.get('head_sha') != latest_sha:
+                    logger.info("pr_state_save_skipped", pr_number=pr_number, reason="superseded",
+                               stored_head=stored.get('head_sha'), head=latest_sha)
+                else:
+                    await state_store.save(repo_full_name, pr_number, new_state)
+            
+            carried_issues = [dict(issue, carried_forward=True) for file_issues in carried.values() for issue in file_issues]
+            if carried_issues:
+                summary += f" (+{len(carried_issues)} unchanged issues carried forward from {len(carried)} files)"
+            issues.extend(carried_issues)
+            
+            # Metrics
+            metrics = getattr(result, 'metrics', {})
+            tests_generated = metrics.get('tests_generated', 0) if isinstance(metrics, dict) else 0
+            docs_generated = metrics.get('documentation_generated', False) if isinstance(metrics, dict) else False
+            pending_agents = (metrics.get('agents_pending') or {}) if isinstance(metrics, dict) else {}
+            if isinstance(pending_agents, list):  # combined mode: one call for every file
+                pending_agents = {"recent_pr_diff": pending_agents}
+            
+            return {
+                "summary": summary,
+                "issues": issues,
+                "tests_generated": tests_generated,
+                "docs_generated": docs_generated,
+                "language": language,
+                "recent_files": [f['filename'] for f in recent_files],
+                "analyzed_files": scheduled,
+                "skipped_files": skipped_files,
+                "prefiltered_files": prefiltered,
+                "carried_forward_files": sorted(carried),
+                "pending_agents": pending_agents,
+                "ltm_context": ltm_context,
+                "ast_info": combined_ast_info(file_symbols.values())
+            }
+        
+        analysis = await build_analysis(result)
+        issues = analysis["issues"]
+        
+        logger.info("analysis_parsed_success", pr_number=pr_number, issues_count=len(issues),
+                    pending_files=len(analysis["pending_agents"]))
         print(f"✅ Analysis complete: {len(issues)} issues found")
         
         # Save LTM/STM
@@ -570,16 +734,7 @@ async def analyze_pr_diff(pr_number: int, repo_full_name: str, github_token: str
                 ltm_summary = f"PR #{pr_number}: {len(critical_issues)} critical issues detected"
                 memory.consolidate_to_ltm(ltm_summary)
         
-        return {
-            "summary": summary,
-            "issues": issues,
-            "tests_generated": tests_generated,
-            "docs_generated": docs_generated,
-            "language": language,
-            "recent_files": [f['filename'] for f in recent_files],
-            "ltm_context": ltm_context,
-            "ast_info": ast_info_result
-        }
+        return analysis
     
     except Exception as e:
         logger.error("analysis_failed", error=str(e))
@@ -588,8 +743,9 @@ async def analyze_pr_diff(pr_number: int, repo_full_name: str, github_token: str
                 "docs_generated": False, "ltm_context": "", "ast_info": {}}
 
 
-async def post_analysis_comment(pr_number: int, repo_full_name: str, github_token: str, event: str, analysis: Dict[str, Any]):
-    """Post analysis as PR comment"""
+async def post_analysis_comment(pr_number: int, repo_full_name: str, github_token: str, event: str, analysis: Dict[str, Any],
+                                comment_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Post analysis as PR comment (or replace the body of `comment_id`); returns the comment, None on failure"""
     if "error" in analysis:
         comment = f"## DevAgent Swarm Analysis Failed\n{analysis['error']}\n\nPowered by Amazon Nova"
     else:
@@ -633,6 +789,34 @@ async def post_analysis_comment(pr_number: int, repo_full_name: str, github_toke
                         ast_section += f"- Secret: `{v.get('name')}` in **{v.get('file')}** (line {v.get('line')})\n"
                     ast_section += "\n"
         
+        # Skipped files (budget / deadline)
+        skipped_section = ""
+        if analysis.get('skipped_files'):
+            skipped_section = f"### ⏭️ Not Reviewed ({len(analysis['skipped_files'])} files)\n"
+            for skipped in analysis['skipped_files'][:20]:
+                skipped_section += f"- `{skipped.get('filename')}` ({skipped.get('reason')})\n"
+            skipped_section += "\n"
+        
+        # Short-circuited by the pre-filter (no model call, or a QUICK security-only review)
+        if analysis.get('prefiltered_files'):
+            prefiltered = analysis['prefiltered_files']
+            skipped_section += f"### ⚡ Short-circuited ({len(prefiltered)} files)\n"
+            for decision in prefiltered[:20]:
+                action = "not sent to the model" if decision.get('decision') == SKIP else "quick security review"
+                skipped_section += f"- `{decision.get('filename')}` ({decision.get('reason')}: {action})\n"
+            skipped_section += "\n"
+        
+        # Agents still running at the response deadline (the comment is edited when they finish)
+        pending_section = ""
+        pending_agents = analysis.get('pending_agents') or {}
+        if pending_agents:
+            agents = sorted({agent for file_agents in pending_agents.values() for agent in file_agents})
+            pending_section = f"### ⏳ Still Running ({len(pending_agents)} files)\n"
+            pending_section += f"{', '.join(agents)} did not finish in time"
+            pending_section += "; this comment will be updated with their results.\n\n" if settings.pr_late_results_enabled else ".\n\n"
+        tests_note = "pending" if any('testing' in a for a in pending_agents.values()) else f"Generated {analysis['tests_generated']} test cases"
+        docs_note = "pending" if any('documentation' in a for a in pending_agents.values()) else "Documentation created"
+        
         # Full comment
         comment = f"""## 🔍 DevAgent Swarm Analysis
 
@@ -645,28 +829,72 @@ async def post_analysis_comment(pr_number: int, repo_full_name: str, github_toke
 
 {ast_section}
 
+{skipped_section}
+
+{pending_section}
+
 ### 🧪 Generated Tests
-Generated {analysis['tests_generated']} test cases
+{tests_note}
 
 ### 📚 Documentation
-Documentation created
+{docs_note}
 
 ---
 **Powered by:** Amazon Nova + Tree-sitter AST
 **Built with ❤️ by Aditya & Sarthak**
 """
     
-    # Post
-    comment_url = f"https://api.github.com/repos/{repo_full_name}/issues/{pr_number}/comments"
-    headers = {"Authorization": f"token {github_token}", "Content-Type": "application/json"}
-    
+    # Post (or edit the earlier comment with late results)
     try:
-        requests.post(comment_url, headers=headers, json={"body": comment}, timeout=10)
-        logger.info("pr_comment_posted_success", pr_number=pr_number, issues_count=len(analysis.get("issues", [])))
-        print(f"✅ Posted comment on PR #{pr_number}")
+        github = get_github_client(github_token)
+        if comment_id is not None:
+            posted = await github.update_issue_comment(repo_full_name, comment_id, comment)
+            logger.info("pr_comment_updated_success", pr_number=pr_number, comment_id=comment_id,
+                        issues_count=len(analysis.get("issues", [])))
+            print(f"✅ Updated comment on PR #{pr_number}")
+        else:
+            posted = await github.post_issue_comment(repo_full_name, pr_number, comment)
+            logger.info("pr_comment_posted_success", pr_number=pr_number, issues_count=len(analysis.get("issues", [])))
+            print(f"✅ Posted comment on PR #{pr_number}")
+        return posted
     except Exception as e:
-        logger.error("pr_comment_post_failed", error=str(e))
+        logger.error("pr_comment_post_failed", error=str(e), comment_id=comment_id)
         print(f"❌ Failed to post: {str(e)}")
+        return None
+
+
+class LateCommentUpdate:
+    """
+    Delivers a late analysis (agents that missed the response deadline) by editing the
+    PR comment the first analysis was posted as. `deliver` is the on_late_analysis
+    callback of analyze_pr_diff and waits until `posted` has been called; late results
+    are dropped when there is no comment or `still_current` says the PR moved on.
+    """
+    
+    def __init__(self, pr_number: int, repo_full_name: str, github_token: str, event: str,
+                 still_current: Optional[Callable[[], Awaitable[bool]]] = None):
+        self.pr_number = pr_number
+        self.repo_full_name = repo_full_name
+        self.github_token = github_token
+        self.event = event
+        self.still_current = still_current
+        self.comment: asyncio.Future = asyncio.get_running_loop().create_future()
+    
+    def posted(self, comment: Optional[Dict[str, Any]]):
+        """The first comment was posted (None: posting failed or was skipped)"""
+        if not self.comment.done():
+            self.comment.set_result(comment)
+    
+    async def deliver(self, analysis: Dict[str, Any]):
+        comment = await self.comment
+        if not comment or 'id' not in comment:
+            logger.warning("pr_late_analysis_dropped", pr_number=self.pr_number, reason="no_comment")
+            return
+        if self.still_current is not None and not await self.still_current():
+            logger.info("pr_late_analysis_dropped", pr_number=self.pr_number, reason="superseded")
+            return
+        await post_analysis_comment(self.pr_number, self.repo_full_name, self.github_token, self.event, analysis,
+                                    comment_id=comment['id'])
 
 
 @router.post("/webhook")
@@ -697,7 +925,8 @@ async def github_webhook(request: Request, background_tasks: BackgroundTasks):
     repo = payload["repository"]
     pr_number = pr["number"]
     repo_full_name = repo["full_name"]
-    latest_sha = payload.get("after")
+    latest_sha = payload.get("after") or pr.get("head", {}).get("sha")
+    before_sha = payload.get("before") if action == "synchronize" else None
     
     if not settings.github_token:
         raise HTTPException(status_code=500, detail="No GitHub token")
@@ -705,21 +934,34 @@ async def github_webhook(request: Request, background_tasks: BackgroundTasks):
     logger.info("webhook_received", pr_number=pr_number, repo=repo_full_name)
     print(f"📥 Webhook: PR #{pr_number} in {repo_full_name}")
     
+    # Durable path: queue the job for the workers (dedup on repo + PR + head SHA)
+    queue = await get_job_queue()
+    if queue is not None:
+        queued = await queue.enqueue(make_job(repo_full_name, pr_number, latest_sha, action, before_sha))
+        logger.info("analysis_job_enqueued", pr_number=pr_number, repo=repo_full_name, **queued)
+        return {"status": "accepted", "pr_number": pr_number, "job": queued}
+    
     background_tasks.add_task(
-        process_pr_analysis, pr_number, repo_full_name, settings.github_token, action, latest_sha
+        process_pr_analysis, pr_number, repo_full_name, settings.github_token, action, latest_sha, before_sha
     )
     
     return {"status": "accepted", "pr_number": pr_number}
 
 
-async def process_pr_analysis(pr_number: int, repo_full_name: str, github_token: str, event: str, latest_sha: str = None):
+async def process_pr_analysis(pr_number: int, repo_full_name: str, github_token: str, event: str, latest_sha: str = None,
+                              before_sha: str = None):
     """Background analysis task"""
+    late = LateCommentUpdate(pr_number, repo_full_name, github_token, event)
+    comment = None
     try:
-        analysis = await analyze_pr_diff(pr_number, repo_full_name, github_token, latest_sha)
-        await post_analysis_comment(pr_number, repo_full_name, github_token, event, analysis)
+        analysis = await analyze_pr_diff(pr_number, repo_full_name, github_token, latest_sha, before_sha,
+                                         on_late_analysis=late.deliver)
+        comment = await post_analysis_comment(pr_number, repo_full_name, github_token, event, analysis)
     except Exception as e:
         logger.error("processing_failed", error=str(e))
         print(f"❌ Error: {str(e)}")
+    finally:
+        late.posted(comment)
 
 
 @router.post("/test-pr-analysis")
@@ -0,0 +1,11 @@
+# app/utils/tokens.py (Cheap token estimates for budgeting prompts)
+
+# Nova / Claude tokenizers average ~4 characters per token on source code
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (no tokenizer round-trip)"""
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
@@ -0,0 +1,114 @@
+# tests/unit/test_agent_policy.py
+import asyncio
+
+import pytest
+
+from app.core import telemetry
+from app.core.agent_policy import (AgentPolicy, LatencyTracker, call_with_policy, is_retryable_error, latencies,
+                                    mark_admitted, mark_queued)
+
+
+class FakeClientError(Exception):
+    """botocore ClientError stand-in carrying an error code"""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+FAST = AgentPolicy(timeout_seconds=1.0, deadline_seconds=5.0, max_retries=2,
+                   retry_base_seconds=0.01, retry_max_seconds=0.02, hedge=False)
+
+
+def test_retryable_errors():
+    """Timeouts and transient Bedrock errors are retryable, bad requests are not"""
+    assert is_retryable_error(asyncio.TimeoutError())
+    assert is_retryable_error(FakeClientError("ServiceUnavailableException"))
+    assert not is_retryable_error(FakeClientError("ValidationException"))
+    assert not is_retryable_error(ValueError("bad json"))
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors_but_not_bad_requests():
+    """Transient errors are retried with the attempt number in telemetry; validation errors fail at once"""
+    calls = []
+
+    async def flaky():
+        calls.append(telemetry.current_attempt.get())
+        if len(calls) < 3:
+            raise FakeClientError("ModelTimeoutException")
+        return "ok"
+
+    assert await call_with_policy("policy_test", flaky, FAST) == "ok"
+    assert [attempt for attempt, _ in calls] == [1, 2, 3]
+
+    async def invalid():
+        calls.append(None)
+        raise FakeClientError("ValidationException")
+
+    calls.clear()
+    with pytest.raises(FakeClientError):
+        await call_with_policy("policy_test", invalid, FAST)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_attempt_times_out_and_is_retried():
+    """An attempt past timeout_seconds is cancelled and retried"""
+    delays = [10, 0]
+
+    async def call():
+        await asyncio.sleep(delays.pop(0))
+        return "ok"
+
+    policy = AgentPolicy(timeout_seconds=0.05, deadline_seconds=5.0, max_retries=1,
+                         retry_base_seconds=0.01, retry_max_seconds=0.01, hedge=False)
+    assert await call_with_policy("policy_test", call, policy) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_attempt_past_p95_is_hedged_and_first_answer_wins():
+    """A request slower than the agent's p95 is hedged and the first answer wins"""
+    for _ in range(5):
+        latencies.observe("hedge_test", 0.02)
+    started = []
+
+    async def call():
+        _, hedged = telemetry.current_attempt.get()
+        started.append(hedged)
+        await asyncio.sleep(0 if hedged else 10)
+        return "hedge" if hedged else "primary"
+
+    policy = AgentPolicy(timeout_seconds=2.0, deadline_seconds=5.0, hedge=True, hedge_min_samples=5)
+    assert await call_with_policy("hedge_test", call, policy) == "hedge"
+    assert started == [False, True]
+
+
+def test_latency_percentile_needs_min_samples():
+    """Percentiles need min_samples within the rolling window"""
+    tracker = LatencyTracker(window=10)
+    for seconds in range(1, 21):
+        tracker.observe("a", float(seconds))
+    assert tracker.percentile("a", 0.95, min_samples=20) is None  # window keeps the last 10
+    assert tracker.percentile("a", 0.95, min_samples=10) == 20.0
+    assert tracker.percentile("a", 0.5) == 16.0
+
+
+@pytest.mark.asyncio
+async def test_time_queued_for_the_governor_does_not_count_against_the_attempt():
+    """Waiting for a governor permit neither times the attempt out nor triggers a hedge"""
+    for _ in range(5):
+        latencies.observe("queue_test", 0.02)
+    started = []
+
+    async def queued_call():
+        started.append(telemetry.current_attempt.get())
+        mark_queued()
+        await asyncio.sleep(0.2)  # waiting for a permit
+        mark_admitted()
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    policy = AgentPolicy(timeout_seconds=0.1, deadline_seconds=5.0, max_retries=0, hedge=True, hedge_min_samples=5)
+    assert await call_with_policy("queue_test", queued_call, policy) == "ok"
+    assert started == [(1, False)]
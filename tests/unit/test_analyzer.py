@@ -0,0 +1,245 @@
+# tests/unit/test_analyzer.py
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from app.config import get_settings
+from app.core.analyzer import SHARED_CODE_REF, CodeAnalyzer
+from app.models import ReviewDepth
+
+
+class StubOrchestrator:
+    """Canned multi-agent answers per filename; records every analyze_code call"""
+
+    def __init__(self, answers: Dict[str, Dict[str, Any]]):
+        self.answers = answers
+        self.calls: List[Dict[str, Any]] = []
+        self.agent_calls: List[Dict[str, Any]] = []
+
+    async def analyze_code(self, code: str, language: str, filename: str = None, **kwargs) -> Dict[str, Any]:
+        self.calls.append({'code': code, 'language': language, 'filename': filename, **kwargs})
+        answer = self.answers[filename]
+        if isinstance(answer, Exception):
+            raise answer
+        agents = kwargs.get('agents', ('code_review', 'testing', 'documentation'))
+        return {
+            'success': True,
+            'results': {agent: answer.get(agent, {}) for agent in ('code_review', 'testing', 'documentation')},
+            'cache': {agent: 'miss' if agent in agents else 'skipped' for agent in ('code_review', 'testing', 'documentation')}
+        }
+
+    async def run_agent(self, agent: str, code: str, language: str, prompt: str = None, prompt_version: str = None,
+                        max_new_tokens: int = 2048) -> tuple:
+        self.agent_calls.append({'agent': agent, 'code': code, 'prompt': prompt, 'prompt_version': prompt_version,
+                                 'max_new_tokens': max_new_tokens})
+        return {'issues': []}, 'miss'
+
+
+class PendingOrchestrator:
+    """code_review answers at once; testing is still running when analyze_code returns (cache status 'pending')"""
+
+    def __init__(self):
+        self.testing_done = asyncio.Event()
+        self.testing_task = None
+
+    async def analyze_code(self, code: str, language: str, filename: str = None, **kwargs) -> Dict[str, Any]:
+        async def testing():
+            await self.testing_done.wait()
+            return {'test_cases': [{'name': 't1'}]}, 'miss'
+
+        self.testing_task = asyncio.ensure_future(testing())
+        return {
+            'success': True,
+            'results': {'code_review': {'issues': [make_issue("bug")]}, 'testing': {}, 'documentation': {}},
+            'cache': {'code_review': 'miss', 'testing': 'pending', 'documentation': 'skipped'},
+            'pending': {'testing': self.testing_task}
+        }
+
+
+def make_analyzer(orchestrator) -> CodeAnalyzer:
+    """CodeAnalyzer wired to a stub orchestrator (no Bedrock client)"""
+    analyzer = CodeAnalyzer.__new__(CodeAnalyzer)
+    analyzer.orchestrator = orchestrator
+    return analyzer
+
+
+def make_issue(message: str, line: int = 1, severity: str = "HIGH") -> Dict[str, Any]:
+    """Model-shaped issue dict"""
+    return {'severity': severity, 'category': 'security', 'type': 'logic', 'message': message,
+            'line': line, 'suggestion': 'fix it'}
+
+
+SOURCE = "def add(a, b):\n    return a + b\n"
+
+
+def make_long_source(functions: int = 3) -> str:
+    """Python file whose functions are each about one THOROUGH chunk in size"""
+    body = "\n".join(f"    v{j} = x + {j}  # padding that grows the function to a chunk of its own" for j in range(40))
+    return "\n\n".join(f"def f{i}(x):\n{body}\n    return x\n" for i in range(functions))
+
+
+@pytest.mark.asyncio
+async def test_analyze_files_fans_out_and_merges_per_file_results():
+    """Every file is its own call; issues keep their file and counts are summed"""
+    orchestrator = StubOrchestrator({
+        'a.py': {'code_review': {'issues': [make_issue("bug in a")]}, 'testing': {'test_cases': [{'name': 't1'}]}},
+        'b.py': {'code_review': {'issues': [make_issue("bug in b", severity="LOW")]},
+                 'testing': {'test_cases': [{'name': 't2'}, {'name': 't3'}]}},
+    })
+    analyzer = make_analyzer(orchestrator)
+
+    result = await analyzer.analyze_files({'a.py': SOURCE, 'b.py': SOURCE}, {'a.py': 'python', 'b.py': 'python'})
+
+    assert sorted(call['filename'] for call in orchestrator.calls) == ['a.py', 'b.py']
+    assert sorted((i.file, i.message) for i in result.issues) == [('a.py', 'bug in a'), ('b.py', 'bug in b')]
+    assert result.metrics['files_analyzed'] == 2
+    assert result.metrics['tests_generated'] == 3
+    assert result.metrics['high_count'] == 1 and result.metrics['low_count'] == 1
+    assert set(result.metrics['per_file']) == {'a.py', 'b.py'}
+    assert result.metrics['failed_files'] == []
+
+
+@pytest.mark.asyncio
+async def test_analyze_files_reports_a_failed_file_without_dropping_the_others():
+    """An exception in one file's analysis is recorded in failed_files, the rest still merge"""
+    orchestrator = StubOrchestrator({
+        'ok.py': {'code_review': {'issues': [make_issue("real issue")]}},
+        'broken.py': RuntimeError("model unavailable"),
+    })
+    analyzer = make_analyzer(orchestrator)
+
+    result = await analyzer.analyze_files({'ok.py': SOURCE, 'broken.py': SOURCE}, {'ok.py': 'python', 'broken.py': 'python'})
+
+    assert [i.message for i in result.issues] == ["real issue"]
+    assert result.metrics['failed_files'] == ['broken.py']
+
+
+def test_merge_results_tags_issues_with_their_file():
+    """merge_results sets issue.file from the result key when the issue has none"""
+    analyzer = make_analyzer(StubOrchestrator({}))
+    first = analyzer._build_result([analyzer._parse_issue(make_issue("x"))], {}, {}, {}, "", None, {})
+    second = analyzer._build_result([], {'positive_feedback': ['clean']}, {}, {'documentation': 'd'}, "", None, {})
+
+    merged = analyzer.merge_results({'x.py': first, 'y.py': second})
+
+    assert [i.file for i in merged.issues] == ['x.py']
+    assert merged.metrics['documentation_generated'] is True
+    assert merged.positive_feedback == ['clean']
+    assert merged.summary.startswith("Multi-agent analysis: Found 1 issues across 2 files")
+
+
+def test_shared_prompt_carries_the_code_once_with_a_task_per_agent():
+    """The shared prompt embeds the code a single time and asks for one JSON key per agent"""
+    analyzer = make_analyzer(StubOrchestrator({}))
+
+    prompt = analyzer._build_shared_prompt(SOURCE, "python", "add.py", "")
+
+    assert prompt.count(SOURCE) == 1
+    for agent in ('code_review', 'testing', 'documentation'):
+        assert f'=== TASK "{agent}" ===' in prompt
+        assert f'"{agent}": <JSON of task "{agent}">' in prompt
+    assert SHARED_CODE_REF in prompt
+
+
+@pytest.mark.asyncio
+async def test_quick_depth_runs_only_code_review_with_the_small_budget():
+    """QUICK skips tests and docs and caps the review's output at review_quick_max_new_tokens"""
+    orchestrator = StubOrchestrator({'a.py': {'code_review': {'issues': [make_issue("injection")]}}})
+    analyzer = make_analyzer(orchestrator)
+
+    result = await analyzer.analyze_code(SOURCE, "python", "a.py", review_depth=ReviewDepth.QUICK)
+
+    [call] = orchestrator.calls
+    assert call['agents'] == ('code_review',)
+    assert call['max_new_tokens'] == get_settings().review_quick_max_new_tokens
+    assert call['testing_prompt'] is None and call['docs_prompt'] is None
+    assert result.metrics['agents_run'] == ['code_review']
+
+
+@pytest.mark.asyncio
+async def test_thorough_depth_reviews_each_function_chunk():
+    """THOROUGH sends one code review per function chunk and leaves tests/docs to the whole-file call"""
+    orchestrator = StubOrchestrator({'big.py': {}})
+    analyzer = make_analyzer(orchestrator)
+
+    await analyzer.analyze_code(make_long_source(), "python", "big.py", review_depth=ReviewDepth.THOROUGH)
+
+    assert [c['agent'] for c in orchestrator.agent_calls] == ['code_review'] * 3
+    assert all(c['max_new_tokens'] == get_settings().review_thorough_max_new_tokens for c in orchestrator.agent_calls)
+    [whole_file] = orchestrator.calls
+    assert whole_file['agents'] == ('testing', 'documentation')
+
+
+@pytest.mark.asyncio
+async def test_review_depth_is_part_of_the_cache_version():
+    """The same code reviewed at two depths is cached under two prompt versions"""
+    orchestrator = StubOrchestrator({'a.py': {}})
+    analyzer = make_analyzer(orchestrator)
+
+    await analyzer.analyze_code(SOURCE, "python", "a.py", review_depth=ReviewDepth.QUICK)
+    await analyzer.analyze_code(SOURCE, "python", "a.py", review_depth=ReviewDepth.STANDARD)
+
+    quick, standard = (call['prompt_version'] for call in orchestrator.calls)
+    assert quick.endswith(":quick") and standard.endswith(":standard")
+    assert quick != standard
+
+
+@pytest.mark.asyncio
+async def test_each_chunk_prompt_lists_only_its_own_functions():
+    """A chunk's review prompt names the functions it shows, not every function of the file"""
+    orchestrator = StubOrchestrator({'big.py': {}})
+    analyzer = make_analyzer(orchestrator)
+
+    await analyzer.analyze_code(make_long_source(), "python", "big.py", review_depth=ReviewDepth.THOROUGH)
+
+    listed = [{name for name in ('f0', 'f1', 'f2') if f"{name} (lines" in call['prompt']} for call in orchestrator.agent_calls]
+    shown = [{name for name in ('f0', 'f1', 'f2') if f"def {name}(" in call['code']} for call in orchestrator.agent_calls]
+    assert 'f2' not in listed[0] and 'f0' not in listed[-1]
+    assert all(s <= l for s, l in zip(shown, listed))
+
+
+@pytest.mark.asyncio
+async def test_pending_agents_time_out_without_a_late_callback():
+    """Without on_late_result the agents still running are cancelled and reported as timed_out"""
+    orchestrator = PendingOrchestrator()
+    analyzer = make_analyzer(orchestrator)
+
+    result = await analyzer.analyze_code(SOURCE, "python", "a.py", deadline=0.0)
+
+    assert result.metrics['agent_status']['testing'] == 'timed_out'
+    assert result.metrics['agents_pending'] == []
+    assert [i.message for i in result.issues] == ["bug"]
+
+
+@pytest.mark.asyncio
+async def test_late_agents_are_delivered_to_the_callback_when_they_finish():
+    """With on_late_result the early result reports testing as pending; the complete result follows"""
+    orchestrator = PendingOrchestrator()
+    analyzer = make_analyzer(orchestrator)
+    delivered = asyncio.Queue()
+
+    result = await analyzer.analyze_code(SOURCE, "python", "a.py", deadline=0.0, on_late_result=delivered.put)
+
+    assert result.metrics['agents_pending'] == ['testing']
+    orchestrator.testing_done.set()
+    late = await asyncio.wait_for(delivered.get(), timeout=1)
+    assert late.metrics['agent_status']['testing'] == 'done'
+    assert late.metrics['tests_generated'] == 1
+    assert late.metrics['late_agents'] == ['testing']
+
+
+@pytest.mark.asyncio
+async def test_cancelled_late_agent_still_completes_the_fan_out():
+    """A pending agent that is cancelled is delivered as timed_out, so analyze_files' late merge is not left waiting"""
+    orchestrator = PendingOrchestrator()
+    analyzer = make_analyzer(orchestrator)
+    delivered = asyncio.Queue()
+
+    await analyzer.analyze_files({'a.py': SOURCE}, {'a.py': 'python'}, response_deadline=0.0,
+                                 on_late_result=delivered.put)
+    orchestrator.testing_task.cancel()
+    late = await asyncio.wait_for(delivered.get(), timeout=1)
+
+    assert late.metrics['late_files'] == ['a.py']
+    assert late.metrics['per_file']['a.py']['agent_status']['testing'] == 'timed_out'
@@ -0,0 +1,41 @@
+# tests/unit/test_ast_parser.py
+import pickle
+import sys
+
+from app.core.parsers.ast_parser import parser as ast_parser
+from app.core.parsers.symbols import combined_ast_info
+
+
+def test_python_extraction_has_no_depth_limit():
+    """Functions and secrets are found however deeply they are nested"""
+    nested = "if A:\n    if B:\n        if C:\n            class K:\n                class L:\n" \
+             "                    def method(self):\n                        api_key = 'secret-123'\n"
+    symbols = ast_parser.parse_file_content(nested, "python")
+    assert list(symbols.function_ranges()) == [("method", 6, 7)]
+    assert symbols.secrets() == [("api_key", 7)]
+
+
+def test_cpp_member_function_names_and_secret_values():
+    """C++ member functions keep their class prefix and secret values are truncated"""
+    code = 'class A {\n  int get() { return 1; }\n};\nint A::run() { return 2; }\n' \
+           'const char* password = "token-' + "x" * 60 + '";\n'
+    result = ast_parser.parse_file_content(code, "cpp").to_ast_result()
+    assert [f.name for f in result.functions] == ["get", "A::run"]
+    secret = result.variables[0]
+    assert (secret.name, secret.line, secret.type) == ("password", 5, "potential_secret")
+    assert secret.value == '"token-' + "x" * 43 + "..."
+
+
+def test_file_symbols_are_compact_plain_data():
+    """FileSymbols has slots, interned names and survives pickling"""
+    symbols = ast_parser.parse_file_content("def f():\n    pass\n\ndef g():\n    pass\n", "python")
+    symbols.file = "src/a.py"
+    assert not hasattr(symbols, "__dict__")
+    assert list(symbols.function_lines) == [1, 2, 4, 5]
+
+    restored = pickle.loads(pickle.dumps(symbols))
+    assert restored.function_names[0] is sys.intern("f")
+    assert restored.to_ast_result() == symbols.to_ast_result()
+    assert combined_ast_info([symbols])["functions"][1] == {
+        "name": "g", "file": "src/a.py", "start_line": 4, "end_line": 5, "params": []
+    }
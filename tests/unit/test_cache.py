@@ -0,0 +1,45 @@
+# tests/unit/test_cache.py
+import pytest
+from app.core.cache import AnalysisCache, InMemoryCacheBackend
+
+
+def test_cache_key_depends_on_every_component():
+    """Changing any key component must produce a different key"""
+    base = AnalysisCache.make_key("x = 1", "python", "code_review", "v1", "model-a")
+    assert base == AnalysisCache.make_key("x = 1", "python", "code_review", "v1", "model-a")
+    assert base != AnalysisCache.make_key("x = 2", "python", "code_review", "v1", "model-a")
+    assert base != AnalysisCache.make_key("x = 1", "cpp", "code_review", "v1", "model-a")
+    assert base != AnalysisCache.make_key("x = 1", "python", "testing", "v1", "model-a")
+    assert base != AnalysisCache.make_key("x = 1", "python", "code_review", "v2", "model-a")
+    assert base != AnalysisCache.make_key("x = 1", "python", "code_review", "v1", "model-b")
+
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_evicts_least_recently_used():
+    """Oldest untouched entry is evicted once max_entries is exceeded"""
+    backend = InMemoryCacheBackend(max_entries=2)
+    await backend.set("a", {"v": 1}, ttl=60)
+    await backend.set("b", {"v": 2}, ttl=60)
+    assert await backend.get("a") == {"v": 1}  # touch "a" so "b" becomes LRU
+    await backend.set("c", {"v": 3}, ttl=60)
+    assert await backend.get("b") is None
+    assert await backend.get("a") == {"v": 1}
+    assert len(backend) == 2
+
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_expires_entries():
+    """Entries past their TTL are treated as misses"""
+    backend = InMemoryCacheBackend()
+    await backend.set("a", {"v": 1}, ttl=-1)
+    assert await backend.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_failed_results_are_not_cached():
+    """Errors and unparsed responses must not be stored"""
+    cache = AnalysisCache(InMemoryCacheBackend())
+    await cache.set("code", "python", "code_review", "v1", "m", {"error": "throttled"})
+    await cache.set("code", "python", "testing", "v1", "m", {"raw_response": "...", "parsed": False})
+    assert await cache.get("code", "python", "code_review", "v1", "m") is None
+    assert await cache.get("code", "python", "testing", "v1", "m") is None
@@ -0,0 +1,56 @@
+# tests/unit/test_chunker.py
+from app.core.chunker import Chunk, chunker
+
+
+def make_method(name: str) -> str:
+    """Python method of 14 lines"""
+    body = "".join(f"        value_{i} = self.compute_{name}({i}) + {i}\n" for i in range(12))
+    return f"    def {name}(self):\n{body}        return value_0\n\n"
+
+
+SOURCE = (
+    "import os\n"
+    "from typing import Any\n"
+    "\n"
+    "API_URL = os.environ['API_URL']\n"
+    "\n"
+    "# The service\n"
+    "class Service:\n"
+    + "".join(make_method(name) for name in ("load", "save", "sync", "purge", "audit"))
+    + "\ndef main():\n    return Service().load()\n"
+)
+
+
+def test_large_class_is_split_along_methods_with_shared_header():
+    """Every chunk repeats imports/globals, stays near the target and no code line is lost"""
+    lines = SOURCE.splitlines()
+    chunks = chunker.split(SOURCE, "python", target_tokens=400, header_max_tokens=100)
+
+    assert len(chunks) > 1
+    assert all(c.header == [(1, 2), (4, 4)] for c in chunks)
+    assert all(c.tokens <= 400 for c in chunks)
+    # Units follow definition boundaries: each chunk starts at a method (or the class / its comment)
+    assert {lines[c.ranges[0][0] - 1].strip().split("(")[0] for c in chunks} <= {
+        "# The service", "def load", "def save", "def sync", "def purge", "def audit", "def main"
+    }
+    shown = set().union(*(c.shown_lines() for c in chunks))
+    assert all(n in shown for n, text in enumerate(lines, 1) if text.strip())
+
+
+def test_max_chunks_grows_the_target_and_unsupported_languages_use_line_windows():
+    """max_chunks caps the chunk count; languages without a grammar are split into line windows"""
+    assert len(chunker.split(SOURCE, "python", target_tokens=400, max_chunks=2)) == 2
+    windows = chunker.split(SOURCE, "cobol", target_tokens=300)
+    assert len(windows) > 1 and all(not c.header for c in windows)
+    assert windows[0].ranges[0][0] == 1 and windows[-1].ranges[-1][1] == len(SOURCE.splitlines())
+
+
+def test_rebase_keeps_margin_numbers_and_drops_lines_not_shown():
+    """Lines shown in the chunk keep their number; any other file line is not guessed at"""
+    chunk = Chunk(ranges=[(40, 45)], header=[(1, 2)])
+    assert chunk.render(["line"] * 45).splitlines()[2] == "  ..."
+    assert chunk.rebase(42) == 42       # absolute number from the margin
+    assert chunk.rebase(2) == 2         # header line, shown with its own number
+    assert chunk.rebase(3) is None      # hidden file line, not "third line of the chunk"
+    assert chunk.rebase(500) is None
+    assert chunk.rebase(None) is None
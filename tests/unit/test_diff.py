@@ -0,0 +1,36 @@
+# tests/unit/test_diff.py
+from app.core.diff import build_hunk_view, changed_lines, parse_patch
+
+PATCH = """@@ -12,3 +12,4 @@ def handler(request):
+ line12
+-old13
++line13
++line14
+ line15
+@@ -30,2 +31,2 @@
+ line31
+-old32
++line32
+\\ No newline at end of file"""
+
+
+def test_parse_patch_maps_added_lines_to_new_file_numbers():
+    """Added lines are numbered in new-file coordinates, deletions are skipped"""
+    hunks = parse_patch(PATCH)
+    assert [(h["new_start"], h["new_count"]) for h in hunks] == [(12, 4), (31, 2)]
+    assert changed_lines(PATCH) == [13, 14, 32]
+
+
+def test_hunk_view_uses_absolute_lines_and_enclosing_function():
+    """The view widens to the enclosing function and keeps absolute line numbers"""
+    code = "\n".join(f"line{i}" for i in range(1, 41))
+    functions = [{"name": "handler", "start_line": 10, "end_line": 16}]
+
+    view = build_hunk_view(code, PATCH, functions, context_lines=0)
+    rendered = view.splitlines()
+
+    assert rendered[0] == "   10 | line10"
+    assert "   13+| line13" in rendered
+    assert "   16 | line16" in rendered
+    assert "   32+| line32" in rendered
+    assert "line20" not in view
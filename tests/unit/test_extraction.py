@@ -0,0 +1,36 @@
+# tests/unit/test_extraction.py
+import pickle
+
+import pytest
+
+from app.core.parsers.extraction import ExtractionPool, InlineExtraction
+
+FILES = {
+    "src/a.py": ('import os\n\n# helper\ndef f():\n    token = "secret-value-123"\n    return token\n', "python"),
+    "src/b.cpp": ('#include <string>\nint g() { return 1; }\n', "cpp"),
+    "README.md": ("# docs\n", None),
+}
+
+
+@pytest.mark.asyncio
+async def test_worker_processes_return_the_same_plain_data_as_inline_extraction():
+    """Pooled extraction returns picklable results equal to inline extraction"""
+    pool = ExtractionPool(workers=2)
+    try:
+        pooled = await pool.extract_many("o/r", FILES)
+        # The same key always lands on the same worker (its parse-tree cache)
+        assert pool._executor(("o/r", "src/a.py"))[0] == pool._executor(("o/r", "src/a.py"))[0]
+    finally:
+        pool.shutdown()
+    inline = await InlineExtraction().extract_many("o/r", FILES)
+
+    def comparable(extracted):
+        return {name: {**e, "symbols": e["symbols"].to_ast_result()} for name, e in extracted.items()}
+
+    assert comparable(pooled) == comparable(inline)
+    pickle.dumps(pooled)  # nothing tree-sitter in the results
+    a = pooled["src/a.py"]
+    assert a["symbols"].function_names == ["f"]
+    assert a["line_kinds"] == {"comment": [3], "import": [1]}
+    assert a["secret_findings"] == 1
+    assert pooled["README.md"]["symbols"].function_count == 0
@@ -0,0 +1,98 @@
+# tests/unit/test_github_client.py
+import asyncio
+import httpx
+import pytest
+from app.core.github_client import GitHubClient
+from app.routers import github as github_router
+
+
+def make_client(handler) -> GitHubClient:
+    """GitHubClient wired to an in-process mock transport"""
+    client = GitHubClient(token="test-token", base_url="https://api.github.test")
+    client.client = httpx.AsyncClient(
+        base_url="https://api.github.test",
+        transport=httpx.MockTransport(handler),
+        follow_redirects=True
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_list_pr_files_follows_link_pagination():
+    """Files beyond the first page of 100 are not dropped"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params.get("page", "1"))
+        files = [{"filename": f"f{page}_{i}.py"} for i in range(100 if page == 1 else 50)]
+        headers = {}
+        if page == 1:
+            headers["Link"] = '<https://api.github.test/repos/o/r/pulls/1/files?per_page=100&page=2>; rel="next"'
+        return httpx.Response(200, json=files, headers=headers)
+
+    client = make_client(handler)
+    files = await client.list_pr_files("o/r", 1)
+    await client.aclose()
+
+    assert len(files) == 150
+    assert files[-1]["filename"] == "f2_49.py"
+
+
+@pytest.mark.asyncio
+async def test_fetch_raw_contents_skips_failed_files():
+    """Failed raw fetches are left out instead of failing the batch"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("missing.py"):
+            return httpx.Response(404)
+        return httpx.Response(200, text=f"# {request.url.path}")
+
+    client = make_client(handler)
+    contents = await client.fetch_raw_contents([
+        {"filename": "a.py", "raw_url": "https://raw.test/a.py"},
+        {"filename": "missing.py", "raw_url": "https://raw.test/missing.py"},
+        {"filename": "removed.py"},
+    ], max_concurrency=2)
+    await client.aclose()
+
+    assert contents == {"a.py": "# /a.py"}
+
+
+@pytest.mark.asyncio
+async def test_update_issue_comment_patches_the_comment():
+    """Late results replace the body of the comment already posted"""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, request.url.path, request.content))
+        return httpx.Response(200, json={"id": 42, "body": "updated"})
+
+    client = make_client(handler)
+    comment = await client.update_issue_comment("o/r", 42, "updated")
+    await client.aclose()
+
+    assert comment["id"] == 42
+    assert seen == [("PATCH", "/repos/o/r/issues/comments/42", b'{"body":"updated"}')]
+
+
+@pytest.mark.asyncio
+async def test_late_analysis_edits_the_posted_comment_unless_superseded(monkeypatch):
+    """Late results wait for the first comment, then edit it - unless a newer push superseded the PR"""
+    edits = []
+
+    async def fake_post(pr_number, repo_full_name, github_token, event, analysis, comment_id=None):
+        edits.append((comment_id, analysis["summary"]))
+
+    monkeypatch.setattr(github_router, "post_analysis_comment", fake_post)
+    current = [True]
+
+    async def still_current():
+        return current[0]
+
+    late = github_router.LateCommentUpdate(7, "o/r", "token", "synchronize", still_current)
+    delivery = asyncio.ensure_future(late.deliver({"summary": "complete"}))
+    await asyncio.sleep(0)
+    assert not delivery.done()  # waits for the first comment
+    late.posted({"id": 42})
+    await delivery
+    current[0] = False
+    await late.deliver({"summary": "stale"})
+
+    assert edits == [(42, "complete")]
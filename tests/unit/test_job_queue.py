@@ -0,0 +1,90 @@
+# tests/unit/test_job_queue.py
+import pytest
+from app.jobs.queue import RedisJobQueue, SQLiteJobQueue, make_job
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteJobQueue(str(tmp_path / "jobs.db"))
+
+
+@pytest.fixture
+def redis_queue():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return RedisJobQueue(client=fakeredis.FakeAsyncRedis(decode_responses=True))
+
+
+@pytest.mark.asyncio
+async def test_enqueue_deduplicates_same_head_sha(queue):
+    """A redelivered webhook for the same (repo, PR, SHA) does not create a second job"""
+    first = await queue.enqueue(make_job("o/r", 1, "sha1", "opened"))
+    second = await queue.enqueue(make_job("o/r", 1, "sha1", "opened"))
+    assert first["status"] == "queued"
+    assert second == {"status": "duplicate", "job_id": first["job_id"]}
+
+
+@pytest.mark.asyncio
+async def test_newer_sha_supersedes_queued_job(queue):
+    """Only the newest head SHA of a PR is run; in-flight older jobs report superseded"""
+    await queue.enqueue(make_job("o/r", 1, "sha1", "opened"))
+    running = await queue.dequeue()
+    await queue.enqueue(make_job("o/r", 1, "sha2", "synchronize"))
+    await queue.enqueue(make_job("o/r", 1, "sha3", "synchronize"))
+
+    job = await queue.dequeue()
+    assert job["head_sha"] == "sha3"
+    assert await queue.dequeue() is None
+    assert await queue.is_superseded(running)
+    assert not await queue.is_superseded(job)
+    assert (await queue.stats())["superseded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_dequeue_round_robins_across_repos(queue):
+    """A burst from one repo does not starve another"""
+    for pr in range(1, 4):
+        await queue.enqueue(make_job("busy/repo", pr, f"sha{pr}", "opened"))
+    await queue.enqueue(make_job("quiet/repo", 1, "sha1", "opened"))
+
+    order = [(await queue.dequeue())["repo"] for _ in range(3)]
+    assert order[:2] in (["busy/repo", "quiet/repo"], ["quiet/repo", "busy/repo"])
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_then_given_up(queue, monkeypatch):
+    """Failures re-queue with backoff until job_max_attempts is reached"""
+    monkeypatch.setattr("app.jobs.queue.retry_delay", lambda attempts: 0)
+    monkeypatch.setattr("app.jobs.queue.settings.job_max_attempts", 2)
+    await queue.enqueue(make_job("o/r", 1, "sha1", "opened"))
+
+    job = await queue.dequeue()
+    assert await queue.fail(job, "throttled") == "retrying"
+    job = await queue.dequeue()
+    assert job["attempts"] == 2
+    assert await queue.fail(job, "throttled") == "failed"
+    assert await queue.dequeue() is None
+
+
+@pytest.mark.asyncio
+async def test_interrupted_redis_claim_is_recovered(redis_queue, monkeypatch):
+    """A worker dying right after claiming a job leaves it to reappear after the visibility timeout"""
+    monkeypatch.setattr("app.jobs.queue.settings.job_visibility_timeout_seconds", 0)
+    queued = await redis_queue.enqueue(make_job("o/r", 1, "sha1", "opened"))
+
+    client_get = redis_queue.client.get
+
+    async def crash(key):
+        raise ConnectionError("worker died")
+
+    monkeypatch.setattr(redis_queue.client, "get", crash)
+    with pytest.raises(ConnectionError):
+        await redis_queue.dequeue()
+    monkeypatch.setattr(redis_queue.client, "get", client_get)
+    assert await redis_queue.stats() == {"queued": 0, "delayed": 0, "running": 1}
+
+    job = await redis_queue.dequeue()
+    assert job["id"] == queued["job_id"]
+    assert await redis_queue.stats() == {"queued": 0, "delayed": 0, "running": 1}
+    await redis_queue.complete(job)
+    assert await redis_queue.dequeue() is None
@@ -0,0 +1,59 @@
+# tests/unit/test_json_stream.py
+from app.core.json_stream import JSONArrayStreamer, StreamingJSONParser, parse_model_json
+
+
+def test_items_are_emitted_as_their_braces_close():
+    """Array items are emitted once their closing brace arrives, escapes and nesting included"""
+    text = (
+        '{"issues": [{"severity": "HIGH", "message": "uses \\"eval\\" {x}"}, '
+        '{"severity": "LOW", "fix": {"code": "a[0]"}}], "summary": "2 issues"}'
+    )
+    streamer = JSONArrayStreamer("issues")
+    emitted = []
+    for i in range(0, len(text), 7):
+        emitted.extend(streamer.feed(text[i:i + 7]))
+
+    assert emitted == [
+        {"severity": "HIGH", "message": 'uses "eval" {x}'},
+        {"severity": "LOW", "fix": {"code": "a[0]"}},
+    ]
+    assert streamer.done
+    assert streamer.text == text
+
+
+def test_first_item_arrives_before_the_document_ends():
+    """An item is available as soon as it is complete, before the array is closed"""
+    streamer = JSONArrayStreamer("issues")
+    assert streamer.feed('Here you go: {"iss') == []
+    assert streamer.feed('ues": [{"line": 3}') == [{"line": 3}]
+    assert streamer.feed(', {"line": ') == []
+    assert streamer.feed('4}') == [{"line": 4}]
+    assert not streamer.done
+
+
+def test_truncated_answer_keeps_complete_items_only():
+    """A cut-off answer keeps its complete items and is flagged as truncated"""
+    text = (
+        'Sure:\n```json\n{"summary": "tests", "test_cases": [\n'
+        '  {"name": "t1", "test_code": "def test_a():\n    assert f(1) == 2\n"},\n'
+        '  {"name": "t2", "test_code": "def test_b():\n    assert f('
+    )
+    parser = StreamingJSONParser()
+    emitted = []
+    for i in range(0, len(text), 5):
+        emitted.extend(parser.feed(text[i:i + 5]))
+
+    assert emitted == [("test_cases", {"name": "t1", "test_code": "def test_a():\n    assert f(1) == 2\n"})]
+    assert parser.result() == {"summary": "tests", "test_cases": [emitted[0][1]], "truncated": True}
+
+
+def test_nested_sections_trailing_commas_and_cut_strings():
+    """parse_model_json repairs trailing commas, cut strings and prose around the JSON"""
+    shared = '{"code_review": {"issues": [{"line": 1, "refs": [{"u": 1}]}, {"line": 2},]}, "documentation": {"text": "# Doc\n\nPart'
+    result = parse_model_json(shared)
+    assert result["code_review"]["issues"] == [{"line": 1, "refs": [{"u": 1}]}, {"line": 2}]
+    assert result["documentation"] == {"text": "# Doc\n\nPart"} and result["truncated"]
+
+    assert parse_model_json('{"issues": [], "summary": "ok",}\n```') == {"issues": [], "summary": "ok"}
+    assert parse_model_json('Use {braces} here: {"issues": [{"line": 4}]}') == {"issues": [{"line": 4}]}
+    assert parse_model_json("no json {here") == {"raw_response": "no json {here", "parsed": False}
@@ -0,0 +1,165 @@
+# tests/unit/test_orchestrator.py
+import asyncio
+import time
+from typing import Any, Dict
+
+import pytest
+
+from app.agents.multi_agent_orchestrator import MultiAgentOrchestrator, get_bedrock_executor
+from app.config import get_settings
+from app.core import telemetry
+from app.core.rate_limiter import governor
+
+
+def make_orchestrator(model_id: str = "test-model") -> MultiAgentOrchestrator:
+    """Orchestrator without a boto3 client or cache (model calls are stubbed per test)"""
+    orchestrator = MultiAgentOrchestrator.__new__(MultiAgentOrchestrator)
+    orchestrator.model_id = model_id
+    orchestrator.executor = get_bedrock_executor()
+    orchestrator.cache = None
+    return orchestrator
+
+
+@pytest.mark.asyncio
+async def test_blocking_model_calls_overlap_on_the_executor():
+    """Three blocking invoke_model calls run side by side instead of one after another"""
+    orchestrator = make_orchestrator()
+
+    def slow_invoke(request_body):
+        time.sleep(0.2)
+        return {"echo": request_body["n"]}
+
+    orchestrator._invoke_model_sync = slow_invoke
+    started = time.monotonic()
+    results = await asyncio.gather(*(orchestrator._invoke_model_async({"n": n}) for n in range(3)))
+
+    assert [r["echo"] for r in results] == [0, 1, 2]
+    assert time.monotonic() - started < 0.5
+
+
+@pytest.mark.asyncio
+async def test_cancelled_governed_call_frees_its_slot_once_the_call_ends():
+    """A cancelled model call keeps its governor slot until the call itself ends, then frees it without an AIMD increase"""
+    orchestrator = make_orchestrator("test-model-cancel")
+    model_governor = governor.for_model("test-model-cancel")
+    model_governor.limit = 2.0
+    finished = asyncio.Event()
+
+    async def slow_invoke(request_body):
+        await finished.wait()
+        return {"usage": {"inputTokens": 10, "outputTokens": 5}}
+
+    orchestrator._invoke_model_async = slow_invoke
+    with telemetry.collect() as calls:
+        task = asyncio.ensure_future(orchestrator._invoke_model_governed({}, estimated_tokens=10, agent="code_review"))
+        await asyncio.sleep(0.05)
+        task.cancel("timeout")
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert model_governor.in_flight == 1  # the call is still running
+    finished.set()
+    await asyncio.sleep(0.05)
+    assert model_governor.in_flight == 0
+    assert model_governor.limit == 2.0
+    assert [c.outcome for c in calls] == ["timeout"]
+
+
+@pytest.mark.asyncio
+async def test_shared_answer_is_split_into_one_result_per_agent():
+    """analyze_code_shared makes one call and hands each agent its own section"""
+    orchestrator = make_orchestrator()
+    prompts = []
+
+    async def fake_nova(prompt, max_new_tokens=2048, agent='unknown'):
+        prompts.append((prompt, agent))
+        return {'code_review': {'issues': [{'message': 'x'}]}, 'testing': {'test_cases': []}}
+
+    orchestrator._invoke_nova = fake_nova
+    result = await orchestrator.analyze_code_shared("code", "python", prompt="shared prompt")
+
+    assert prompts == [("shared prompt", "combined")]
+    assert result['results']['code_review'] == {'issues': [{'message': 'x'}]}
+    assert result['results']['testing'] == {'test_cases': []}
+    assert result['results']['documentation'] == {'error': "missing 'documentation' section in shared response"}
+    assert result['cache'] == {'code_review': 'disabled', 'testing': 'disabled', 'documentation': 'disabled'}
+
+
+@pytest.mark.asyncio
+async def test_failed_shared_call_reports_the_error_for_every_agent():
+    """An error from the single shared call is copied to all three agent results"""
+    orchestrator = make_orchestrator()
+
+    async def failing_nova(prompt, max_new_tokens=2048, agent='unknown'):
+        return {'error': 'model unavailable'}
+
+    orchestrator._invoke_nova = failing_nova
+    result = await orchestrator.analyze_code_shared("code", "python", prompt="shared prompt")
+
+    assert all(section == {'error': 'model unavailable'} for section in result['results'].values())
+
+
+def make_nova_response(text: str, stop_reason: str) -> Dict[str, Any]:
+    """invoke_model response body of a Nova answer"""
+    return {"output": {"message": {"content": [{"text": text}]}}, "stopReason": stop_reason,
+            "usage": {"inputTokens": 10, "outputTokens": 5}}
+
+
+@pytest.mark.asyncio
+async def test_truncated_answer_is_continued_with_the_answer_so_far_as_prefill():
+    """A max_tokens stop re-asks with the (right-stripped) answer as assistant prefill and joins the texts"""
+    orchestrator = make_orchestrator()
+    responses = [make_nova_response('{"issues": [{"line": 1}, \n  ', "max_tokens"),
+                 make_nova_response('{"line": 2}]}', "end_turn")]
+    requests = []
+
+    async def fake_governed(request_body, estimated_tokens=0, agent="unknown", continuation=False):
+        requests.append(request_body)
+        return responses[len(requests) - 1]
+
+    orchestrator._invoke_model_governed = fake_governed
+    result = await orchestrator._invoke_nova("review this", agent="code_review")
+
+    assert result == {"issues": [{"line": 1}, {"line": 2}]}
+    assert len(requests[0]["messages"]) == 1
+    assert requests[1]["messages"][-1] == {"role": "assistant", "content": [{"text": '{"issues": [{"line": 1},'}]}
+
+
+@pytest.mark.asyncio
+async def test_continuations_stop_at_the_configured_limit(monkeypatch):
+    """At most bedrock_max_continuations follow-up requests are made for one answer"""
+    monkeypatch.setattr(get_settings(), "bedrock_max_continuations", 2)
+    orchestrator = make_orchestrator()
+    requests = []
+
+    async def always_truncated(request_body, estimated_tokens=0, agent="unknown", continuation=False):
+        requests.append(request_body)
+        return make_nova_response(f'"part{len(requests)}"', "max_tokens")
+
+    orchestrator._invoke_model_governed = always_truncated
+    await orchestrator._invoke_nova("review this", agent="code_review")
+
+    assert len(requests) == 3
+    assert requests[-1]["messages"][-1]["content"][0]["text"] == '"part1""part2"'
+
+
+@pytest.mark.asyncio
+async def test_agents_past_the_deadline_are_returned_as_pending_tasks():
+    """analyze_code(deadline=...) returns the finished agents and hands back the others' running tasks"""
+    orchestrator = make_orchestrator()
+    release_testing = asyncio.Event()
+
+    async def run_agent(agent, code, language, prompt=None, prompt_version=None, max_new_tokens=2048):
+        if agent == "testing":
+            await release_testing.wait()
+        return {"agent": agent}, "miss"
+
+    orchestrator.run_agent = run_agent
+    result = await orchestrator.analyze_code("code", "python", agents=("code_review", "testing"),
+                                             deadline=time.monotonic() + 0.05)
+
+    assert result["cache"] == {"code_review": "miss", "testing": "pending", "documentation": "skipped"}
+    assert result["results"]["code_review"] == {"agent": "code_review"} and result["results"]["testing"] == {}
+    assert list(result["pending"]) == ["testing"]
+    release_testing.set()
+    assert await result["pending"]["testing"] == ({"agent": "testing"}, "miss")
@@ -0,0 +1,66 @@
+# tests/unit/test_parser_registry.py
+import pytest
+
+from app.core.parsers.ast_parser import parser as ast_parser
+from app.core.parsers.registry import LanguageSpec, ParserRegistry, registry
+from app.core.rules import rule_engine
+from app.models import AnalyzeCodeRequest
+
+
+def test_extensions_map_to_languages_and_grammars_load_lazily():
+    """Extensions map to languages case-insensitively and a grammar loads on first use only"""
+    local = ParserRegistry()
+    local.register(LanguageSpec("go", (".go",)))
+    assert local.detect_language("cmd/Main.GO") == "go"
+    assert local.detect_language("README.md") is None
+    assert local.loaded == []
+    assert local.supports("go") and local.loaded == ["go"]
+
+    assert [registry.detect_language(f) for f in ("a.py", "b.hpp", "c.c", "d.jsx", "e.ts", "f.tsx", "g.rs", "h.java")] == \
+        ["python", "cpp", "c", "javascript", "typescript", "tsx", "rust", "java"]
+
+
+def test_unknown_or_broken_grammar_is_unsupported():
+    """A grammar that fails to load, or an unknown language, is reported as unsupported"""
+    local = ParserRegistry()
+    local.register(LanguageSpec("nope", (".nope",), grammar="no_such_grammar"))
+    assert not local.supports("nope") and not local.supports("cobol")
+    with pytest.raises(KeyError):
+        local.parser("nope")
+    with pytest.raises(ValueError):
+        local.register_extractor("cobol", {})
+
+
+@pytest.mark.parametrize("language, code, functions, secret", [
+    ("javascript", "function f(a) { return a }\nclass A {\n  m() {}\n}\nconst g = () => 1;\nconst apiKey = 'secret-1';\n",
+     ["f", "m", "g"], ("apiKey", 6)),
+    ("typescript", "function f(a: number): number { return a }\nconst token: string = \"token-123\";\n",
+     ["f"], ("token", 2)),
+    ("go", "package main\n\nfunc f() {}\n\nfunc (s *S) M() {}\n\nconst apiKey = \"secret\"\n",
+     ["f", "M"], ("apiKey", 7)),
+    ("java", "class A {\n  A() {}\n  void m() {}\n  String apiKey = \"secret123\";\n}\n",
+     ["A", "m"], ("apiKey", 4)),
+    ("rust", "fn f() {}\nimpl S {\n    fn m(&self) {}\n}\nconst API_KEY: &str = \"secret\";\n",
+     ["f", "m"], ("API_KEY", 5)),
+])
+def test_pluggable_extractors_per_language(language, code, functions, secret):
+    """Each registered extractor finds the language's functions and secrets"""
+    symbols = ast_parser.parse_file_content(code, language)
+    assert symbols.function_names == functions
+    assert symbols.secrets() == [secret]
+
+
+def test_c_files_use_the_c_family_extractor_and_rules():
+    """C files share the C-family extractor, line classes and rules"""
+    code = '#include <stdlib.h>\nint run(char *cmd) {\n    return system(cmd);\n}\n'
+    assert ast_parser.parse_file_content(code, "c").function_names == ["run"]
+    assert ast_parser.classify_lines(code, "c")["import"] == {1, 2}
+    assert [i.rule_id for i in rule_engine.run(code, "c")] == ["shell-exec"]
+
+
+def test_analyze_request_accepts_every_registered_language():
+    """AnalyzeCodeRequest.language is validated against the registry, not a hardcoded list"""
+    for language in registry.languages:
+        assert AnalyzeCodeRequest(code="x", language=language.upper()).language == language
+    with pytest.raises(ValueError):
+        AnalyzeCodeRequest(code="x", language="cobol")
@@ -0,0 +1,38 @@
+# tests/unit/test_pr_state.py
+from app.core.pr_state import PRStateStore
+
+
+def test_split_unchanged_carries_forward_same_blob_files():
+    """Files with an unchanged blob SHA reuse their issues; changed or new files are re-analyzed"""
+    state = {
+        "head_sha": "old",
+        "files": {
+            "a.py": {"blob_sha": "a1", "issues": [{"file": "a.py", "line": 3}]},
+            "b.py": {"blob_sha": "b1", "issues": []},
+            "c.py": {"blob_sha": "c1", "issues": [{"file": "c.py", "line": 9}]},
+        },
+    }
+    files = [
+        {"filename": "a.py", "sha": "a1"},
+        {"filename": "b.py", "sha": "b2"},
+        {"filename": "c.py", "sha": "c1"},
+        {"filename": "d.py", "sha": "d1"},
+    ]
+
+    split = PRStateStore.split_unchanged(state, files, changed_since={"c.py"})
+
+    assert [f["filename"] for f in split["to_analyze"]] == ["b.py", "c.py", "d.py"]
+    assert split["carried"] == {"a.py": [{"file": "a.py", "line": 3}]}
+
+
+def test_build_state_records_analyzed_and_carried_files():
+    """New state keeps fresh issues per analyzed file plus carried-forward entries"""
+    files = [{"filename": "a.py", "sha": "a1"}, {"filename": "b.py", "sha": "b2"}]
+    state = PRStateStore.build_state(
+        "new", files, analyzed=["b.py"],
+        issues=[{"file": "b.py", "line": 1}],
+        carried={"a.py": [{"file": "a.py", "line": 3}]}
+    )
+    assert state["head_sha"] == "new"
+    assert state["files"]["b.py"] == {"blob_sha": "b2", "issues": [{"file": "b.py", "line": 1}]}
+    assert state["files"]["a.py"]["blob_sha"] == "a1"
@@ -0,0 +1,69 @@
+# tests/unit/test_prefilter.py
+from app.core.parsers.ast_parser import parser as ast_parser
+from app.core.prefilter import CHEAP, FULL, SKIP, PreFilter
+
+SOURCE = '''import os
+import sys
+
+# helper
+def f(x):
+    """Return x."""
+    y = x
+    return y
+
+LIMIT = 3
+'''
+
+
+def make_entry(name, patch, status="modified", changes=2):
+    """GitHub PR file entry with the given patch"""
+    return {"filename": name, "status": status, "changes": changes, "patch": patch}
+
+
+def classify_patch(patch, name="src/app.py"):
+    """Full PreFilter decision for a patch against SOURCE"""
+    functions = ast_parser.parse_file_content(SOURCE, "python").functions()
+    return PreFilter().classify(make_entry(name, patch), SOURCE, "python", functions)
+
+
+def test_entry_level_skips_need_no_content():
+    """Vendored paths, pure renames and whitespace-only patches are skipped from the entry alone"""
+    prefilter = PreFilter()
+    assert prefilter.classify_entry(make_entry("third_party/x/y.py", "@@ -1 +1 @@\n-a\n+b"))["reason"] == "generated_or_vendored_path"
+    assert prefilter.classify_entry(make_entry("src/a.py", "", status="renamed", changes=0))["reason"] == "rename_only"
+    assert prefilter.classify_entry(make_entry("src/a.py", "@@ -7 +7 @@\n-    y=x\n+    y = x"))["reason"] == "whitespace_only"
+    # Reordered lines are not cosmetic
+    assert prefilter.classify_entry(make_entry("src/a.py", "@@ -7,2 +7,2 @@\n-a()\n-b()\n+b()\n+a()")) is None
+
+
+def test_whitespace_check_keeps_python_indentation_and_string_contents():
+    """Python indentation, string contents and spaces between words are not cosmetic"""
+    prefilter = PreFilter()
+    # Dedenting a return out of its block changes what the code does
+    assert prefilter.classify_entry(make_entry("src/a.py", "@@ -8 +8 @@\n-            return y\n+    return y")) is None
+    # Indentation is cosmetic where the language ignores it
+    assert prefilter.classify_entry(make_entry("src/a.js", "@@ -8 +8 @@\n-            return y;\n+    return y;"))["reason"] == "whitespace_only"
+    # Spaces inside string literals and between words are significant
+    assert prefilter.classify_entry(make_entry("src/a.py", '@@ -3 +3 @@\n-s = "a b"\n+s = "ab"')) is None
+    assert prefilter.classify_entry(make_entry("src/a.js", "@@ -3 +3 @@\n-return x;\n+returnx;")) is None
+    assert prefilter.classify_entry(make_entry("src/a.js", "@@ -3 +3 @@\n-f( a,b )\n+f(a, b)"))["reason"] == "whitespace_only"
+
+
+def test_ast_classification_of_changed_lines():
+    """Comment, import, module-level and function-body changes get skip, cheap and full"""
+    assert classify_patch("@@ -4 +4 @@\n-# old\n+# helper") == {"filename": "src/app.py", "decision": SKIP, "reason": "comments_only"}
+    assert classify_patch('@@ -6 +6 @@\n-    """Old."""\n+    """Return x."""')["decision"] == SKIP
+    assert classify_patch("@@ -2 +2 @@\n-import json\n+import sys")["reason"] == "imports_only"
+    assert classify_patch("@@ -10 +10 @@\n-LIMIT = 2\n+LIMIT = 3") == {"filename": "src/app.py", "decision": CHEAP, "reason": "no_functions_changed"}
+    assert classify_patch("@@ -7 +7 @@\n-    y = x * 2\n+    y = x")["decision"] == FULL
+    # Deleting a line from a function body touches the function
+    assert classify_patch("@@ -7,3 +7,2 @@\n     y = x\n-    check(y)\n     return y")["decision"] == FULL
+
+
+def test_moved_line_is_not_whitespace_only():
+    """Moving a line within a hunk (an auth check now after the delete) still gets a model review"""
+    prefilter = PreFilter()
+    moved = "@@ -7,2 +7,2 @@\n-    check_admin(u)\n     db.delete(u)\n+    check_admin(u)"
+    assert prefilter.classify_entry(make_entry("src/a.py", moved)) is None
+    reindented_in_place = "@@ -7,2 +7,2 @@\n-    y=x\n+    y = x\n     return y"
+    assert prefilter.classify_entry(make_entry("src/a.py", reindented_in_place))["reason"] == "whitespace_only"
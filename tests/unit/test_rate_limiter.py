@@ -0,0 +1,44 @@
+# tests/unit/test_rate_limiter.py
+import asyncio
+import pytest
+from botocore.exceptions import ClientError
+from app.core.rate_limiter import ModelGovernor, TokenBucket, is_throttling_error
+
+
+def test_token_bucket_reports_wait_time():
+    """An empty bucket reports how long until enough tokens refill"""
+    bucket = TokenBucket(capacity=10, rate=10)
+    bucket.consume(10)
+    assert 0.4 < bucket.time_until(5) <= 0.5
+
+
+def test_is_throttling_error():
+    throttled = ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "InvokeModel")
+    invalid = ClientError({"Error": {"Code": "ValidationException", "Message": "bad"}}, "InvokeModel")
+    assert is_throttling_error(throttled)
+    assert not is_throttling_error(invalid)
+    assert not is_throttling_error(ValueError("x"))
+
+
+@pytest.mark.asyncio
+async def test_governor_queues_beyond_concurrency_and_halves_on_throttle():
+    """Calls over the limit wait instead of failing; throttling halves the limit (AIMD)"""
+    governor = ModelGovernor("m", requests_per_minute=6000, tokens_per_minute=10**7, max_concurrency=2)
+    first = await governor.acquire(10)
+    second = await governor.acquire(10)
+
+    third = asyncio.create_task(governor.acquire(10))
+    await asyncio.sleep(0.05)
+    assert not third.done()
+    assert governor.metrics()["queue_depth"] == 1
+
+    await governor.release(first, throttled=True)
+    assert governor.limit == 1.0
+    await asyncio.sleep(0.05)
+    assert not third.done()  # one call still in flight, limit is now 1
+
+    await governor.release(second)
+    permit = await asyncio.wait_for(third, timeout=2)
+    await governor.release(permit)
+    assert governor.metrics()["throttled_calls"] == 1
+    assert governor.limit > 1.0
@@ -0,0 +1,77 @@
+# tests/unit/test_rules.py
+from app.core.analyzer import CodeAnalyzer
+from app.core.rules import covered_summary, is_covered, rule_engine
+from app.models import CodeIssue, IssueCategory, Severity
+
+PYTHON_SOURCE = '''import os
+import subprocess
+
+API_KEY = "sk-live1234567890abcdefgh"
+PASSWORD = "changeme"
+token = os.environ["TOKEN"]
+
+def find(cursor, name):
+    cursor.execute("SELECT * FROM users WHERE name = '" + name + "'")
+    cursor.execute(f"DELETE FROM users WHERE name = {name}")
+    cursor.execute("SELECT * FROM users WHERE name = %s", (name,))
+    subprocess.run(name, shell=True)
+    os.system("ls " + name)
+    os.system("ls")
+    return "hello " + name
+'''
+
+CPP_SOURCE = '''const char* password = "hunter2hunter2";
+void run(std::string user) {
+    std::string q = "SELECT * FROM t WHERE u = '" + user + "'";
+    system(user.c_str());
+    system("ls");
+}
+'''
+
+
+def make_findings(code, language):
+    """(rule_id, line) of every rule finding, in report order"""
+    return [(i.rule_id, i.line) for i in rule_engine.run(code, language)]
+
+
+def test_python_rules_report_exact_locations():
+    """Python rules report each finding at its exact line and column"""
+    issues = rule_engine.run(PYTHON_SOURCE, "python")
+    assert [(i.rule_id, i.line) for i in issues] == [
+        ("hardcoded-secret", 4),
+        ("sql-string-building", 9),
+        ("sql-string-building", 10),
+        ("shell-true", 12),
+        ("shell-exec", 13),
+    ]
+    secret = issues[0]
+    assert (secret.column, secret.type, secret.severity) == (1, "Hardcoded Secret", Severity.CRITICAL)
+    assert secret.code_snippet == 'API_KEY = "sk-live1234567890abcdefgh"'
+    assert issues[1].column == 20
+
+
+def test_cpp_rules():
+    """C++ rules find secrets, SQL building and shell calls; unsupported languages get none"""
+    assert make_findings(CPP_SOURCE, "cpp") == [
+        ("hardcoded-secret", 1),
+        ("sql-string-building", 3),
+        ("shell-exec", 4),
+    ]
+    assert rule_engine.run(CPP_SOURCE, "rust") == []
+
+
+def test_model_issues_covered_by_rules_are_dropped_from_results():
+    """Model issues on a rule finding's line are duplicates, and the prompt lists what rules found"""
+    static = rule_engine.run(PYTHON_SOURCE, "python")
+    duplicate = CodeIssue(id="m1", severity=Severity.HIGH, category=IssueCategory.security,
+                          type="SQL Injection", message="concatenated query", description="",
+                          suggestion="", line=10)
+    other_line = duplicate.model_copy(update={"line": 2})
+    assert is_covered(duplicate, static)
+    assert not is_covered(other_line, static)
+    assert "SQL Injection at line 9" in covered_summary(static)
+
+    prompt = CodeAnalyzer()._build_enhanced_code_review_prompt(
+        "x = 1", "python", "a.py", "", static_context=covered_summary(static)
+    )
+    assert "do NOT report these again" in prompt
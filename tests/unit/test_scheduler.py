@@ -0,0 +1,50 @@
+# tests/unit/test_scheduler.py
+from app.core.scheduler import FileScheduler, PROMPT_OVERHEAD_TOKENS
+from app.utils.tokens import estimate_tokens
+
+
+def test_rank_prefers_secret_hits_and_sensitive_paths():
+    """AST secret hits outrank sensitive paths, which outrank plain churn"""
+    scheduler = FileScheduler(token_budget=100000, call_token_budget=10000)
+    files = [
+        {"filename": "src/utils.py", "additions": 40, "deletions": 10},
+        {"filename": "src/auth/login.py", "additions": 5, "deletions": 0},
+        {"filename": "src/report.py", "additions": 1, "deletions": 0},
+    ]
+    ranked = scheduler.rank(files, secret_hits={"src/report.py": 1})
+    assert [f["filename"] for f in ranked] == ["src/report.py", "src/auth/login.py", "src/utils.py"]
+
+
+def test_plan_packs_small_files_and_reports_skips():
+    """Small files share a call; files over the token budget or without content are skipped with a reason"""
+    scheduler = FileScheduler(token_budget=PROMPT_OVERHEAD_TOKENS + 300, call_token_budget=PROMPT_OVERHEAD_TOKENS + 500)
+    files = [
+        {"filename": "a.py", "additions": 30},
+        {"filename": "b.py", "additions": 20},
+        {"filename": "huge.py", "additions": 10},
+        {"filename": "c.py", "additions": 5},
+        {"filename": "missing.py", "additions": 1},
+    ]
+    contents = {"a.py": "x" * 400, "b.py": "y" * 400, "huge.py": "z" * 4000, "c.py": "w" * 800}
+    languages = {name: "python" for name in contents}
+
+    plan = scheduler.plan(files, contents, languages)
+
+    assert plan["batches"] == [["a.py", "b.py"]]
+    reasons = {s["filename"]: s["reason"] for s in plan["skipped"]}
+    assert reasons == {"huge.py": "token_budget", "c.py": "token_budget", "missing.py": "content_unavailable"}
+
+
+def test_plan_gives_an_oversized_file_its_own_chunked_call():
+    """A file larger than one call is scheduled alone and charged one prompt overhead per chunk"""
+    scheduler = FileScheduler(token_budget=100000, call_token_budget=PROMPT_OVERHEAD_TOKENS + 500, chunk_tokens=300)
+    files = [{"filename": "huge.py", "additions": 10}, {"filename": "a.py", "additions": 5}, {"filename": "b.py", "additions": 1}]
+    contents = {"huge.py": "z" * 4000, "a.py": "x" * 400, "b.py": "y" * 400}
+
+    plan = scheduler.plan(files, contents, {name: "python" for name in contents})
+
+    assert plan["batches"] == [["huge.py"], ["a.py", "b.py"]]
+    assert plan["skipped"] == []
+    # huge.py: about 1000 tokens in 4 chunks of 300; a.py + b.py share one call
+    huge, small = estimate_tokens(contents["huge.py"]), estimate_tokens(contents["a.py"]) * 2
+    assert plan["tokens_planned"] == huge + 4 * PROMPT_OVERHEAD_TOKENS + small + PROMPT_OVERHEAD_TOKENS
@@ -0,0 +1,60 @@
+# tests/unit/test_telemetry.py
+import asyncio
+
+import pytest
+
+from app.core import telemetry
+from app.core.telemetry import CallRecord
+
+
+def make_call(agent, input_tokens=0, output_tokens=0, cache="miss", retries=0):
+    """CallRecord of a 1.5s model call (or cache hit) for one agent"""
+    return CallRecord(agent=agent, model_id="m", repo="o/r", input_tokens=input_tokens,
+                      output_tokens=output_tokens, latency_seconds=1.5, cache=cache, retries=retries)
+
+
+@pytest.mark.asyncio
+async def test_collect_sees_calls_recorded_in_child_tasks():
+    """Calls recorded in tasks spawned inside collect() are collected, later ones are not"""
+    async def agent_call(name):
+        telemetry.record_call(make_call(name, input_tokens=100, output_tokens=20))
+
+    with telemetry.collect() as calls:
+        await asyncio.gather(agent_call("code_review"), agent_call("testing"))
+    telemetry.record_call(make_call("documentation"))  # outside the block: not collected
+
+    assert sorted(c.agent for c in calls) == ["code_review", "testing"]
+
+
+def test_summaries_count_cache_hits_apart_and_merge_across_files():
+    """Cache hits are counted apart from calls and per-file summaries merge into one"""
+    first = telemetry.summarize([
+        make_call("code_review", 1000, 200, retries=2),
+        make_call("testing", cache="hit"),
+    ])
+    assert first["calls"] == 1
+    assert first["cache_hits"] == 1
+    assert first["retries"] == 2
+    assert first["total_tokens"] == 1200
+    assert first["by_agent"]["testing"]["input_tokens"] == 0
+
+    second = telemetry.summarize([make_call("code_review", 500, 100)])
+    merged = telemetry.merge_summaries([first, second, None])
+    assert merged["calls"] == 2
+    assert merged["by_agent"]["code_review"]["input_tokens"] == 1500
+    assert merged["model_latency_seconds"] == 3.0
+    assert merged["estimated_cost_usd"] == pytest.approx(first["estimated_cost_usd"] + second["estimated_cost_usd"])
+
+
+def test_summaries_count_continuations_and_truncated_calls():
+    """Continuation calls and answers cut off at max_tokens are counted per agent and overall"""
+    cut = make_call("code_review", 1000, 2048)
+    cut.stop_reason = "max_tokens"
+    resumed = make_call("code_review", 3000, 400)
+    resumed.continuation, resumed.stop_reason = True, "end_turn"
+
+    summary = telemetry.summarize([cut, resumed, make_call("testing")])
+    assert summary["by_agent"]["code_review"]["continuations"] == 1
+    assert summary["by_agent"]["code_review"]["truncated"] == 1
+    assert summary["continuations"] == 1
+    assert summary["truncated"] == 1
@@ -0,0 +1,32 @@
+# tests/unit/test_tree_cache.py
+from tree_sitter_languages import get_parser
+
+from app.core.parsers.tree_cache import ParseTreeCache, line_edits
+
+OLD = b"def f(x):\n    return x\n\ndef g():\n    pass\n"
+NEW = b"def f(x):\n    y = x * 2\n    return y\n\ndef g():\n    pass"
+
+
+def test_line_edits_are_ordered_last_first():
+    """line_edits lists edits from the end of the file so earlier offsets stay valid"""
+    edits = line_edits(OLD, NEW)
+    assert [e[0] for e in edits] == sorted((e[0] for e in edits), reverse=True)
+    # Replacing line 2 with two lines
+    assert edits[-1] == (10, 23, 37, (1, 0), (2, 0), (3, 0))
+
+
+def test_incremental_reparse_matches_a_fresh_parse_and_evicts_lru():
+    """An edited tree reparses to the same result as a fresh parse; the least recent entry is evicted"""
+    parser = get_parser("python")
+    cache = ParseTreeCache(max_entries=2)
+
+    cache.parse(("o/r", "a.py"), OLD, "python", parser)
+    tree = cache.parse(("o/r", "a.py"), NEW, "python", parser)
+    assert tree.root_node.sexp() == parser.parse(NEW).root_node.sexp()
+    assert cache.parse(("o/r", "a.py"), NEW, "python", parser) is tree
+    assert cache.stats == {"hits": 1, "incremental": 1, "full": 1, "evictions": 0}
+
+    cache.parse(("o/r", "b.py"), OLD, "python", parser)
+    cache.parse(("o/r", "c.py"), OLD, "python", parser)
+    assert cache.get(("o/r", "a.py")) is None
+    assert len(cache) == 2 and cache.stats["evictions"] == 1